@@ -1,40 +1,152 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+import os
+import threading
+import time
+from collections import Counter
 from datetime import datetime
 from data_processor import DataProcessor
+from rollups import TimeRollup
+from search_index import DOCUMENT_KINDS, SearchIndex
+from spike_detector import SpikeDetector
+from chart_data import downsample_frame, downsample_series, newest_first_order, recent_page
 
-# Initialize data processor
-processor = DataProcessor()
-processor.load_sample_data()
+# Streamlit re-runs this script on every interaction. Everything expensive is
+# cached across reruns and sessions, keyed by the source files' fingerprints,
+# so switching pages only costs rendering.
 
-# Process data
-incidents, logs = processor.process_incidents(), processor.process_logs()
+@st.cache_resource
+def get_processor():
+    """One DataProcessor shared by every session."""
+    return DataProcessor()
 
-# Create DataFrame for incidents
-incidents_df = pd.DataFrame(incidents)
-if 'timestamp' in incidents_df.columns:
-    incidents_df['timestamp'] = pd.to_datetime(incidents_df['timestamp'])
+processor = get_processor()
+INCIDENTS_PATH = os.path.join(processor.data_dir, "sample_incidents.json")
+LOGS_PATH = os.path.join(processor.data_dir, "sample_logs.txt")
 
-# Create DataFrame for logs
-logs_df = pd.DataFrame(logs)
-if 'timestamp' in logs_df.columns:
-    logs_df['timestamp'] = pd.to_datetime(logs_df['timestamp'])
+# Set by a cached function's body, which only runs on a cache miss
+_stage_run = threading.local()
+stage_timings = []
 
-# Add date column for trend analysis
-if 'timestamp' in incidents_df.columns:
+def source_fingerprint(path):
+    """Cheap identity of a source file's current version."""
+    stat = os.stat(path)
+    return (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+def run_stage(name, fn, *args):
+    """Call a cached stage, recording whether it hit and how long it took."""
+    parquet_before = processor.cache.stats()
+    _stage_run.missed = False
+    start = time.perf_counter()
+    result = fn(*args)
+    parquet_after = processor.cache.stats()
+    if not _stage_run.missed:
+        parquet = "-"
+    elif parquet_after["misses"] > parquet_before["misses"]:
+        parquet = "miss"
+    elif parquet_after["appends"] > parquet_before["appends"]:
+        parquet = "append"
+    else:
+        parquet = "hit"
+    stage_timings.append({
+        "stage": name,
+        "cache": "miss" if _stage_run.missed else "hit",
+        "parquet": parquet,
+        "ms": round((time.perf_counter() - start) * 1000, 1)
+    })
+    return result
+
+# Processed DataFrames (timestamps already datetime64). The returned frames
+# are shared, so pages must not modify them in place.
+@st.cache_resource(show_spinner="Loading incidents...", max_entries=4)
+def load_incidents(fingerprint):
+    _stage_run.missed = True
+    incidents_df = processor.load_incidents_df(fingerprint[0])
     incidents_df['date'] = incidents_df['timestamp'].dt.date
-if 'timestamp' in logs_df.columns:
+    return incidents_df
+
+@st.cache_resource(show_spinner="Loading logs...", max_entries=4)
+def load_logs(fingerprint):
+    _stage_run.missed = True
+    logs_df = processor.load_logs_df(fingerprint[0])
     logs_df['date'] = logs_df['timestamp'].dt.date
+    return logs_df, Counter(processor.malformed_logs)
+
+@st.cache_resource(show_spinner="Building trend rollups...", max_entries=8)
+def build_rollup(kind, fingerprint):
+    """Hourly and daily aggregates of a source, built once per file version."""
+    _stage_run.missed = True
+    frame = load_incidents(fingerprint) if kind == "incidents" else load_logs(fingerprint)[0]
+    return TimeRollup.from_frame(frame)
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def recent_order(kind, fingerprint):
+    """Newest-first row order of a source, sorted once per file version for paging."""
+    _stage_run.missed = True
+    frame = load_incidents(fingerprint) if kind == "incidents" else load_logs(fingerprint)[0]
+    return newest_first_order(frame['timestamp'])
+
+@st.cache_resource(show_spinner="Building search index...", max_entries=2)
+def build_search_index(incidents_fingerprint, logs_fingerprint):
+    """Inverted index over incidents and logs, built once per pair of file versions."""
+    _stage_run.missed = True
+    index = SearchIndex()
+    index.add_frame(load_incidents(incidents_fingerprint), "incident")
+    index.add_frame(load_logs(logs_fingerprint)[0], "log")
+    return index
+
+@st.cache_resource(show_spinner="Mining log templates...", max_entries=4)
+def mine_templates(fingerprint):
+    """Log templates and each line's template id, mined once per file version."""
+    _stage_run.missed = True
+    return processor.mine_log_templates(load_logs(fingerprint)[0])
+
+RECENT_PAGE_SIZE = 10
+
+def show_recent(kind, frame, source):
+    """Paged newest-first table; page 1 is a top-k pick, later pages use a cached order."""
+    pages = max(1, -(-len(frame) // RECENT_PAGE_SIZE))
+    page = st.number_input("Page", min_value=1, max_value=pages, value=1, key=f"{kind}_page")
+    order = None
+    if page > 1:
+        order = run_stage(f"{kind} order", recent_order, kind, source_fingerprint(source))
+    st.dataframe(recent_page(frame, page, RECENT_PAGE_SIZE, order))
+    st.caption(f"Page {page} of {pages}")
+
+incidents_df = run_stage("incidents", load_incidents, source_fingerprint(INCIDENTS_PATH))
+logs_df, malformed_logs = run_stage("logs", load_logs, source_fingerprint(LOGS_PATH))
+
+@st.cache_resource
+def get_log_follower():
+    """One background follower of the live log, shared across reruns and sessions."""
+    follower = processor.follow_logs(
+        checkpoint_path=os.path.join(processor.cache.cache_dir, "follow_checkpoint.json")
+        if processor.cache.enabled else None,
+        detector=SpikeDetector()
+    )
+    follower.start()
+    return follower
+
+def show_timings(render_seconds):
+    """Sidebar panel with each stage's cache outcome and duration."""
+    rows = stage_timings + [{
+        "stage": "render", "cache": "-", "parquet": "-",
+        "ms": round(render_seconds * 1000, 1)
+    }]
+    with st.sidebar.expander("Timings"):
+        st.dataframe(pd.DataFrame(rows), hide_index=True)
+        st.caption("cache: shared dashboard cache; parquet: on-disk processed cache")
 
 # Streamlit UI
 def main():
+    render_start = time.perf_counter()
     st.title("Risk Signal Analyzer Dashboard")
     
     # Sidebar options
     analysis_type = st.sidebar.selectbox(
         "Select Analysis Type",
-        ["Incident Analysis", "Log Analysis", "Trend Analysis"],
+        ["Incident Analysis", "Log Analysis", "Log Templates", "Live Logs", "Trend Analysis", "Search"],
         key="analysis_type_selector"
     )
     
@@ -44,7 +156,7 @@ def main():
         # Display incident statistics
         col1, col2, col3 = st.columns(3)
         with col1:
-            st.metric("Total Incidents", len(incidents))
+            st.metric("Total Incidents", len(incidents_df))
         with col2:
             st.metric("High Priority", len(incidents_df[incidents_df['priority'] == 1]))
         with col3:
@@ -52,7 +164,8 @@ def main():
         
         # Incident category distribution
         st.subheader("Incident Category Distribution")
-        category_counts = incidents_df['category'].value_counts()
+        # Categorical columns also count categories with no rows; drop those
+        category_counts = incidents_df['category'].value_counts().loc[lambda counts: counts > 0]
         fig = px.pie(values=category_counts.values, 
                     names=category_counts.index,
                     title="Incident Categories")
@@ -69,7 +182,7 @@ def main():
         
         # Display incidents table
         st.subheader("Recent Incidents")
-        st.dataframe(incidents_df.sort_values('timestamp', ascending=False).head(10))
+        show_recent("incidents", incidents_df, INCIDENTS_PATH)
     
     elif analysis_type == "Log Analysis":
         st.header("Log Analysis Dashboard")
@@ -77,15 +190,22 @@ def main():
         # Display log statistics
         col1, col2, col3 = st.columns(3)
         with col1:
-            st.metric("Total Logs", len(logs))
+            st.metric("Total Logs", len(logs_df))
         with col2:
             st.metric("Error Logs", len(logs_df[logs_df['severity'] == 'ERROR']))
         with col3:
             st.metric("Average Impact", logs_df['impact_level'].mean())
-        
+
+        # Surface lines the parser skipped instead of dropping them silently
+        skipped = {reason: count for reason, count in malformed_logs.items()
+                   if reason != "blank"}
+        if skipped:
+            st.warning("Skipped malformed log lines: " +
+                       ", ".join(f"{reason} ({count})" for reason, count in skipped.items()))
+
         # Log category distribution
         st.subheader("Log Category Distribution")
-        category_counts = logs_df['category'].value_counts()
+        category_counts = logs_df['category'].value_counts().loc[lambda counts: counts > 0]
         fig = px.pie(values=category_counts.values, 
                     names=category_counts.index,
                     title="Log Categories")
@@ -93,7 +213,7 @@ def main():
         
         # Log severity distribution
         st.subheader("Log Severity Distribution")
-        severity_counts = logs_df['severity'].value_counts()
+        severity_counts = logs_df['severity'].value_counts().loc[lambda counts: counts > 0]
         fig = px.bar(x=severity_counts.index,
                     y=severity_counts.values,
                     labels={'x': 'Severity Level', 'y': 'Count'},
@@ -102,35 +222,143 @@ def main():
         
         # Display logs table
         st.subheader("Recent Logs")
-        st.dataframe(logs_df.sort_values('timestamp', ascending=False).head(10))
+        show_recent("logs", logs_df, LOGS_PATH)
+    
+    elif analysis_type == "Log Templates":
+        st.header("Log Templates")
+        
+        templates, template_ids = run_stage("log templates", mine_templates,
+                                            source_fingerprint(LOGS_PATH))
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Log Lines", len(logs_df))
+        with col2:
+            st.metric("Templates", len(templates))
+        
+        # One row per message shape; <*> marks the parts that vary
+        st.subheader("Templates by Frequency")
+        table = templates.assign(examples=templates['examples'].str.join(" | "))
+        st.dataframe(table.drop(columns="template_id"), hide_index=True)
+        
+        # Lines of one template, newest first
+        if not templates.empty:
+            st.subheader("Template Lines")
+            chosen = st.selectbox("Template", templates['template_id'],
+                                  format_func=dict(zip(templates['template_id'],
+                                                       templates['template'])).get,
+                                  key="template_selector")
+            st.dataframe(recent_page(logs_df[template_ids == chosen], 1, 20), hide_index=True)
+    
+    elif analysis_type == "Live Logs":
+        st.header("Live Log Feed")
+        follower = get_log_follower()
+        follower.poll()
+        status = follower.status()
+        live_df = follower.store.frame()
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Lines Read", status["lines_read"])
+        with col2:
+            st.metric("Retained Rows", status["store"]["rows"])
+        with col3:
+            st.metric("Rotations / Truncations", f"{status['rotations']} / {status['truncations']}")
+        st.caption(f"Following {status['path']} at byte {status['offset']}")
+
+        if live_df.empty:
+            st.info("No log lines received yet.")
+        else:
+            st.subheader("Latest Logs")
+            st.dataframe(live_df.tail(20).iloc[::-1])
+
+            # Aggregates cover every line read, including evicted ones
+            volume = downsample_series(follower.store.rollup.totals("hour")['count'])
+            fig = px.line(x=volume.index, y=volume.values,
+                          labels={'x': 'Hour', 'y': 'Log Lines'},
+                          title="Hourly Log Volume")
+            st.plotly_chart(fig)
+
+            # Rate spikes per category and severity against a rolling baseline
+            st.subheader("Rate Alerts")
+            alerts = follower.store.detector.alerts()
+            if alerts['active']:
+                st.error(f"{len(alerts['active'])} active rate spike(s)")
+                st.dataframe(pd.DataFrame(alerts['active']), hide_index=True)
+            else:
+                st.success("No active rate spikes")
+            if alerts['recent']:
+                st.caption("Recent spikes, newest first")
+                st.dataframe(pd.DataFrame(alerts['recent']), hide_index=True)
+            st.caption(f"Windows {', '.join(f'{w}s' for w in alerts['windows'])}; "
+                       f"spike = at least {alerts['min_count']} events and "
+                       f"{alerts['threshold']:g} deviations over the last "
+                       f"{alerts['baseline_buckets']} windows")
+        st.button("Refresh")
     
     elif analysis_type == "Trend Analysis":
         st.header("Trend Analysis Dashboard")
         
-        # Incident trend over time
-        st.subheader("Incident Trend Over Time")
-        incidents_df['date'] = incidents_df['timestamp'].dt.date
-        incident_trend = incidents_df.groupby('date').size()
-        fig = px.line(x=incident_trend.index,
-                     y=incident_trend.values,
-                     labels={'x': 'Date', 'y': 'Number of Incidents'},
-                     title="Daily Incident Trend")
+        dataset = st.radio("Records", ["Incidents", "Logs"], horizontal=True, key="trend_dataset")
+        granularity = st.radio("Granularity", ["day", "hour"], horizontal=True,
+                               format_func=str.title, key="trend_granularity")
+        kind = dataset.lower()
+        source = INCIDENTS_PATH if kind == "incidents" else LOGS_PATH
+        # Precomputed buckets: reading a series costs O(buckets), not O(records)
+        rollup = run_stage(f"{kind} rollup", build_rollup, kind, source_fingerprint(source))
+        totals = rollup.totals(granularity)
+        # Charts get at most MAX_CHART_POINTS points per trace, peaks kept
+        counts = downsample_series(totals['count'])
+        mean_impact = downsample_series(totals['mean_impact'])
+        period = "Daily" if granularity == "day" else "Hourly"
+        axis = "Date" if granularity == "day" else "Hour"
+        
+        # Record trend over time
+        st.subheader(f"{dataset[:-1]} Trend Over Time")
+        fig = px.line(x=counts.index,
+                     y=counts.values,
+                     labels={'x': axis, 'y': f'Number of {dataset}'},
+                     title=f"{period} {dataset[:-1]} Trend")
         st.plotly_chart(fig)
         
         # Impact trend over time
         st.subheader("Impact Trend Over Time")
-        impact_trend = incidents_df.groupby('date')['impact_level'].mean()
-        fig = px.line(x=impact_trend.index,
-                     y=impact_trend.values,
-                     labels={'x': 'Date', 'y': 'Average Impact Level'},
-                     title="Daily Impact Level Trend")
+        fig = px.line(x=mean_impact.index,
+                     y=mean_impact.values,
+                     labels={'x': axis, 'y': 'Average Impact Level'},
+                     title=f"{period} Impact Level Trend")
         st.plotly_chart(fig)
         
         # Category trend
         st.subheader("Category Distribution Over Time")
-        category_trend = incidents_df.groupby(['date', 'category']).size().unstack().fillna(0)
-        fig = px.area(category_trend)
+        fig = px.area(downsample_frame(rollup.category_counts(granularity)))
         st.plotly_chart(fig)
+    
+    elif analysis_type == "Search":
+        st.header("Search Incidents and Logs")
+        
+        index = run_stage("search index", build_search_index,
+                          source_fingerprint(INCIDENTS_PATH), source_fingerprint(LOGS_PATH))
+        query = st.text_input("Query", placeholder="database latency OR disk",
+                              help="All words must match; separate alternatives with OR")
+        kinds = st.multiselect("Record types", DOCUMENT_KINDS, default=DOCUMENT_KINDS)
+        severities = st.multiselect("Severity", index.severities())
+        dates = st.date_input("Date range", value=())
+        start = end = None
+        if len(dates) == 2:
+            start = pd.Timestamp(dates[0])
+            end = pd.Timestamp(dates[1]) + pd.Timedelta(days=1) - pd.Timedelta(1)
+        
+        if not kinds:
+            # An empty kinds filter would mean "any" to the index
+            st.info("Select at least one record type to search.")
+        else:
+            results = index.search(query, start=start, end=end, severities=severities,
+                                   kinds=kinds, limit=100)
+            st.caption(f"{results['total']} matching records, newest first")
+            if results['hits']:
+                st.dataframe(pd.DataFrame(results['hits']).drop(columns="id"), hide_index=True)
+
+    show_timings(time.perf_counter() - render_start)
 
 if __name__ == "__main__":
     main()
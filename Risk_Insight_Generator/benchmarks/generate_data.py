@@ -0,0 +1,200 @@
+"""Seeded synthetic incidents and logs in the bundled sample formats.
+
+Logs are written like data/sample_logs.txt, one
+"[YYYY-MM-DD HH:MM:SS] LEVEL: message" line each, in increasing time
+order. Message shapes and their variable parts (hosts, ids, percentages,
+addresses) vary the way production logs do, with a small share of
+malformed lines. Incidents are a JSON array like
+data/sample_incidents.json, or NDJSON with --ndjson. The same seed
+always produces the same files, and both are written as they are
+generated, so sizes up to 10M lines need little memory.
+
+Usage:
+    python benchmarks/generate_data.py [--logs 1000000] [--incidents 10000]
+        [--seed 42] [--out-dir benchmarks/data] [--ndjson]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator
+
+DEFAULT_SEED = 42
+DEFAULT_START = datetime(2025, 1, 1)
+LOG_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# (level, weight, message shapes); fields are filled per line
+LOG_SHAPES = [
+    ("INFO", 60, [
+        "Request {id} served in {ms} ms",
+        "User {user} logged in from {ip}",
+        "Cache hit ratio {pct}% on {host}",
+        "Scheduled job {job} completed in {sec} seconds",
+    ]),
+    ("WARNING", 25, [
+        "Network packet loss detected on interface eth{n}",
+        "CPU usage above {pct}% for {n} minutes",
+        "Backup verification failed for data store {n}",
+        "Slow response from {host}: {ms} ms",
+    ]),
+    ("ERROR", 13, [
+        "High latency detected in database queries on {host}",
+        "Failed to establish database connection to {host}",
+        "Authentication failure detected from IP {ip}",
+        "Network connectivity lost to {host}",
+    ]),
+    ("CRITICAL", 2, [
+        "System crash due to memory exhaustion on {host}",
+        "Disk space critical - less than {pct}% free on {host}",
+        "Security breach attempt blocked from {ip}",
+    ]),
+]
+
+INCIDENT_SHAPES = [
+    ("System Performance Degradation",
+     "The system on {host} has been experiencing high latency and performance "
+     "degradation for {n} hours. Users are reporting slow response times."),
+    ("Network Connectivity Issues",
+     "Multiple users are reporting intermittent connectivity issues. Packet loss "
+     "of {pct}% detected on {host}."),
+    ("Data Integrity Concerns",
+     "Backup job {job} reported checksum mismatches; possible data corruption "
+     "in store {n}."),
+    ("Security Alert",
+     "Repeated authentication failure from {ip} followed by a suspected breach "
+     "attempt on {host}."),
+    ("Service Outage",
+     "Service on {host} suffered a crash and outage lasting {n} minutes after "
+     "a failed deployment."),
+]
+INCIDENT_SEVERITIES = [("HIGH", 20), ("MEDIUM", 50), ("LOW", 30)]
+
+MALFORMED_LINES = ["", "Traceback (most recent call last):", "[not a timestamp] ERROR: bad line"]
+
+
+# Generators of the variable parts of a message, by placeholder name
+FIELDS = {
+    "id": lambda rng: f"{rng.getrandbits(32):08x}",
+    "user": lambda rng: f"user{rng.randrange(50_000)}",
+    "ip": lambda rng: f"10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(1, 255)}",
+    "host": lambda rng: f"host-{rng.randrange(200):03d}",
+    "job": lambda rng: f"job-{rng.randrange(1000)}",
+    "ms": lambda rng: rng.randrange(1, 5000),
+    "sec": lambda rng: rng.randrange(1, 600),
+    "pct": lambda rng: rng.randrange(1, 100),
+    "n": lambda rng: rng.randrange(1, 24),
+}
+
+
+class _Fields(dict):
+    """Placeholder values drawn on first use, so only used fields cost a draw."""
+
+    def __init__(self, rng: random.Random):
+        super().__init__()
+        self.rng = rng
+
+    def __missing__(self, name: str) -> Any:
+        value = self[name] = FIELDS[name](self.rng)
+        return value
+
+
+def iter_log_lines(
+    count: int,
+    seed: int = DEFAULT_SEED,
+    start: datetime = DEFAULT_START,
+    malformed_rate: float = 0.001
+) -> Iterator[str]:
+    """Yield `count` log lines (without newlines) in increasing time order."""
+    rng = random.Random(seed)
+    levels = [level for level, _, _ in LOG_SHAPES]
+    weights = [weight for _, weight, _ in LOG_SHAPES]
+    shapes = {level: messages for level, _, messages in LOG_SHAPES}
+    seconds = 0.0
+    second, timestamp = None, None
+    for _ in range(count):
+        if rng.random() < malformed_rate:
+            yield rng.choice(MALFORMED_LINES)
+            continue
+        # About ten lines a second on average
+        seconds += rng.expovariate(10.0)
+        level = rng.choices(levels, weights)[0]
+        message = rng.choice(shapes[level]).format_map(_Fields(rng))
+        if int(seconds) != second:
+            second = int(seconds)
+            timestamp = (start + timedelta(seconds=second)).strftime(LOG_TIMESTAMP_FORMAT)
+        yield f"[{timestamp}] {level}: {message}"
+
+
+def iter_incidents(
+    count: int, seed: int = DEFAULT_SEED, start: datetime = DEFAULT_START
+) -> Iterator[Dict[str, str]]:
+    """Yield `count` incident reports in increasing time order."""
+    rng = random.Random(seed + 1)
+    severities = [severity for severity, _ in INCIDENT_SEVERITIES]
+    weights = [weight for _, weight in INCIDENT_SEVERITIES]
+    minutes = 0
+    for _ in range(count):
+        minutes += rng.randrange(1, 120)
+        title, description = rng.choice(INCIDENT_SHAPES)
+        yield {
+            "title": title,
+            "description": description.format_map(_Fields(rng)),
+            "timestamp": (start + timedelta(minutes=minutes)).isoformat(),
+            "severity": rng.choices(severities, weights)[0],
+        }
+
+
+def write_logs(path: str, count: int, seed: int = DEFAULT_SEED, **kwargs: Any) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        batch = []
+        for line in iter_log_lines(count, seed, **kwargs):
+            batch.append(line)
+            if len(batch) >= 10_000:
+                f.write("\n".join(batch) + "\n")
+                batch = []
+        if batch:
+            f.write("\n".join(batch) + "\n")
+
+
+def write_incidents(path: str, count: int, seed: int = DEFAULT_SEED, ndjson: bool = False) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        if ndjson:
+            for incident in iter_incidents(count, seed):
+                f.write(json.dumps(incident) + "\n")
+            return
+        f.write("[")
+        for i, incident in enumerate(iter_incidents(count, seed)):
+            f.write(",\n" if i else "\n")
+            f.write("    " + json.dumps(incident, indent=4).replace("\n", "\n    "))
+        f.write("\n]\n")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logs", type=int, default=1_000_000)
+    parser.add_argument("--incidents", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--malformed-rate", type=float, default=0.001)
+    parser.add_argument("--out-dir", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+    parser.add_argument("--ndjson", action="store_true", help="write incidents as NDJSON")
+    args = parser.parse_args()
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    logs_path = os.path.join(args.out_dir, "logs.txt")
+    incidents_path = os.path.join(args.out_dir, "incidents.ndjson" if args.ndjson else "incidents.json")
+    write_logs(logs_path, args.logs, args.seed, malformed_rate=args.malformed_rate)
+    write_incidents(incidents_path, args.incidents, args.seed, ndjson=args.ndjson)
+    print(json.dumps({
+        "logs": logs_path,
+        "log_lines": args.logs,
+        "incidents": incidents_path,
+        "incident_count": args.incidents,
+        "seed": args.seed
+    }, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
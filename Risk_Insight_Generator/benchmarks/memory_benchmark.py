@@ -0,0 +1,132 @@
+"""Memory benchmark for processed log storage.
+
+Processes the same synthetic log lines into four representations and
+reports the bytes each holds per line and per million lines:
+
+- dict_records: one dict per line with string timestamps, as process_logs()
+  used to build them
+- object_frame: those dicts as a DataFrame with object-dtype strings and
+  int64 numbers, as the dashboard used to build it
+- slot_records: process_logs()'s __slots__ LogRecords
+- compact_frame: process_logs_df() with categoricals, int8 and datetime64
+
+Fails if compact_frame does not use at least --min-ratio times less memory
+than object_frame.
+
+Usage:
+    python benchmarks/memory_benchmark.py [--lines 1000000] [--min-ratio 5]
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tracemalloc
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from data_processor import (  # noqa: E402
+    LOG_LINE_RE,
+    LOG_TIMESTAMP_FORMAT,
+    DataProcessor,
+    _logs_frame
+)
+
+MIN_RATIO = 5.0
+
+
+def synthetic_lines(count: int):
+    """Sample log messages with one-second increasing timestamps."""
+    with open(os.path.join(PROJECT_DIR, "data", "sample_logs.txt"), "r") as f:
+        bodies = [line.split("] ", 1)[1] for line in f.read().splitlines() if "] " in line]
+    start = datetime(2025, 1, 1)
+    return [
+        f"[{(start + timedelta(seconds=i)).strftime(LOG_TIMESTAMP_FORMAT)}] {bodies[i % len(bodies)]}"
+        for i in range(count)
+    ]
+
+
+def baseline_records(lines, processor: DataProcessor):
+    """process_logs() as it was: regex, strptime/strftime and a dict per line."""
+    records = []
+    for line in lines:
+        timestamp, level, message = LOG_LINE_RE.match(line.strip()).groups()
+        message = message.strip()
+        timestamp = datetime.strptime(timestamp, LOG_TIMESTAMP_FORMAT).strftime(LOG_TIMESTAMP_FORMAT)
+        records.append({
+            "timestamp": timestamp,
+            "severity": level,
+            "message": message,
+            "category": processor._categorize_log(message),
+            "priority": processor._determine_priority(level),
+            "time_to_resolve": processor._estimate_resolution_time(level),
+            "impact_level": processor._calculate_impact(message)
+        })
+    return records
+
+
+def traced_bytes(build):
+    """Run build() and return (result, bytes still allocated by it)."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+
+def frame_bytes(frame: pd.DataFrame) -> int:
+    return int(frame.memory_usage(deep=True).sum())
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=1_000_000)
+    parser.add_argument("--min-ratio", type=float, default=MIN_RATIO)
+    args = parser.parse_args()
+
+    lines = synthetic_lines(args.lines)
+    processor = DataProcessor(cache_dir="")
+    processor.logs = lines
+
+    dict_records, dict_bytes = traced_bytes(lambda: baseline_records(lines, processor))
+    object_frame = pd.DataFrame(dict_records).astype({
+        "severity": object, "message": object, "category": object, "time_to_resolve": object
+    })
+    object_frame["timestamp"] = pd.to_datetime(object_frame["timestamp"])
+    del dict_records
+    _, slot_bytes = traced_bytes(processor.process_logs)
+    compact_frame = _logs_frame(lines)
+
+    sizes = {
+        "dict_records": dict_bytes,
+        "object_frame": frame_bytes(object_frame),
+        "slot_records": slot_bytes,
+        "compact_frame": frame_bytes(compact_frame)
+    }
+    ratio = sizes["object_frame"] / sizes["compact_frame"]
+    print(json.dumps({
+        "lines": args.lines,
+        "bytes_per_line": {name: size / args.lines for name, size in sizes.items()},
+        "mb_per_million_lines": {
+            name: size / args.lines * 1_000_000 / 2**20 for name, size in sizes.items()
+        },
+        "compact_frame_vs_object_frame": ratio,
+        "compact_frame_vs_dict_records": sizes["dict_records"] / sizes["compact_frame"],
+        "slot_records_vs_dict_records": sizes["dict_records"] / sizes["slot_records"],
+        "min_ratio": args.min_ratio
+    }, indent=2))
+
+    if ratio < args.min_ratio:
+        print(f"FAIL: compact frame is only {ratio:.1f}x smaller, need {args.min_ratio:.1f}x")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
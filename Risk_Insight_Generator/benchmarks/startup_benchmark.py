@@ -0,0 +1,103 @@
+"""Cold-start benchmark for the Risk Signal Analyzer API.
+
+Starts a fresh interpreter with all outbound network access disabled,
+imports main and serves one GET /health through the in-process test
+client. Fails if the median import time or the median time from process
+spawn to a healthy response exceeds its budget.
+
+Usage:
+    python benchmarks/startup_benchmark.py [--runs 5] [--import-budget 1.5] [--ready-budget 3.0]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Budgets in seconds, measured on a developer laptop with headroom for CI
+IMPORT_BUDGET_SECONDS = 1.5
+READY_BUDGET_SECONDS = 3.0
+
+CHILD_SCRIPT = """
+import json, socket, sys, time
+
+def _offline(*args, **kwargs):
+    raise OSError("network access disabled by startup benchmark")
+
+socket.socket.connect = _offline
+socket.socket.connect_ex = _offline
+socket.create_connection = _offline
+socket.getaddrinfo = _offline
+
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+
+from fastapi.testclient import TestClient
+response = TestClient(main.app).get("/health")
+ready = time.perf_counter()
+
+print(json.dumps({
+    "status_code": response.status_code,
+    "import_seconds": imported - start,
+    "first_response_seconds": ready - imported,
+}))
+"""
+
+
+def run_once() -> dict:
+    """Start one cold interpreter and return its timings."""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT],
+        cwd=PROJECT_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    wall = time.perf_counter() - start
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["ready_seconds"] = wall
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-budget", type=float, default=IMPORT_BUDGET_SECONDS)
+    parser.add_argument("--ready-budget", type=float, default=READY_BUDGET_SECONDS)
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+    if any(run["status_code"] != 200 for run in runs):
+        print("FAIL: /health did not return 200")
+        return 1
+
+    import_median = statistics.median(run["import_seconds"] for run in runs)
+    ready_median = statistics.median(run["ready_seconds"] for run in runs)
+    print(json.dumps({
+        "runs": runs,
+        "import_median_seconds": import_median,
+        "ready_median_seconds": ready_median,
+        "import_budget_seconds": args.import_budget,
+        "ready_budget_seconds": args.ready_budget,
+    }, indent=2))
+
+    failed = False
+    if import_median > args.import_budget:
+        print(f"FAIL: import took {import_median:.3f}s, budget {args.import_budget:.3f}s")
+        failed = True
+    if ready_median > args.ready_budget:
+        print(f"FAIL: ready after {ready_median:.3f}s, budget {args.ready_budget:.3f}s")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
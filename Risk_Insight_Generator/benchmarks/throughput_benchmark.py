@@ -0,0 +1,299 @@
+"""Throughput and latency benchmark for processing and the API.
+
+Generates seeded synthetic data with generate_data.py. Each stage runs in
+its own interpreter, so every stage reports its own peak RSS:
+
+- process_logs, process_logs_df, process_incidents, process_incidents_df:
+  DataProcessor over the generated files
+- extract_risk_signals, extract_risk_signals_batch: keyword matching over
+  the incident descriptions
+- api_analyze_incident, api_analyze_log, api_incidents_batch: the
+  /analyze/* endpoints through the in-process ASGI test client, with the
+  result cache off, reporting p50/p99 request latency
+
+Every stage reports items per second and peak RSS. Results are printed
+and, with --output, saved as JSON with the commit they were measured on.
+With --compare, each stage's throughput and p99 latency are checked
+against an earlier results file, and the run fails if either regressed by
+more than --max-regression.
+
+Usage:
+    python benchmarks/throughput_benchmark.py [--logs 200000] [--incidents 20000]
+        [--seed 42] [--output results.json] [--compare baseline.json]
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generate_data import DEFAULT_SEED, write_incidents, write_logs  # noqa: E402
+
+MAX_REGRESSION = 0.2
+
+# Single-incident requests, and requests of the file upload stages
+REQUESTS = 200
+UPLOADS = 10
+# Lines per /analyze/log upload
+UPLOAD_LINES = 100_000
+
+
+def _timed(fn: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def _throughput(items: int, seconds: float) -> Dict[str, Any]:
+    return {"items": items, "seconds": seconds, "items_per_second": items / seconds}
+
+
+def _latencies(samples: List[float]) -> Dict[str, float]:
+    import numpy as np
+    milliseconds = np.array(samples) * 1000
+    return {
+        "requests": len(samples),
+        "p50_ms": float(np.percentile(milliseconds, 50)),
+        "p99_ms": float(np.percentile(milliseconds, 99)),
+    }
+
+
+def _read_lines(path: str) -> List[str]:
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read().splitlines()
+
+
+def _read_incidents(path: str) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def stage_process_logs(args) -> Dict[str, Any]:
+    from data_processor import DataProcessor
+    processor = DataProcessor(cache_dir="")
+    processor.logs = _read_lines(args.logs_path)
+    return _throughput(len(processor.logs), _timed(processor.process_logs))
+
+
+def stage_process_logs_df(args) -> Dict[str, Any]:
+    from data_processor import DataProcessor
+    processor = DataProcessor(cache_dir="")
+    processor.logs = _read_lines(args.logs_path)
+    return _throughput(len(processor.logs), _timed(processor.process_logs_df))
+
+
+def stage_process_incidents(args) -> Dict[str, Any]:
+    from data_processor import DataProcessor
+    processor = DataProcessor(cache_dir="")
+    processor.incidents = _read_incidents(args.incidents_path)
+    return _throughput(len(processor.incidents), _timed(processor.process_incidents))
+
+
+def stage_process_incidents_df(args) -> Dict[str, Any]:
+    from data_processor import DataProcessor
+    processor = DataProcessor(cache_dir="")
+    processor.incidents = _read_incidents(args.incidents_path)
+    return _throughput(len(processor.incidents), _timed(processor.process_incidents_df))
+
+
+def stage_extract_risk_signals(args) -> Dict[str, Any]:
+    import main
+    texts = [incident["description"] for incident in _read_incidents(args.incidents_path)]
+    return _throughput(len(texts), _timed(lambda: [main.extract_risk_signals(text) for text in texts]))
+
+
+def stage_extract_risk_signals_batch(args) -> Dict[str, Any]:
+    import main
+    texts = [incident["description"] for incident in _read_incidents(args.incidents_path)]
+    return _throughput(len(texts), _timed(lambda: main.extract_risk_signals_batch(texts)))
+
+
+def _client():
+    import main
+    from fastapi.testclient import TestClient
+    return TestClient(main.app)
+
+
+def stage_api_analyze_incident(args) -> Dict[str, Any]:
+    incidents = _read_incidents(args.incidents_path)
+    samples = []
+    with _client() as client:
+        for i in range(args.requests):
+            incident = incidents[i % len(incidents)]
+            start = time.perf_counter()
+            response = client.post("/analyze/incident", json=incident)
+            samples.append(time.perf_counter() - start)
+            response.raise_for_status()
+    return {**_throughput(len(samples), sum(samples)), **_latencies(samples)}
+
+
+def stage_api_analyze_log(args) -> Dict[str, Any]:
+    with open(args.logs_path, "rb") as f:
+        lines = f.read().split(b"\n")
+    slices = max(1, len(lines) // args.upload_lines)
+    samples = []
+    with _client() as client:
+        for i in range(args.uploads):
+            first = (i % slices) * args.upload_lines
+            body = b"\n".join(lines[first:first + args.upload_lines])
+            start = time.perf_counter()
+            response = client.post("/analyze/log", files={"file": ("logs.txt", body)})
+            samples.append(time.perf_counter() - start)
+            response.raise_for_status()
+    return {**_throughput(args.uploads * args.upload_lines, sum(samples)), **_latencies(samples)}
+
+
+def stage_api_incidents_batch(args) -> Dict[str, Any]:
+    incidents = _read_incidents(args.incidents_path)
+    body = "\n".join(json.dumps(incident) for incident in incidents).encode()
+    samples = []
+    with _client() as client:
+        for _ in range(args.uploads):
+            start = time.perf_counter()
+            response = client.post(
+                "/analyze/incidents/batch", content=body,
+                headers={"Content-Type": "application/x-ndjson"}
+            )
+            response.read()
+            samples.append(time.perf_counter() - start)
+            response.raise_for_status()
+    return {**_throughput(len(samples) * len(incidents), sum(samples)), **_latencies(samples)}
+
+
+STAGES = {
+    "process_logs": stage_process_logs,
+    "process_logs_df": stage_process_logs_df,
+    "process_incidents": stage_process_incidents,
+    "process_incidents_df": stage_process_incidents_df,
+    "extract_risk_signals": stage_extract_risk_signals,
+    "extract_risk_signals_batch": stage_extract_risk_signals_batch,
+    "api_analyze_incident": stage_api_analyze_incident,
+    "api_analyze_log": stage_api_analyze_log,
+    "api_incidents_batch": stage_api_incidents_batch,
+}
+
+
+def run_stage(name: str, args) -> Dict[str, Any]:
+    """Run one stage in a fresh interpreter and return its measurements."""
+    command = [
+        sys.executable, os.path.abspath(__file__), "--stage", name,
+        "--logs-path", args.logs_path, "--incidents-path", args.incidents_path,
+        "--requests", str(args.requests), "--uploads", str(args.uploads),
+        "--upload-lines", str(args.upload_lines)
+    ]
+    # Measure the work itself, not cached results or the startup follower
+    env = dict(os.environ, RISK_CACHE_TTL="0", RISK_FOLLOW_LOG="", PYTHONDONTWRITEBYTECODE="1")
+    completed = subprocess.run(
+        command, cwd=PROJECT_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def _child(args) -> int:
+    result = STAGES[args.stage](args)
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    result["peak_rss_mb"] = peak / (2**20 if sys.platform == "darwin" else 2**10)
+    print(json.dumps(result))
+    return 0
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], max_regression: float) -> List[str]:
+    """Regressions of throughput or p99 latency beyond max_regression, as messages."""
+    failures = []
+    for name, stage in results["stages"].items():
+        before = baseline.get("stages", {}).get(name)
+        if not before:
+            continue
+        ratio = stage["items_per_second"] / before["items_per_second"]
+        if ratio < 1 - max_regression:
+            failures.append(f"{name}: throughput {ratio:.2f}x of {baseline.get('commit')}")
+        if "p99_ms" in stage and "p99_ms" in before:
+            ratio = stage["p99_ms"] / before["p99_ms"]
+            if ratio > 1 + max_regression:
+                failures.append(f"{name}: p99 latency {ratio:.2f}x of {baseline.get('commit')}")
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logs", type=int, default=200_000)
+    parser.add_argument("--incidents", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--requests", type=int, default=REQUESTS)
+    parser.add_argument("--uploads", type=int, default=UPLOADS)
+    parser.add_argument("--upload-lines", type=int, default=UPLOAD_LINES)
+    parser.add_argument("--stages", default=",".join(STAGES),
+                        help="comma-separated subset of: " + ", ".join(STAGES))
+    parser.add_argument("--output", help="save results to this JSON file")
+    parser.add_argument("--compare", help="results JSON of an earlier run to check against")
+    parser.add_argument("--max-regression", type=float, default=MAX_REGRESSION)
+    parser.add_argument("--stage", help=argparse.SUPPRESS)
+    parser.add_argument("--logs-path", help=argparse.SUPPRESS)
+    parser.add_argument("--incidents-path", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.stage:
+        return _child(args)
+
+    stages = [name.strip() for name in args.stages.split(",") if name.strip()]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        args.logs_path = os.path.join(data_dir, "logs.txt")
+        args.incidents_path = os.path.join(data_dir, "incidents.json")
+        write_logs(args.logs_path, args.logs, args.seed)
+        write_incidents(args.incidents_path, args.incidents, args.seed)
+        results = {
+            "commit": _commit(),
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "config": {
+                "logs": args.logs, "incidents": args.incidents, "seed": args.seed,
+                "requests": args.requests, "uploads": args.uploads,
+                "upload_lines": args.upload_lines
+            },
+            "stages": {name: run_stage(name, args) for name in stages}
+        }
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            failures = compare(results, json.load(f), args.max_regression)
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        if failures:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
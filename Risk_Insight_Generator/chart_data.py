@@ -0,0 +1,118 @@
+"""Helpers that bound how much data the dashboard sends to the browser."""
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# Points per chart trace; enough to look continuous on any screen
+MAX_CHART_POINTS = 1000
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Indices of the points Largest-Triangle-Three-Buckets keeps.
+
+    Keeps the first and last points, and from each of threshold - 2 equal
+    buckets in between the point forming the largest triangle with the
+    point kept before it and the average of the next bucket, so peaks and
+    dips survive.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = x.astype("float64")
+    y = y.astype("float64")
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x = x[end:edges[i + 2]].mean()
+            next_y = y[end:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        # Twice the triangle area; the constant factor does not change argmax
+        area = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(area))
+        kept[i + 1] = previous
+    return kept
+
+
+def minmax_indices(y: np.ndarray, threshold: int) -> np.ndarray:
+    """Indices of each bucket's minimum and maximum, in order.
+
+    Cheaper than LTTB and guarantees every extreme is kept.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 2:
+        return np.arange(n)
+    buckets = np.array_split(np.arange(n), threshold // 2)
+    kept = set()
+    for bucket in buckets:
+        values = y[bucket]
+        kept.add(bucket[int(np.argmin(values))])
+        kept.add(bucket[int(np.argmax(values))])
+    return np.array(sorted(kept), dtype=np.int64)
+
+
+def downsample_series(
+    series: pd.Series, max_points: int = MAX_CHART_POINTS, method: str = "lttb"
+) -> pd.Series:
+    """Reduce a series indexed by time (or numbers) to at most max_points."""
+    if len(series) <= max_points:
+        return series
+    y = series.to_numpy(dtype="float64", na_value=np.nan)
+    y = np.nan_to_num(y)
+    if method == "minmax":
+        kept = minmax_indices(y, max_points)
+    else:
+        kept = lttb_indices(_numeric_index(series.index), y, max_points)
+    return series.iloc[kept]
+
+
+def downsample_frame(frame: pd.DataFrame, max_points: int = MAX_CHART_POINTS) -> pd.DataFrame:
+    """Downsample a multi-series frame (e.g. counts per category) on shared rows.
+
+    Rows are picked by LTTB over the row totals, so every column keeps the
+    same x positions and stacked charts stay consistent.
+    """
+    if len(frame) <= max_points:
+        return frame
+    totals = frame.sum(axis=1, numeric_only=True).to_numpy(dtype="float64")
+    return frame.iloc[lttb_indices(_numeric_index(frame.index), totals, max_points)]
+
+
+def recent_page(
+    frame: pd.DataFrame,
+    page: int = 1,
+    page_size: int = 10,
+    order: Optional[np.ndarray] = None,
+    column: str = "timestamp"
+) -> pd.DataFrame:
+    """Rows page by page, newest first, without sorting the whole frame.
+
+    Uses `order` (from newest_first_order) when given. Otherwise the page is
+    cut from an nlargest top-k selection, which is O(n log k).
+    """
+    start = (page - 1) * page_size
+    if order is not None:
+        return frame.take(order[start:start + page_size])
+    return frame.nlargest(start + page_size, column).iloc[start:]
+
+
+def newest_first_order(timestamps: pd.Series) -> np.ndarray:
+    """Positions of rows sorted by timestamp, newest first, for paging."""
+    return np.argsort(timestamps.to_numpy(), kind="stable")[::-1].copy()
+
+
+def _numeric_index(index: pd.Index) -> np.ndarray:
+    if isinstance(index, pd.DatetimeIndex):
+        return index.asi8.astype("float64")
+    try:
+        return index.to_numpy(dtype="float64")
+    except (TypeError, ValueError):
+        return np.arange(len(index), dtype="float64")
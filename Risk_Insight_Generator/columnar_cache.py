@@ -0,0 +1,255 @@
+import hashlib
+import json
+import os
+import threading
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (parquet engine for pandas)
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+CACHE_FORMAT_VERSION = 4
+# Bytes read at a time when hashing an append-only source's processed prefix
+HASH_BLOCK_SIZE = 1 << 20
+# Appends beyond this many part files are compacted into one
+MAX_PARTS = 32
+
+# Turns raw bytes into a processed frame plus malformed-record counts
+Builder = Callable[[bytes], Tuple[pd.DataFrame, Counter]]
+
+
+class ColumnarCache:
+    """On-disk Parquet cache of processed source files.
+
+    Each source gets a directory holding its processed rows as one or more
+    Parquet parts and a meta.json recording the source's size and mtime.
+    A source whose size and mtime still match is reloaded from Parquet
+    without being read. Otherwise whole sources are hashed (blake2b), and
+    are only parsed again when the content hash changed.
+
+    Append-only sources (plain-text logs) instead record how many bytes of
+    complete lines the parts cover, and the content hash of that prefix.
+    When the file has changed but the prefix still hashes the same, it has
+    only been appended to: just the new bytes are processed and stored as
+    an extra part. The prefix is hashed in the same pass that reads the new
+    bytes, and the hasher carries on over them to give the next prefix
+    hash, so every byte is read once per changed load. A trailing line
+    with no newline yet is processed on every load and never persisted,
+    since it may still be extended.
+
+    Without pyarrow the cache is disabled and every load rebuilds.
+    """
+
+    def __init__(self, cache_dir: str, enabled: bool = True):
+        self.cache_dir = cache_dir
+        self.enabled = enabled and PARQUET_AVAILABLE
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.appends = 0
+        self.misses = 0
+
+    def load(
+        self, kind: str, path: str, build: Builder, appendable: bool = False
+    ) -> Tuple[pd.DataFrame, Counter]:
+        """Return build()'s result for the file at path, reusing cached parts.
+
+        `kind` separates entries for the same file processed different ways.
+        With appendable=True, build() must accept any run of complete lines,
+        so a grown file only needs its new lines processed.
+        """
+        if not self.enabled:
+            with open(path, "rb") as f:
+                return build(f.read())
+        with self._lock:
+            if appendable:
+                return self._load_appendable(kind, path, build)
+            return self._load_whole(kind, path, build)
+
+    def _entry_dir(self, kind: str, path: str) -> str:
+        path = os.path.abspath(path)
+        digest = hashlib.blake2b(path.encode("utf-8"), digest_size=8).hexdigest()
+        return os.path.join(self.cache_dir, f"{kind}-{os.path.basename(path)}-{digest}")
+
+    def _load_whole(self, kind: str, path: str, build: Builder) -> Tuple[pd.DataFrame, Counter]:
+        entry = self._entry_dir(kind, path)
+        meta = self._read_meta(entry)
+        stat = os.stat(path)
+        if meta is not None and _unchanged(meta, stat):
+            self.hits += 1
+            return self._read_parts(entry, meta), Counter(meta["malformed"])
+        with open(path, "rb") as f:
+            data = f.read()
+        content_hash = hashlib.blake2b(data).hexdigest()
+        if meta is not None and meta["content_hash"] == content_hash:
+            # Touched or copied, not changed: remember the new size and mtime
+            self.hits += 1
+            self._write_meta(entry, dict(meta, size=stat.st_size, mtime_ns=stat.st_mtime_ns))
+            return self._read_parts(entry, meta), Counter(meta["malformed"])
+
+        self.misses += 1
+        frame, malformed = build(data)
+        self._write_parts(entry, [frame])
+        self._write_meta(entry, {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "content_hash": content_hash,
+            "parts": ["part-00000.parquet"],
+            "malformed": dict(malformed)
+        })
+        return frame, malformed
+
+    def _load_appendable(
+        self, kind: str, path: str, build: Builder
+    ) -> Tuple[pd.DataFrame, Counter]:
+        entry = self._entry_dir(kind, path)
+        meta = self._read_meta(entry)
+        stat = os.stat(path)
+        digest = hashlib.blake2b()
+        with open(path, "rb") as f:
+            changed = meta is None or not _unchanged(meta, stat)
+            if changed and meta is not None and (
+                meta["processed_bytes"] > stat.st_size
+                or _hash_prefix(digest, f, meta["processed_bytes"]) != meta["prefix_hash"]
+            ):
+                # Truncated or rewritten: start over from the first byte
+                meta = None
+                digest = hashlib.blake2b()
+            processed = meta["processed_bytes"] if meta is not None else 0
+            f.seek(processed)
+            tail = f.read()
+        # Only complete lines are persisted; a trailing fragment may still grow
+        cut = tail.rfind(b"\n") + 1
+        processed += cut
+
+        complete, fragment = tail[:cut], tail[cut:]
+        parts = list(meta["parts"]) if meta is not None else []
+        malformed = Counter(meta["malformed"]) if meta is not None else Counter()
+        frames = [self._read_parts(entry, meta)] if meta is not None else []
+
+        if meta is not None and not complete:
+            self.hits += 1
+        elif meta is not None:
+            self.appends += 1
+        else:
+            self.misses += 1
+            self._clear(entry)
+
+        if complete or meta is None:
+            digest.update(complete)
+            frame, counts = build(complete)
+            frames.append(frame)
+            malformed.update(counts)
+            if len(parts) >= MAX_PARTS:
+                # Fold everything cached so far into a single part
+                frames = [concat_frames(frames)]
+                self._clear(entry)
+                parts = []
+            parts.append(f"part-{len(parts):05d}.parquet")
+            self._write_parts(entry, frames[-1:], parts[-1:])
+            self._write_meta(entry, {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "processed_bytes": processed,
+                "prefix_hash": digest.hexdigest(),
+                "parts": parts,
+                "malformed": dict(malformed)
+            })
+        elif changed:
+            # Only the unfinished last line changed
+            self._write_meta(entry, dict(meta, size=stat.st_size, mtime_ns=stat.st_mtime_ns))
+
+        if fragment:
+            frame, counts = build(fragment)
+            frames.append(frame)
+            malformed.update(counts)
+        return concat_frames(frames), malformed
+
+    def _read_meta(self, entry: str) -> Optional[Dict]:
+        try:
+            with open(os.path.join(entry, "meta.json"), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get("version") != CACHE_FORMAT_VERSION:
+            return None
+        if not all(os.path.exists(os.path.join(entry, part)) for part in meta["parts"]):
+            return None
+        return meta
+
+    def _write_meta(self, entry: str, meta: Dict) -> None:
+        meta = dict(meta, version=CACHE_FORMAT_VERSION)
+        target = os.path.join(entry, "meta.json")
+        with open(target + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(target + ".tmp", target)
+
+    def _read_parts(self, entry: str, meta: Dict) -> pd.DataFrame:
+        return concat_frames(
+            [pd.read_parquet(os.path.join(entry, part)) for part in meta["parts"]]
+        )
+
+    def _write_parts(
+        self, entry: str, frames: List[pd.DataFrame], names: Optional[List[str]] = None
+    ) -> None:
+        os.makedirs(entry, exist_ok=True)
+        names = names or [f"part-{i:05d}.parquet" for i in range(len(frames))]
+        for frame, name in zip(frames, names):
+            target = os.path.join(entry, name)
+            frame.to_parquet(target + ".tmp", index=False)
+            os.replace(target + ".tmp", target)
+
+    def _clear(self, entry: str) -> None:
+        if not os.path.isdir(entry):
+            return
+        for name in os.listdir(entry):
+            os.remove(os.path.join(entry, name))
+
+    def stats(self) -> Dict[str, int]:
+        """Hit (no parsing), append (new tail only) and miss (full build) counts."""
+        return {"hits": self.hits, "appends": self.appends, "misses": self.misses}
+
+
+def concat_frames(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate frames, keeping categorical columns categorical.
+
+    pd.concat falls back to plain values when the frames' category sets
+    differ (e.g. severities first seen in a later batch), so those columns
+    are first widened to the union of their categories.
+    """
+    if len(frames) == 1:
+        return frames[0]
+    frames = list(frames)
+    for column, dtype in frames[0].dtypes.items():
+        if not isinstance(dtype, pd.CategoricalDtype):
+            continue
+        categories = list(dict.fromkeys(
+            value for frame in frames for value in frame[column].cat.categories
+        ))
+        frames = [
+            frame if list(frame[column].cat.categories) == categories
+            else frame.assign(**{column: frame[column].cat.set_categories(categories)})
+            for frame in frames
+        ]
+    return pd.concat(frames, ignore_index=True)
+
+
+def _unchanged(meta: Dict, stat: os.stat_result) -> bool:
+    """Whether a file still has the size and mtime recorded in meta."""
+    return meta["size"] == stat.st_size and meta["mtime_ns"] == stat.st_mtime_ns
+
+
+def _hash_prefix(digest, f, length: int) -> str:
+    """Feed f's first length bytes into digest and return its hex digest so far."""
+    f.seek(0)
+    while length > 0:
+        block = f.read(min(HASH_BLOCK_SIZE, length))
+        if not block:
+            break
+        digest.update(block)
+        length -= len(block)
+    return digest.hexdigest()
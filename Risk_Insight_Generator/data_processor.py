@@ -1,138 +1,826 @@
+import glob
+import gzip
+import io
 import json
+import pickle
+import re
+import sys
+import tempfile
+from collections import Counter
+from collections.abc import Mapping
+import numpy as np
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator, Optional, TextIO, Tuple, Union
+
+from columnar_cache import ColumnarCache, concat_frames
+from log_follower import LogFollower, RollingLogStore
+from rollups import TimeRollup
+from search_index import SearchIndex
+from spike_detector import SpikeDetector
+from template_miner import TemplateMiner
+
+# "[2025-06-17 18:00:30] ERROR: High latency detected in database queries"
+# ASCII-only classes keep Python's re and pandas' Arrow regex engine in agreement
+LOG_LINE_PATTERN = r"^\[([0-9]{4}-[0-9]{2}-[0-9]{2} [0-9]{2}:[0-9]{2}:[0-9]{2})\] ([A-Za-z]+):(.*)$"
+LOG_LINE_RE = re.compile(LOG_LINE_PATTERN)
+LOG_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Reasons a log line is skipped, as counted in DataProcessor.malformed_logs
+MALFORMED_BLANK = "blank"
+MALFORMED_FORMAT = "unrecognized_format"
+MALFORMED_TIMESTAMP = "invalid_timestamp"
+
+# Categories are checked in order; the first one with a matching keyword wins
+CATEGORY_KEYWORDS = [
+    ("performance", ("latency", "performance")),
+    ("network", ("network", "connectivity")),
+    ("data", ("data", "backup")),
+    ("security", ("security", "authentication")),
+]
+
+# The highest weight among contained keywords is the impact level (minimum 1)
+IMPACT_KEYWORDS = {
+    "critical": 5,
+    "error": 4,
+    "failure": 4,
+    "high": 4,
+    "slow": 3,
+    "degradation": 3,
+    "warning": 2
+}
+
+# Every word log classification looks for; tokens containing one are kept
+# verbatim in log templates, so a template classifies like each of its lines
+LOG_CLASSIFICATION_WORDS = [
+    *(keyword for _, keywords in CATEGORY_KEYWORDS for keyword in keywords),
+    *IMPACT_KEYWORDS
+]
+
+PRIORITY_BY_SEVERITY = {"HIGH": 1, "MEDIUM": 2}
+DEFAULT_PRIORITY = 3
+RESOLUTION_TIME_BY_SEVERITY = {"HIGH": "1-2 hours", "MEDIUM": "2-4 hours"}
+DEFAULT_RESOLUTION_TIME = "4+ hours"
+
+# Fixed category sets, so frames from different batches share one dtype
+CATEGORY_VALUES = [category for category, _ in CATEGORY_KEYWORDS] + ["unknown"]
+RESOLUTION_TIME_VALUES = list(dict.fromkeys(
+    [*RESOLUTION_TIME_BY_SEVERITY.values(), DEFAULT_RESOLUTION_TIME]
+))
+
+INCIDENT_COLUMNS = ["title", "description", "timestamp", "severity"]
+
+# Characters that can extend a JSON number past where a prefix of it ends
+NUMBER_CONTINUATION_CHARS = "0123456789.eE+-"
+
+# Rows per chunk when log shards are spilled and merged
+SHARD_CHUNK_ROWS = 65_536
+
+class MalformedLogLine(ValueError):
+    """Raised for a log line that cannot be parsed; `reason` says why."""
+
+    def __init__(self, reason: str, line: str):
+        super().__init__(f"{reason}: {line!r}")
+        self.reason = reason
+        self.line = line
+
+class _Record(Mapping):
+    """Read-only mapping over __slots__, so records carry no per-instance dict."""
+
+    __slots__ = ()
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.__slots__)
+
+    def __len__(self) -> int:
+        return len(self.__slots__)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)!r})"
+
+class LogRecord(_Record):
+    """A processed log line; reads like the dict process_logs() used to build."""
+
+    __slots__ = ("timestamp", "severity", "message", "category",
+                 "priority", "time_to_resolve", "impact_level")
+
+    def __init__(self, timestamp, severity, message, category,
+                 priority, time_to_resolve, impact_level):
+        self.timestamp = timestamp
+        self.severity = severity
+        self.message = message
+        self.category = category
+        self.priority = priority
+        self.time_to_resolve = time_to_resolve
+        self.impact_level = impact_level
+
+class IncidentRecord(_Record):
+    """A processed incident; reads like the dict process_incidents() used to build."""
+
+    __slots__ = ("title", "description", "timestamp", "severity", "category",
+                 "priority", "time_to_resolve", "impact_level")
+
+    def __init__(self, title, description, timestamp, severity, category,
+                 priority, time_to_resolve, impact_level):
+        self.title = title
+        self.description = description
+        self.timestamp = timestamp
+        self.severity = severity
+        self.category = category
+        self.priority = priority
+        self.time_to_resolve = time_to_resolve
+        self.impact_level = impact_level
 
 class DataProcessor:
-    def __init__(self):
+    def __init__(self, log_source: Optional[str] = None, cache_dir: Optional[str] = None):
         base_dir = os.path.dirname(__file__)
         data_dir = os.path.join(base_dir, "data")
 
         self.data_dir = data_dir
+        # A log file, a directory of (optionally gzipped) log shards, or a glob
+        self.log_source = log_source or os.path.join(data_dir, "sample_logs.txt")
+        # Processed frames persisted as Parquet; an empty directory disables it
+        if cache_dir is None:
+            cache_dir = os.environ.get("RISK_DATA_CACHE_DIR", os.path.join(data_dir, ".cache"))
+        self.cache = ColumnarCache(cache_dir, enabled=bool(cache_dir))
         self.incidents = []
         self.logs = []
+        # Skipped log lines by reason, for the most recent processing pass
+        self.malformed_logs: Counter = Counter()
+        # Message templates of the most recent process_logs()/iter_logs() pass
+        self.log_templates = self._template_miner()
         
     def load_sample_data(self) -> None:
-        """Load sample data from JSON and log files."""
+        """Load the sample incidents and the lines of the log source."""
         # Load incidents
         with open(os.path.join(self.data_dir, "sample_incidents.json"), "r") as f:
             self.incidents = json.load(f)
             
         # Load logs
-        with open(os.path.join(self.data_dir, "sample_logs.txt"), "r") as f:
-            self.logs = f.read().splitlines()
+        self.logs = []
+        for path in resolve_log_files(self.log_source):
+            with open_log_file(path) as f:
+                self.logs.extend(f.read().splitlines())
             
-    def process_incidents(self) -> List[Dict[str, Any]]:
+    def process_incidents(self) -> List[IncidentRecord]:
         """Process and enrich incident data."""
-        processed_incidents = []
-        for incident in self.incidents:
-            processed = {
-                "title": incident["title"],
-                "description": incident["description"],
-                "timestamp": incident["timestamp"],
-                "severity": incident["severity"],
-                "category": self._categorize_incident(incident["description"]),
-                "priority": self._determine_priority(incident["severity"]),
-                "time_to_resolve": self._estimate_resolution_time(incident["severity"]),
-                "impact_level": self._calculate_impact(incident["description"])
-            }
-            processed_incidents.append(processed)
-        return processed_incidents
-    
-    def process_logs(self) -> List[Dict[str, Any]]:
-        """Process and enrich log data."""
+        return [self._process_incident(incident) for incident in self.incidents]
+    
+    def process_logs(self) -> List[LogRecord]:
+        """Process and enrich log data, counting skipped lines by reason.
+
+        Messages are grouped into templates (log_templates, first/last
+        seen as 1-based line numbers) as they are read, and each template
+        is categorized and scored once.
+        """
+        self.malformed_logs = Counter()
+        self.log_templates = self._template_miner()
         processed_logs = []
-        for log in self.logs:
+        for line_number, log in enumerate(self.logs, 1):
             try:
-                timestamp, level, message = self._parse_log_entry(log)
-                processed = {
-                    "timestamp": timestamp,
-                    "severity": level,
-                    "message": message,
-                    "category": self._categorize_log(message),
-                    "priority": self._determine_priority(level),
-                    "time_to_resolve": self._estimate_resolution_time(level),
-                    "impact_level": self._calculate_impact(message)
-                }
-                processed_logs.append(processed)
-            except ValueError:
-                continue
+                processed_logs.append(self._process_log(log, self.log_templates, line_number))
+            except MalformedLogLine as error:
+                self.malformed_logs[error.reason] += 1
         return processed_logs
     
+    def process_incidents_df(self) -> pd.DataFrame:
+        """Process incidents column-wise into a DataFrame.
+
+        Same rows and values as process_incidents(), with the timestamp
+        column already converted to datetime64.
+        """
+        return _incidents_frame(self.incidents)
+    
+    def process_logs_df(self) -> pd.DataFrame:
+        """Process logs column-wise into a DataFrame.
+
+        Parses every line with one vectorized regex match and one
+        fixed-format datetime conversion, then derives the enrichment
+        columns with vectorized masks. Same rows and values as
+        process_logs(), with the timestamp column already datetime64.
+        """
+        self.malformed_logs = Counter()
+        return _logs_frame(self.logs, self.malformed_logs)
+    
+    def load_incidents_df(self, path: Optional[str] = None) -> pd.DataFrame:
+        """Processed incidents for a JSON or NDJSON file, via the columnar cache.
+
+        Shaped like process_incidents_df(). The file (sample_incidents.json
+        by default) is only parsed again when its content hash changes.
+        """
+        path = path or os.path.join(self.data_dir, "sample_incidents.json")
+        frame, _ = self.cache.load("incidents", path, _incident_bytes_frame)
+        return frame
+    
+    def load_logs_df(self, path: Optional[str] = None) -> pd.DataFrame:
+        """Processed logs for plain or gzipped log files, via the columnar cache.
+
+        Shaped like process_logs_df(). An unchanged file (of the log source
+        by default) is reloaded without parsing; a plain-text file that has
+        only been appended to has just its new lines parsed. A directory or
+        glob is loaded file by file in resolve_log_files() order. Sets
+        malformed_logs for all the files.
+        """
+        frames = []
+        self.malformed_logs = Counter()
+        for file_path in resolve_log_files(path or self.log_source):
+            if _is_gzip(file_path):
+                frame, malformed = self.cache.load("logs", file_path, _gzip_log_bytes_frame)
+            else:
+                frame, malformed = self.cache.load(
+                    "logs", file_path, _log_bytes_frame, appendable=True
+                )
+            frames.append(frame)
+            self.malformed_logs.update(malformed)
+        return concat_frames(frames) if frames else _logs_frame([])
+    
+    def follow_logs(
+        self,
+        path: Optional[str] = None,
+        checkpoint_path: Optional[str] = None,
+        max_rows: int = 100_000,
+        max_age: Optional[float] = None,
+        poll_interval: float = 1.0,
+        index: Optional[SearchIndex] = None,
+        detector: Optional[SpikeDetector] = None
+    ) -> LogFollower:
+        """Tail a live log file into a bounded in-memory RollingLogStore.
+
+        Returns an unstarted LogFollower; call poll() to ingest on demand or
+        start() to poll in the background. New lines go through the same
+        processing as process_logs_df(), and the store (follower.store)
+        keeps at most max_rows rows, and none older than max_age seconds
+        behind the newest. follower.store.rollup holds hourly and daily
+        aggregates of everything read. New lines are also added to `index`
+        and counted by `detector` for rate spikes, when given. With
+        checkpoint_path the byte offset survives restarts.
+        """
+        path = path or self.log_source
+        store = RollingLogStore(
+            max_rows=max_rows, max_age=max_age, rollup=TimeRollup(), index=index,
+            detector=detector
+        )
+        return LogFollower(
+            path, store, _logs_frame,
+            checkpoint_path=checkpoint_path, poll_interval=poll_interval
+        )
+    
+    def build_search_index(self, include_logs: bool = True) -> SearchIndex:
+        """Inverted index over the processed incidents and, optionally, logs.
+
+        Records come from load_incidents_df() and load_logs_df(). Add later
+        records with SearchIndex.add_frame() or a follower's index.
+        """
+        index = SearchIndex()
+        index.add_frame(self.load_incidents_df(), "incident")
+        if include_logs:
+            index.add_frame(self.load_logs_df(), "log")
+        return index
+    
+    def mine_log_templates(
+        self, frame: Optional[pd.DataFrame] = None
+    ) -> Tuple[pd.DataFrame, np.ndarray]:
+        """Group processed log messages into templates in one pass.
+
+        Takes a frame shaped like process_logs_df() (load_logs_df() by
+        default). Returns one row per template, most frequent first, with
+        its count, first and last timestamp, example messages, category and
+        impact_level, plus the template_id of every row of the frame, so
+        each line maps back to its template's classification.
+        """
+        if frame is None:
+            frame = self.load_logs_df()
+        miner = self._template_miner()
+        # Nanosecond integers compare much faster than datetime64 scalars
+        timestamps = frame["timestamp"].to_numpy(dtype="datetime64[ns]").view("int64").tolist()
+        template_ids = np.fromiter(
+            (miner.add(message, seen).id
+             for message, seen in zip(frame["message"].tolist(), timestamps)),
+            dtype=np.int32, count=len(frame)
+        )
+        return _templates_frame(miner), template_ids
+    
+    def iter_logs(
+        self, path: Optional[str] = None, chunksize: Optional[int] = None
+    ) -> Iterator[Union[LogRecord, pd.DataFrame]]:
+        """Stream processed logs from a file without loading it into memory.
+
+        The file (the log source by default; a directory or glob is read
+        file by file in resolve_log_files() order) is read line by line.
+        Yields one LogRecord per valid line, as process_logs() would build
+        it (updating log_templates), or with chunksize, DataFrames of up to
+        that many input lines shaped like process_logs_df(). Skipped lines
+        are counted in malformed_logs as the stream is consumed.
+        """
+        lines = _iter_log_lines(resolve_log_files(path or self.log_source))
+        self.malformed_logs = Counter()
+        self.log_templates = self._template_miner()
+        if chunksize:
+            for batch in _batched(lines, chunksize):
+                yield _logs_frame(batch, self.malformed_logs)
+            return
+        for line_number, log in enumerate(lines, 1):
+            try:
+                yield self._process_log(log, self.log_templates, line_number)
+            except MalformedLogLine as error:
+                self.malformed_logs[error.reason] += 1
+    
+    def process_log_shards_df(
+        self, source: Optional[str] = None, processes: Optional[int] = None
+    ) -> pd.DataFrame:
+        """Process every log shard of a source in parallel, ordered by timestamp.
+
+        Concatenates the chunks iter_log_shard_frames() merges, so there is
+        no global sort. Ties keep shard order.
+        """
+        frames = list(self.iter_log_shard_frames(source, processes))
+        return concat_frames(frames) if frames else _logs_frame([])
+    
+    def iter_log_shards(
+        self, source: Optional[str] = None, processes: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield processed log records from all shards in timestamp order.
+
+        Records come from the chunks of iter_log_shard_frames(), so only a
+        chunk per shard is held at a time.
+        """
+        for frame in self.iter_log_shard_frames(source, processes):
+            yield from _iter_frame_records(frame)
+    
+    def iter_log_shard_frames(
+        self,
+        source: Optional[str] = None,
+        processes: Optional[int] = None,
+        chunk_rows: int = SHARD_CHUNK_ROWS
+    ) -> Iterator[pd.DataFrame]:
+        """Yield the processed logs of all shards as timestamp-ordered chunks.
+
+        Each shard (file) is parsed and sorted on its own in a process pool
+        and spilled to a temporary run file in chunks of chunk_rows rows.
+        The runs are then k-way merged lazily by merge_sorted_runs(), so
+        memory holds about one chunk per shard rather than every shard.
+        Ties keep shard order. malformed_logs is set once all shards are
+        parsed.
+        """
+        paths = resolve_log_files(source or self.log_source)
+        with tempfile.TemporaryDirectory(prefix="risk-shards-") as spill_dir:
+            run_paths = [os.path.join(spill_dir, f"{i}.run") for i in range(len(paths))]
+            chunk_sizes = [chunk_rows] * len(paths)
+            if len(paths) <= 1 or processes == 1:
+                results = list(map(_sort_log_shard, paths, run_paths, chunk_sizes))
+            else:
+                with ProcessPoolExecutor(max_workers=processes) as pool:
+                    results = list(pool.map(_sort_log_shard, paths, run_paths, chunk_sizes))
+            self.malformed_logs = Counter()
+            for malformed in results:
+                self.malformed_logs.update(malformed)
+            yield from merge_sorted_runs([_iter_run(run_path) for run_path in run_paths])
+    
+    def iter_incidents(
+        self, path: Optional[str] = None, chunksize: Optional[int] = None
+    ) -> Iterator[Union[IncidentRecord, pd.DataFrame]]:
+        """Stream processed incidents from a JSON array or NDJSON file.
+
+        The file (sample_incidents.json by default) is decoded one record at
+        a time. Yields IncidentRecords as process_incidents() builds them, or
+        with chunksize, DataFrames shaped like process_incidents_df().
+        """
+        path = path or os.path.join(self.data_dir, "sample_incidents.json")
+        with open(path, "r", encoding="utf-8") as f:
+            incidents = _iter_json_records(f)
+            if chunksize:
+                for batch in _batched(incidents, chunksize):
+                    yield _incidents_frame(batch)
+                return
+            for incident in incidents:
+                yield self._process_incident(incident)
+    
+    def _process_incident(self, incident: Dict[str, Any]) -> IncidentRecord:
+        """Enrich a single incident."""
+        severity = sys.intern(incident["severity"])
+        return IncidentRecord(
+            title=incident["title"],
+            description=incident["description"],
+            timestamp=incident["timestamp"],
+            severity=severity,
+            category=self._categorize_incident(incident["description"]),
+            priority=self._determine_priority(severity),
+            time_to_resolve=self._estimate_resolution_time(severity),
+            impact_level=self._calculate_impact(incident["description"])
+        )
+    
+    def _process_log(
+        self, log: str, templates: Optional[TemplateMiner] = None, line_number: Optional[int] = None
+    ) -> LogRecord:
+        """Parse and enrich a single log line, raising MalformedLogLine if malformed.
+
+        With templates, the category and impact come from the line's
+        template, classified once per template.
+        """
+        timestamp, level, message = self._parse_log_entry(log)
+        # One shared string per level rather than one per line
+        level = sys.intern(level)
+        if templates is not None:
+            category, impact = templates.add(message, line_number).classification
+        else:
+            category, impact = self._classify_log_message(message)
+        return LogRecord(
+            timestamp=timestamp,
+            severity=level,
+            message=message,
+            category=category,
+            priority=self._determine_priority(level),
+            time_to_resolve=self._estimate_resolution_time(level),
+            impact_level=impact
+        )
+    
+    def _classify_log_message(self, message: str) -> Tuple[str, int]:
+        """Category and impact level of a log message."""
+        return self._categorize_log(message), self._calculate_impact(message)
+    
+    def _template_miner(self) -> TemplateMiner:
+        return TemplateMiner(
+            classify=self._classify_log_message, protected_words=LOG_CLASSIFICATION_WORDS
+        )
+    
     def _parse_log_entry(self, log: str) -> tuple:
         """Parse log entry into timestamp, level, and message."""
-        timestamp_str, level, message = log.strip()[1:].split(" ", 2)
-        timestamp = datetime.strptime(timestamp_str, "%Y-%m-%d %H:%M:%S")
-        return timestamp.strftime("%Y-%m-%d %H:%M:%S"), level, message
+        return parse_log_line(log)
     
     def _categorize_incident(self, description: str) -> str:
         """Categorize incident based on description."""
-        if "latency" in description.lower() or "performance" in description.lower():
-            return "performance"
-        elif "network" in description.lower() or "connectivity" in description.lower():
-            return "network"
-        elif "data" in description.lower() or "backup" in description.lower():
-            return "data"
-        elif "security" in description.lower() or "authentication" in description.lower():
-            return "security"
-        return "unknown"
+        return self._categorize_log(description)
     
     def _categorize_log(self, message: str) -> str:
         """Categorize log message based on content."""
-        if "latency" in message.lower() or "performance" in message.lower():
-            return "performance"
-        elif "network" in message.lower() or "connectivity" in message.lower():
-            return "network"
-        elif "data" in message.lower() or "backup" in message.lower():
-            return "data"
-        elif "security" in message.lower() or "authentication" in message.lower():
-            return "security"
+        message = message.lower()
+        for category, keywords in CATEGORY_KEYWORDS:
+            if any(keyword in message for keyword in keywords):
+                return category
         return "unknown"
     
     def _determine_priority(self, severity: str) -> int:
         """Determine priority level based on severity."""
-        if severity == "HIGH":
-            return 1
-        elif severity == "MEDIUM":
-            return 2
-        return 3
+        return PRIORITY_BY_SEVERITY.get(severity, DEFAULT_PRIORITY)
     
     def _estimate_resolution_time(self, severity: str) -> str:
         """Estimate time to resolve based on severity."""
-        if severity == "HIGH":
-            return "1-2 hours"
-        elif severity == "MEDIUM":
-            return "2-4 hours"
-        return "4+ hours"
+        return RESOLUTION_TIME_BY_SEVERITY.get(severity, DEFAULT_RESOLUTION_TIME)
     
     def _calculate_impact(self, text: str) -> int:
         """Calculate impact level based on keywords in text."""
-        impact_keywords = {
-            "critical": 5,
-            "error": 4,
-            "failure": 4,
-            "high": 4,
-            "warning": 3,
-            "slow": 3,
-            "degradation": 3,
-            "warning": 2
-        }
-        
         impact = 1
         text_lower = text.lower()
-        for keyword, weight in impact_keywords.items():
+        for keyword, weight in IMPACT_KEYWORDS.items():
             if keyword in text_lower:
                 impact = max(impact, weight)
         return impact
 
+def _incidents_frame(incidents: Iterable[Dict[str, Any]]) -> pd.DataFrame:
+    """Vectorized process_incidents over a batch of raw incidents."""
+    incidents = pd.DataFrame(list(incidents), columns=INCIDENT_COLUMNS)
+    description = incidents["description"].str.lower()
+    return pd.DataFrame({
+        "title": incidents["title"],
+        "description": incidents["description"],
+        "timestamp": pd.to_datetime(incidents["timestamp"]),
+        "severity": incidents["severity"].astype("category"),
+        "category": _categorize_series(description),
+        "priority": _priority_series(incidents["severity"]),
+        "time_to_resolve": _resolution_time_series(incidents["severity"]),
+        "impact_level": _impact_series(description)
+    })
+
+def _templates_frame(miner: TemplateMiner) -> pd.DataFrame:
+    """One row per mined log template, most frequent first."""
+    templates = miner.templates()
+    return pd.DataFrame({
+        "template_id": pd.Series([t.id for t in templates], dtype=np.int32),
+        "template": pd.Series([t.template for t in templates], dtype=str),
+        "count": pd.Series([t.count for t in templates], dtype=np.int64),
+        "first_seen": pd.to_datetime([t.first_seen for t in templates]),
+        "last_seen": pd.to_datetime([t.last_seen for t in templates]),
+        "examples": [t.examples for t in templates],
+        "category": pd.Categorical(
+            [t.classification[0] for t in templates], categories=CATEGORY_VALUES
+        ),
+        "impact_level": pd.Series([t.classification[1] for t in templates], dtype=np.int8)
+    })
+
+def parse_log_line(line: str) -> tuple:
+    """Parse "[YYYY-MM-DD HH:MM:SS] LEVEL: message" into (datetime64, level, message).
+
+    Checks the fixed-width prefix by position instead of running a regex
+    and strptime, and converts the timestamp straight to a datetime64[s].
+    Raises MalformedLogLine with the reason the line was rejected.
+    """
+    line = line.strip()
+    if not line:
+        raise MalformedLogLine(MALFORMED_BLANK, line)
+    # Shortest valid line is "[<19-char timestamp>] L:"
+    if len(line) < 24 or line[0] != "[" or line[20:22] != "] ":
+        raise MalformedLogLine(MALFORMED_FORMAT, line)
+    timestamp = line[1:20]
+    separators = timestamp[4] + timestamp[7] + timestamp[10] + timestamp[13] + timestamp[16]
+    digits = (timestamp[0:4] + timestamp[5:7] + timestamp[8:10]
+              + timestamp[11:13] + timestamp[14:16] + timestamp[17:19])
+    colon = line.find(":", 22)
+    level = line[22:colon]
+    if (separators != "-- ::" or not (digits.isascii() and digits.isdigit())
+            or colon < 0 or not (level.isascii() and level.isalpha())):
+        raise MalformedLogLine(MALFORMED_FORMAT, line)
+    try:
+        parsed = np.datetime64(timestamp, "s")
+    except ValueError:
+        raise MalformedLogLine(MALFORMED_TIMESTAMP, line) from None
+    return parsed, level, line[colon + 1:].strip()
+
+def _logs_frame(logs: List[str], malformed: Optional[Counter] = None) -> pd.DataFrame:
+    """Vectorized process_logs over a batch of raw log lines.
+
+    Skipped lines are added to `malformed` by reason when it is given.
+    """
+    lines = pd.Series(logs, dtype=str).str.strip()
+    matched = lines.str.match(LOG_LINE_PATTERN).to_numpy(dtype=bool)
+    blank = (lines == "").to_numpy(dtype=bool)
+    lines = lines[matched]
+    timestamps = pd.to_datetime(
+        lines.str.slice(1, 20), format=LOG_TIMESTAMP_FORMAT, errors="coerce"
+    )
+    # Well-formed lines with an impossible date are rejected as well;
+    # to_datetime would roll a leap second over into the next minute
+    valid = timestamps.notna() & (lines.str.slice(18, 20) < "60")
+    if malformed is not None:
+        counts = {
+            MALFORMED_BLANK: int(blank.sum()),
+            MALFORMED_FORMAT: int((~matched & ~blank).sum()),
+            MALFORMED_TIMESTAMP: int((~valid).sum())
+        }
+        malformed.update({reason: n for reason, n in counts.items() if n})
+    # Matched lines are "[<19-char timestamp>] LEVEL:message"
+    rest = lines[valid].reset_index(drop=True).str.slice(22)
+    severity = rest.str.replace(r":.*$", "", regex=True)
+    message = rest.str.replace(r"^[A-Za-z]+:", "", regex=True).str.strip()
+    lowered = message.str.lower()
+    return pd.DataFrame({
+        "timestamp": timestamps[valid].reset_index(drop=True),
+        "severity": severity.astype("category"),
+        "message": message,
+        "category": _categorize_series(lowered),
+        "priority": _priority_series(severity),
+        "time_to_resolve": _resolution_time_series(severity),
+        "impact_level": _impact_series(lowered)
+    })
+
+def _log_bytes_frame(data: bytes) -> Tuple[pd.DataFrame, Counter]:
+    """Cache builder: process raw log file bytes into a frame and malformed counts."""
+    malformed = Counter()
+    return _logs_frame(data.decode("utf-8").splitlines(), malformed), malformed
+
+def _gzip_log_bytes_frame(data: bytes) -> Tuple[pd.DataFrame, Counter]:
+    """Cache builder for gzip-compressed log files."""
+    return _log_bytes_frame(gzip.decompress(data))
+
+def _incident_bytes_frame(data: bytes) -> Tuple[pd.DataFrame, Counter]:
+    """Cache builder: process a JSON array or NDJSON incident file."""
+    incidents = _iter_json_records(io.StringIO(data.decode("utf-8")))
+    return _incidents_frame(incidents), Counter()
+
+def resolve_log_files(source: str) -> List[str]:
+    """Expand a log file, directory or glob into a naturally sorted file list."""
+    if os.path.isdir(source):
+        paths = [
+            os.path.join(source, name) for name in os.listdir(source)
+            if not name.startswith(".") and os.path.isfile(os.path.join(source, name))
+        ]
+    elif glob.has_magic(source):
+        paths = [path for path in glob.glob(source) if os.path.isfile(path)]
+    else:
+        paths = [source]
+    # "app.log.2.gz" sorts before "app.log.10.gz"
+    return sorted(paths, key=lambda path: [
+        int(part) if part.isdigit() else part for part in re.split(r"(\d+)", path)
+    ])
+
+def open_log_file(path: str) -> TextIO:
+    """Open a plain or gzip-compressed log file for text reading."""
+    if _is_gzip(path):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+def _is_gzip(path: str) -> bool:
+    """Detect gzip compression by magic bytes rather than file extension."""
+    with open(path, "rb") as f:
+        return f.read(2) == b"\x1f\x8b"
+
+def _iter_log_lines(paths: List[str]) -> Iterator[str]:
+    """Yield the lines of plain or gzipped log files, one file after another."""
+    for path in paths:
+        with open_log_file(path) as f:
+            yield from f
+
+def _sort_log_shard(path: str, run_path: str, chunk_rows: int) -> Counter:
+    """Parse one log shard, sort it by timestamp and spill it to run_path.
+
+    Runs in a worker process. The run is written as pickled frames of
+    chunk_rows rows; returns the shard's malformed-line counts.
+    """
+    malformed = Counter()
+    with open_log_file(path) as f:
+        frame = _logs_frame(f.read().splitlines(), malformed)
+    frame = frame.sort_values("timestamp", kind="stable", ignore_index=True)
+    with open(run_path, "wb") as f:
+        for start in range(0, len(frame), chunk_rows):
+            pickle.dump(frame.iloc[start:start + chunk_rows], f, pickle.HIGHEST_PROTOCOL)
+    return malformed
+
+def _iter_run(run_path: str) -> Iterator[pd.DataFrame]:
+    """Read back the chunks _sort_log_shard() spilled, one at a time."""
+    with open(run_path, "rb") as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+def merge_sorted_runs(runs: List[Iterable[pd.DataFrame]]) -> Iterator[pd.DataFrame]:
+    """Lazily k-way merge runs of timestamp-sorted frames into sorted frames.
+
+    Like heapq.merge, a chunk at a time: rows older than the smallest last
+    timestamp buffered from an unfinished run cannot be preceded by any
+    unread row, so they are emitted, and the runs that set that bound are
+    read further. About one chunk per run is held at once. Ties keep run
+    order.
+    """
+    runs = [iter(run) for run in runs]
+    buffered: List[Optional[pd.DataFrame]] = [None] * len(runs)
+    unfinished = set(range(len(runs)))
+
+    def read(i: int) -> None:
+        frame = next(runs[i], None)
+        if frame is None:
+            unfinished.discard(i)
+        elif buffered[i] is None or buffered[i].empty:
+            buffered[i] = frame
+        else:
+            buffered[i] = concat_frames([buffered[i], frame])
+
+    for i in range(len(runs)):
+        read(i)
+    while True:
+        for i in list(unfinished):
+            while i in unfinished and (buffered[i] is None or buffered[i].empty):
+                read(i)
+        bound = min(
+            (buffered[i]["timestamp"].iat[-1] for i in unfinished), default=None
+        )
+        ready = []
+        for i, frame in enumerate(buffered):
+            if frame is None or frame.empty:
+                continue
+            if bound is None:
+                split = len(frame)
+            else:
+                split = frame["timestamp"].searchsorted(bound, side="left")
+            if split:
+                ready.append(frame.iloc[:split])
+                buffered[i] = frame.iloc[split:]
+        if ready:
+            merged = concat_frames(ready)
+            # Stable, so equal timestamps keep run order
+            order = np.argsort(merged["timestamp"].to_numpy(), kind="stable")
+            yield merged.take(order).reset_index(drop=True)
+        if bound is None:
+            return
+        for i in list(unfinished):
+            if buffered[i]["timestamp"].iat[-1] == bound:
+                read(i)
+
+def _iter_frame_records(frame: pd.DataFrame) -> Iterator[Dict[str, Any]]:
+    """Yield a DataFrame's rows as dicts one at a time."""
+    columns = list(frame.columns)
+    for row in frame.itertuples(index=False, name=None):
+        yield dict(zip(columns, row))
+
+def _batched(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Group an iterable into lists of at most size items."""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _iter_json_records(f: TextIO, buffer_size: int = 1 << 16) -> Iterator[Any]:
+    """Decode records one at a time from a JSON array or NDJSON stream.
+
+    Only the record being decoded is buffered, so arbitrarily large files
+    are read in constant memory.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    in_array = None
+    eof = False
+    while True:
+        # Skip whitespace and the array's separators between records
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            position += 1
+        if position < len(buffer) and in_array is None:
+            in_array = buffer[position] == "["
+            if in_array:
+                position += 1
+                continue
+        if position < len(buffer) and in_array and buffer[position] == "]":
+            return
+        if position < len(buffer):
+            try:
+                record, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                # A number running up to the end of the buffer, or stopping at
+                # a partial fraction or exponent ("3." of "3.5"), may continue
+                # in the next read
+                number = isinstance(record, (int, float)) and not isinstance(record, bool)
+                if eof or (end < len(buffer) and not (
+                        number and buffer[end] in NUMBER_CONTINUATION_CHARS)):
+                    yield record
+                    position = end
+                    continue
+        if eof:
+            return
+        chunk = f.read(buffer_size)
+        eof = not chunk
+        buffer = buffer[position:] + chunk
+        position = 0
+
+def _contains_any(lowered: pd.Series, keywords) -> np.ndarray:
+    """Boolean mask of rows containing any of the keywords."""
+    pattern = "|".join(re.escape(keyword) for keyword in keywords)
+    return lowered.str.contains(pattern, regex=True).to_numpy(dtype=bool)
+
+def _categorize_series(lowered: pd.Series) -> pd.Series:
+    """Vectorized _categorize_log over already-lowercased text, as a categorical."""
+    masks = [_contains_any(lowered, keywords) for _, keywords in CATEGORY_KEYWORDS]
+    codes = np.select(masks, range(len(masks)), default=len(masks)).astype(np.int8)
+    return pd.Series(
+        pd.Categorical.from_codes(codes, categories=CATEGORY_VALUES), index=lowered.index
+    )
+
+def _severity_lookup(severity: pd.Series, table: Dict[str, Any], default: Any) -> np.ndarray:
+    """Vectorized table.get(severity, default) using equality masks."""
+    masks = [(severity == key).to_numpy(dtype=bool) for key in table]
+    return np.select(masks, list(table.values()), default=default)
+
+def _priority_series(severity: pd.Series) -> pd.Series:
+    """Vectorized _determine_priority."""
+    priority = _severity_lookup(severity, PRIORITY_BY_SEVERITY, DEFAULT_PRIORITY)
+    return pd.Series(priority.astype(np.int8), index=severity.index)
+
+def _resolution_time_series(severity: pd.Series) -> pd.Series:
+    """Vectorized _estimate_resolution_time, as a categorical."""
+    codes = {value: code for code, value in enumerate(RESOLUTION_TIME_VALUES)}
+    resolution_codes = _severity_lookup(
+        severity,
+        {key: codes[value] for key, value in RESOLUTION_TIME_BY_SEVERITY.items()},
+        codes[DEFAULT_RESOLUTION_TIME]
+    )
+    return pd.Series(
+        pd.Categorical.from_codes(resolution_codes.astype(np.int8), categories=RESOLUTION_TIME_VALUES),
+        index=severity.index
+    )
+
+def _impact_series(lowered: pd.Series) -> pd.Series:
+    """Vectorized _calculate_impact over already-lowercased text."""
+    # One mask per distinct weight, highest first, so np.select picks the max
+    weights = sorted(set(IMPACT_KEYWORDS.values()), reverse=True)
+    masks = [
+        _contains_any(lowered, [k for k, w in IMPACT_KEYWORDS.items() if w == weight])
+        for weight in weights
+    ]
+    return pd.Series(np.select(masks, weights, default=1).astype(np.int8), index=lowered.index)
+
 def load_and_process_data():
-    """Load and process all sample data."""
+    """Load and process all sample data.
+
+    Reuses the columnar cache, so only changed or newly appended data is
+    parsed. Returns lists of record dicts.
+    """
     processor = DataProcessor()
-    processor.load_sample_data()
     
-    incidents = processor.process_incidents()
-    logs = processor.process_logs()
+    incidents = processor.load_incidents_df().to_dict("records")
+    logs = processor.load_logs_df().to_dict("records")
     
     return incidents, logs
 
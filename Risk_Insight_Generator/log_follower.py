@@ -0,0 +1,352 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import Counter, deque
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+from columnar_cache import concat_frames
+from rollups import TimeRollup
+from search_index import SearchIndex
+from spike_detector import SpikeDetector
+
+logger = logging.getLogger(__name__)
+
+# Bytes at the start of a file compared to recognise it across polls and
+# restarts
+HEAD_HASH_BYTES = 1024
+
+# Turns decoded lines into a processed frame, counting skipped lines by reason
+LineProcessor = Callable[[List[str], Counter], pd.DataFrame]
+
+
+class RollingLogStore:
+    """Bounded in-memory store of processed log rows, oldest evicted first.
+
+    Rows are appended as frames. Once more than max_rows are held, or rows
+    are older than max_age seconds relative to the newest timestamp seen,
+    the oldest rows are dropped. An optional TimeRollup, SearchIndex and
+    SpikeDetector are updated with every appended frame and keep covering
+    rows after they are evicted.
+    """
+
+    def __init__(
+        self,
+        max_rows: int = 100_000,
+        max_age: Optional[float] = None,
+        rollup: Optional[TimeRollup] = None,
+        index: Optional[SearchIndex] = None,
+        detector: Optional[SpikeDetector] = None
+    ):
+        self.max_rows = max_rows
+        self.max_age = max_age
+        self.rollup = rollup
+        self.index = index
+        self.detector = detector
+        self._frames: deque = deque()
+        self._rows = 0
+        self._snapshot: Optional[pd.DataFrame] = None
+        self._newest = None
+        self._lock = threading.Lock()
+        self.appended_rows = 0
+        self.evicted_rows = 0
+
+    def append(self, frame: pd.DataFrame) -> None:
+        if frame.empty:
+            return
+        with self._lock:
+            self._frames.append(frame)
+            self._rows += len(frame)
+            self.appended_rows += len(frame)
+            newest = frame["timestamp"].max()
+            if self._newest is None or newest > self._newest:
+                self._newest = newest
+            self._evict()
+            self._snapshot = None
+        if self.rollup is not None:
+            self.rollup.update(frame)
+        if self.index is not None:
+            self.index.add_frame(frame, "log")
+        if self.detector is not None:
+            self.detector.update(frame)
+
+    def _evict(self) -> None:
+        if self.max_age is not None:
+            cutoff = self._newest - pd.Timedelta(seconds=self.max_age)
+            while self._frames:
+                head = self._frames[0]
+                keep = (head["timestamp"] >= cutoff).to_numpy()
+                if keep.all():
+                    break
+                self._drop_head(head, head[keep].reset_index(drop=True))
+        while self._rows > self.max_rows:
+            head = self._frames[0]
+            excess = self._rows - self.max_rows
+            self._drop_head(head, head.iloc[excess:].reset_index(drop=True))
+
+    def _drop_head(self, head: pd.DataFrame, remaining: pd.DataFrame) -> None:
+        self._frames.popleft()
+        dropped = len(head) - len(remaining)
+        self._rows -= dropped
+        self.evicted_rows += dropped
+        if not remaining.empty:
+            self._frames.appendleft(remaining)
+
+    def frame(self) -> pd.DataFrame:
+        """All retained rows in arrival order."""
+        with self._lock:
+            if self._snapshot is None:
+                if not self._frames:
+                    return pd.DataFrame()
+                self._snapshot = concat_frames(list(self._frames))
+                # Later appends see the merged frame as a single block
+                self._frames = deque([self._snapshot])
+            return self._snapshot
+
+    def tail(self, n: int) -> pd.DataFrame:
+        """The n most recently appended rows."""
+        return self.frame().tail(n)
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "rows": self._rows,
+                "max_rows": self.max_rows,
+                "max_age_seconds": self.max_age,
+                "appended_rows": self.appended_rows,
+                "evicted_rows": self.evicted_rows
+            }
+
+
+class LogFollower:
+    """Tail a log file, feeding only new complete lines into a RollingLogStore.
+
+    The read position is a byte offset, optionally persisted as a JSON
+    checkpoint together with the file's device, inode and a hash of its
+    first bytes, so a restart resumes where it stopped as long as it is
+    still the same file. Rotation by rename (the path now names a new
+    file) drains the old file before switching to the new one from its
+    start. Truncation or a rewrite in place (the file shrank below the
+    offset, or its first HEAD_HASH_BYTES bytes changed) restarts from the
+    beginning; a rewrite that keeps those bytes and is at least as long
+    is indistinguishable from appends. A line without its newline yet is
+    held back until it is complete.
+
+    In the background thread a failing poll is logged and counted in
+    status() and polling carries on; lines whose processing failed are
+    skipped. The checkpoint is only rewritten when the position changed.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        store: RollingLogStore,
+        process: LineProcessor,
+        checkpoint_path: Optional[str] = None,
+        poll_interval: float = 1.0,
+        read_size: int = 1 << 20
+    ):
+        self.path = path
+        self.store = store
+        self.process = process
+        self.checkpoint_path = checkpoint_path
+        self.poll_interval = poll_interval
+        self.read_size = read_size
+        self.malformed: Counter = Counter()
+        self.rotations = 0
+        self.truncations = 0
+        self.lines_read = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+        self.failing = False
+        self._file = None
+        self._identity = None
+        # Offset of the first byte not yet consumed as part of a complete line
+        self._offset = 0
+        self._pending = b""
+        # The file's first bytes as read, up to HEAD_HASH_BYTES
+        self._head = b""
+        # (identity, offset, truncations) last written to the checkpoint
+        self._saved = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def poll(self) -> int:
+        """Read and process whatever has been appended; return the rows added."""
+        with self._lock:
+            if self._file is None and not self._open():
+                return 0
+            if self._truncated():
+                # Checked before reading, so no bytes of the new content
+                # are read from the old offset
+                self.truncations += 1
+                self._file.seek(0)
+                self._offset = 0
+                self._pending = b""
+                self._head = b""
+            rows = self._read_available()
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                # Rotated away and not recreated yet; keep the old handle
+                stat = None
+            if stat is not None and (stat.st_dev, stat.st_ino) != self._identity:
+                # Rotated: finish the old file, then start the new one from 0
+                rows += self._read_available(final=True)
+                self._close()
+                self.rotations += 1
+                if self._open(resume=False):
+                    rows += self._read_available()
+            self._save_checkpoint()
+            return rows
+
+    def _open(self, resume: bool = True) -> bool:
+        try:
+            self._file = open(self.path, "rb")
+        except FileNotFoundError:
+            return False
+        stat = os.fstat(self._file.fileno())
+        self._identity = (stat.st_dev, stat.st_ino)
+        self._offset = 0
+        self._pending = b""
+        self._head = b""
+        checkpoint = self._load_checkpoint() if resume else None
+        if (checkpoint is not None
+                and (checkpoint["device"], checkpoint["inode"]) == self._identity
+                and checkpoint["offset"] <= stat.st_size
+                and checkpoint["head_hash"] == self._head_hash(checkpoint["offset"])):
+            self._offset = checkpoint["offset"]
+            self._head = self._read_head(self._offset)
+        self._file.seek(self._offset)
+        return True
+
+    def _close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+        self._file = None
+        self._identity = None
+
+    def _read_available(self, final: bool = False) -> int:
+        """Process complete lines up to EOF; with final, also a trailing partial line."""
+        rows = 0
+        while True:
+            chunk = self._file.read(self.read_size)
+            if chunk:
+                self._pending += chunk
+                if len(self._head) < HEAD_HASH_BYTES:
+                    self._head += chunk[:HEAD_HASH_BYTES - len(self._head)]
+            cut = self._pending.rfind(b"\n") + 1
+            if final and not chunk:
+                cut = len(self._pending)
+            if cut:
+                complete, self._pending = self._pending[:cut], self._pending[cut:]
+                self._offset += len(complete)
+                lines = complete.decode("utf-8", errors="replace").splitlines()
+                self.lines_read += len(lines)
+                frame = self.process(lines, self.malformed)
+                self.store.append(frame)
+                rows += len(frame)
+            if not chunk:
+                return rows
+
+    def _truncated(self) -> bool:
+        """Whether the open file is shorter than what was read, or starts differently."""
+        if os.fstat(self._file.fileno()).st_size < self._offset + len(self._pending):
+            return True
+        return self._read_head(len(self._head)) != self._head
+
+    def _read_head(self, length: int) -> bytes:
+        """The first bytes of the open file, up to length and HEAD_HASH_BYTES."""
+        position = self._file.tell()
+        self._file.seek(0)
+        head = self._file.read(min(length, HEAD_HASH_BYTES))
+        self._file.seek(position)
+        return head
+
+    def _head_hash(self, length: int) -> str:
+        """Hash of the first bytes of the open file, up to length."""
+        return hashlib.blake2b(self._read_head(length), digest_size=16).hexdigest()
+
+    def _load_checkpoint(self) -> Optional[Dict[str, Any]]:
+        if not self.checkpoint_path:
+            return None
+        try:
+            with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_checkpoint(self) -> None:
+        if not self.checkpoint_path or self._file is None:
+            return
+        position = (self._identity, self._offset, self.truncations)
+        if position == self._saved:
+            return
+        checkpoint = {
+            "path": os.path.abspath(self.path),
+            "device": self._identity[0],
+            "inode": self._identity[1],
+            "offset": self._offset,
+            "head_hash": self._head_hash(self._offset)
+        }
+        directory = os.path.dirname(self.checkpoint_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.checkpoint_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(checkpoint, f)
+        os.replace(self.checkpoint_path + ".tmp", self.checkpoint_path)
+        self._saved = position
+
+    def start(self) -> None:
+        """Poll in a background daemon thread until stop() is called."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="log-follower", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.poll()
+                self.failing = False
+            except Exception as e:
+                # Often transient (a full disk, a file briefly unreadable)
+                logger.exception("Polling %s failed", self.path)
+                self.errors += 1
+                self.last_error = f"{type(e).__name__}: {e}"
+                self.failing = True
+            self._stop.wait(self.poll_interval)
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            self._close()
+
+    def status(self) -> Dict[str, Any]:
+        """Read position and counters, plus the store's retention stats."""
+        return {
+            "path": self.path,
+            "running": self._thread is not None and self._thread.is_alive(),
+            "offset": self._offset,
+            "lines_read": self.lines_read,
+            "rotations": self.rotations,
+            "truncations": self.truncations,
+            "errors": self.errors,
+            "last_error": self.last_error,
+            "failing": self.failing,
+            "malformed": dict(self.malformed),
+            "store": self.store.stats()
+        }
@@ -1,20 +1,102 @@
-from fastapi import FastAPI, UploadFile, File
-from pydantic import BaseModel
-import pandas as pd
-import nltk
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-from sklearn.feature_extraction.text import TfidfVectorizer
+from fastapi import FastAPI, UploadFile, File, Request, HTTPException, Query
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, ValidationError
 from datetime import datetime
+import asyncio
+import hashlib
 import json
-from typing import List, Dict
-
-# Download required NLTK data
-nltk.download('punkt')
-nltk.download('stopwords')
+import os
+import re
+import time
+from bisect import bisect_right
+from typing import Any, AsyncIterator, List, Dict, Optional, Set, Tuple
+from service_common.executor import ExecutorSaturated, ExecutorTimeout, WorkExecutor
+from service_common.metrics import PROMETHEUS_CONTENT_TYPE, MetricsMiddleware, record_stage, registry, span
+from result_cache import ResultCache, content_key
+from template_miner import TemplateMiner
 
 app = FastAPI(title="Risk Signal Analyzer")
 
+# Every request is timed by route into GET /metrics, together with the
+# spans of its stages. RISK_SERVER_TIMING=1 also reports the spans in a
+# Server-Timing response header; RISK_PROFILE_SAMPLE_RATE (0-1) runs that
+# share of requests under cProfile, dumping stats into RISK_PROFILE_DIR.
+app.add_middleware(MetricsMiddleware, **MetricsMiddleware.options_from_env("RISK_"))
+
+# CPU-bound analysis runs here so the event loop keeps serving other requests
+# (including /health). Configured with RISK_EXECUTOR_KIND (thread|process),
+# RISK_EXECUTOR_WORKERS, RISK_EXECUTOR_MAX_PENDING, RISK_EXECUTOR_TIMEOUT and
+# RISK_EXECUTOR_RETRY_AFTER.
+executor = WorkExecutor.from_env("RISK_EXECUTOR_")
+
+# Results of identical inputs are reused; keys include the keyword rules
+# version, so editing RISK_CATEGORIES bypasses every older entry. Configured
+# with RISK_CACHE_MAX_ENTRIES and RISK_CACHE_TTL (seconds, 0 disables).
+result_cache = ResultCache(
+    max_entries=int(os.environ.get("RISK_CACHE_MAX_ENTRIES", 4096)),
+    ttl=float(os.environ.get("RISK_CACHE_TTL", 600))
+)
+
+# Follow mode: when RISK_FOLLOW_LOG names a log file it is tailed in the
+# background into a bounded in-memory store served by GET /logs/recent.
+# RISK_FOLLOW_CHECKPOINT persists the read offset across restarts;
+# RISK_FOLLOW_MAX_ROWS, RISK_FOLLOW_MAX_AGE (seconds, 0 keeps all) and
+# RISK_FOLLOW_INTERVAL (seconds between polls) tune it. Rate spikes per
+# category and severity are served by GET /alerts; RISK_ALERT_WINDOWS
+# (comma-separated seconds), RISK_ALERT_BASELINE (buckets),
+# RISK_ALERT_THRESHOLD (deviations) and RISK_ALERT_MIN_COUNT tune them.
+log_follower = None
+
+# GET /search queries an inverted index over the processed incidents and
+# logs, built on the first request. In follow mode the followed log's new
+# lines are added to it as they are read, instead of the static log file.
+search_index = None
+_search_index_lock = asyncio.Lock()
+MAX_SEARCH_LIMIT = 200
+
+@app.exception_handler(ExecutorSaturated)
+async def executor_saturated_handler(request: Request, exc: ExecutorSaturated):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+@app.exception_handler(ExecutorTimeout)
+async def executor_timeout_handler(request: Request, exc: ExecutorTimeout):
+    return JSONResponse(status_code=504, content={"detail": str(exc)})
+
+@app.on_event("startup")
+def start_log_follower():
+    global log_follower
+    path = os.environ.get("RISK_FOLLOW_LOG")
+    if not path:
+        return
+    # Imported here so the API only loads pandas when follow mode is on
+    from data_processor import DataProcessor
+    from search_index import SearchIndex
+    from spike_detector import SpikeDetector
+    max_age = float(os.environ.get("RISK_FOLLOW_MAX_AGE", 0))
+    log_follower = DataProcessor(cache_dir="").follow_logs(
+        path,
+        checkpoint_path=os.environ.get("RISK_FOLLOW_CHECKPOINT") or None,
+        max_rows=int(os.environ.get("RISK_FOLLOW_MAX_ROWS", 100_000)),
+        max_age=max_age if max_age > 0 else None,
+        poll_interval=float(os.environ.get("RISK_FOLLOW_INTERVAL", 1.0)),
+        index=SearchIndex(),
+        detector=SpikeDetector.from_env("RISK_ALERT_")
+    )
+    log_follower.start()
+
+@app.on_event("shutdown")
+def shutdown_executor():
+    executor.shutdown()
+
+@app.on_event("shutdown")
+def stop_log_follower():
+    if log_follower is not None:
+        log_follower.stop()
+
 # Define data models
 class IncidentReport(BaseModel):
     title: str
@@ -32,6 +114,36 @@ class AnalysisSummary(BaseModel):
     risk_signals: List[RiskSignal]
     overall_severity: str
     recommendations: List[str]
+    severity_counts: Dict[str, int] = {}
+
+class SignalAggregate(BaseModel):
+    category: str
+    keyword: str
+    severity: str
+    count: int
+    first_line: int
+    last_line: int
+    sample_lines: List[str]
+
+class LogAnalysisSummary(AnalysisSummary):
+    signal_aggregates: List[SignalAggregate]
+    lines_processed: int
+    invalid_utf8_sequences: int
+    invalid_utf8_lines: int
+
+class LogTemplateSummary(BaseModel):
+    template: str
+    count: int
+    first_line: int
+    last_line: int
+    sample_lines: List[str]
+    risk_signals: List[RiskSignal]
+
+class LogTemplatesSummary(BaseModel):
+    templates: List[LogTemplateSummary]
+    template_count: int
+    lines_processed: int
+    ungrouped_lines: int
 
 # Risk categories and keywords
 RISK_CATEGORIES = {
@@ -41,34 +153,157 @@ RISK_CATEGORIES = {
     "data": ["corruption", "loss", "integrity", "backup", "restore"]
 }
 
+HIGH_SEVERITY_KEYWORDS = {"breach", "attack", "failure"}
+
+# Characters the NLTK word tokenizer always split on (NUL separates the
+# texts of a batch scan)
+_TOKEN_SEPARATORS = "\\s\\x00;@#$%&?!*()\\[\\]{}<>\"`«»“”‘’„\\u2012-\\u2015"
+# A keyword starts a token after a separator, a colon or comma, "--", "..",
+# or a quote that does not follow a word character
+_KEYWORD_START = (
+    rf"(?<!\w)(?:(?<=[{_TOKEN_SEPARATORS}:,])|^|(?<=(?<!-)--)|(?<=\.\.)|(?<=(?<!\w)'))"
+)
+# ...and ends it before a separator, a colon or comma not followed by a
+# digit, "--", "..", "''", a sentence-final period, or a closing quote or
+# clitic
+_KEYWORD_END = (
+    rf"(?=$|[{_TOKEN_SEPARATORS}]|[:,](?!\d)|--|\.\.|''|\.[\])}}>\"'»”’]*(?:[\s\x00]|$)"
+    rf"|'(?:[smd]|ll|re|ve)?(?:[{_TOKEN_SEPARATORS}]|$))"
+)
+
+class RiskKeywordMatcher:
+    """Finds every risk keyword in a text with one compiled regex scan."""
+
+    def __init__(self, categories: Dict[str, List[str]]):
+        # (category, keyword, severity) in RISK_CATEGORIES order
+        self.rules: List[Tuple[str, str, str]] = []
+        for category, keywords in categories.items():
+            for keyword in keywords:
+                keyword = " ".join(keyword.lower().split())
+                severity = "HIGH" if keyword in HIGH_SEVERITY_KEYWORDS else "MEDIUM"
+                self.rules.append((category, keyword, severity))
+
+        keywords = {keyword for _, keyword, _ in self.rules}
+        # Longest alternative first so a phrase wins over a keyword it starts with;
+        # the shorter keyword is then reported through the prefix table below.
+        alternation = "|".join(
+            r"\s+".join(re.escape(word) for word in keyword.split())
+            for keyword in sorted(keywords, key=len, reverse=True)
+        )
+        # Zero-width lookahead so overlapping keywords ("packet loss" and "loss")
+        # are all found. Boundaries mirror where the NLTK word tokenizer used
+        # before split words: "x-loss", "backup.log" and "crash^" stayed single
+        # tokens, while "breach--attack", "breach;attack" and "crash." did not.
+        self.pattern = re.compile(
+            _KEYWORD_START + f"(?=({alternation}){_KEYWORD_END})",
+            re.IGNORECASE
+        )
+        # Every whitespace-free piece a keyword match can span
+        self.words: Set[str] = {word for keyword in keywords for word in keyword.split()}
+        self.prefixes: Dict[str, Set[str]] = {
+            keyword: {
+                other for other in keywords
+                if other != keyword and keyword.startswith(other + " ")
+            }
+            for keyword in keywords
+        }
+
+    def find(self, text: str) -> Set[str]:
+        """Return the set of keywords that occur in text."""
+        found = set()
+        for match in self.pattern.finditer(text):
+            keyword = " ".join(match.group(1).lower().split())
+            found.add(keyword)
+            found.update(self.prefixes[keyword])
+        return found
+
+    def find_many(self, texts: List[str]) -> List[Set[str]]:
+        """Return the keyword set of every text, scanning the batch in one pass."""
+        found: List[Set[str]] = [set() for _ in texts]
+        starts = []
+        offset = 0
+        for text in texts:
+            starts.append(offset)
+            offset += len(text) + 1
+        # NUL is neither a word character nor whitespace, so no keyword or
+        # phrase can match across the boundary between two texts.
+        for match in self.pattern.finditer("\0".join(texts)):
+            keyword = " ".join(match.group(1).lower().split())
+            keywords = found[bisect_right(starts, match.start()) - 1]
+            keywords.add(keyword)
+            keywords.update(self.prefixes[keyword])
+        return found
+
+    def match(self, text: str) -> List[Tuple[str, str, str]]:
+        """Return the (category, keyword, severity) rules that fire for text."""
+        return self._rules_for(self.find(text))
+
+    def match_many(self, texts: List[str]) -> List[List[Tuple[str, str, str]]]:
+        """Return the rules that fire for each text in a batch."""
+        return [self._rules_for(found) for found in self.find_many(texts)]
+
+    def _rules_for(self, found: Set[str]) -> List[Tuple[str, str, str]]:
+        if not found:
+            return []
+        return [rule for rule in self.rules if rule[1] in found]
+
+def _rules_fingerprint() -> str:
+    return hashlib.blake2b(
+        json.dumps(RISK_CATEGORIES, sort_keys=True).encode(), digest_size=8
+    ).hexdigest()
+
+keyword_matcher = RiskKeywordMatcher(RISK_CATEGORIES)
+_rules_version = _rules_fingerprint()
+
+def refresh_rules() -> str:
+    """Return the keyword rules version, recompiling the matcher if RISK_CATEGORIES changed."""
+    global keyword_matcher, _rules_version
+    version = _rules_fingerprint()
+    if version != _rules_version:
+        keyword_matcher = RiskKeywordMatcher(RISK_CATEGORIES)
+        _rules_version = version
+    return version
+
+def _make_signal(category: str, keyword: str, severity: str) -> RiskSignal:
+    """Build the RiskSignal reported for one keyword rule."""
+    return RiskSignal(
+        category=category,
+        severity=severity,
+        description=f"Potential {category} risk related to {keyword}",
+        confidence=0.85
+    )
+
 def extract_risk_signals(text: str) -> List[RiskSignal]:
-    """Extract risk signals from text using keyword matching and TF-IDF."""
-    signals = []
-    tokens = word_tokenize(text.lower())
-    tokens = [token for token in tokens if token.isalpha()]
-    
-    # Check for risk category keywords
-    for category, keywords in RISK_CATEGORIES.items():
-        for keyword in keywords:
-            if keyword in tokens:
-                signal = RiskSignal(
-                    category=category,
-                    severity="HIGH" if keyword in ["breach", "attack", "failure"] else "MEDIUM",
-                    description=f"Potential {category} risk related to {keyword}",
-                    confidence=0.85
-                )
-                signals.append(signal)
-    
-    return signals
+    """Extract risk signals from text using keyword matching."""
+    return [
+        _make_signal(category, keyword, severity)
+        for category, keyword, severity in keyword_matcher.match(text)
+    ]
+
+def extract_risk_signals_batch(texts: List[str]) -> List[List[RiskSignal]]:
+    """Extract risk signals from many texts with a single matcher pass."""
+    return [
+        [_make_signal(*rule) for rule in rules]
+        for rules in keyword_matcher.match_many(texts)
+    ]
 
 def generate_summary(signals: List[RiskSignal]) -> AnalysisSummary:
     """Generate a comprehensive analysis summary."""
-    severity_counts = {
-        "HIGH": len([s for s in signals if s.severity == "HIGH"]),
-        "MEDIUM": len([s for s in signals if s.severity == "MEDIUM"]),
-        "LOW": len([s for s in signals if s.severity == "LOW"])
-    }
+    severity_counts = {"HIGH": 0, "MEDIUM": 0, "LOW": 0}
+    for signal in signals:
+        if signal.severity in severity_counts:
+            severity_counts[signal.severity] += 1
+    overall_severity, recommendations = _assess_severity(severity_counts)
     
+    return AnalysisSummary(
+        risk_signals=signals,
+        overall_severity=overall_severity,
+        recommendations=recommendations,
+        severity_counts=severity_counts
+    )
+
+def _assess_severity(severity_counts: Dict[str, int]) -> Tuple[str, List[str]]:
+    """Derive the overall severity and recommendations from severity counts."""
     overall_severity = "HIGH" if severity_counts["HIGH"] > 0 else (
         "MEDIUM" if severity_counts["MEDIUM"] > 0 else "LOW"
     )
@@ -79,38 +314,536 @@ def generate_summary(signals: List[RiskSignal]) -> AnalysisSummary:
     if severity_counts["MEDIUM"] > 0:
         recommendations.append("Monitor and investigate medium-severity risks")
     
-    return AnalysisSummary(
-        risk_signals=signals,
-        overall_severity=overall_severity,
-        recommendations=recommendations
-    )
+    return overall_severity, recommendations
+
+# Log uploads are read in chunks of this size; a line longer than
+# MAX_LOG_LINE_BYTES is analyzed in pieces so one runaway line cannot
+# grow the carry-over buffer without bound.
+LOG_CHUNK_SIZE = 1024 * 1024
+MAX_LOG_LINE_BYTES = 1024 * 1024
+
+def _decode_log_line(raw: bytes) -> Tuple[str, int]:
+    """Decode a UTF-8 log line, returning the text and its invalid sequence count."""
+    try:
+        return raw.decode("utf-8"), 0
+    except UnicodeDecodeError:
+        pass
+
+    parts = []
+    invalid = 0
+    start = 0
+    while True:
+        try:
+            parts.append(raw[start:].decode("utf-8"))
+            break
+        except UnicodeDecodeError as e:
+            parts.append(raw[start:start + e.start].decode("utf-8"))
+            parts.append("\ufffd")
+            invalid += 1
+            start += e.end
+    return "".join(parts), invalid
+
+def _split_overlong(pending: bytes) -> Tuple[bytes, bytes]:
+    """Cut MAX_LOG_LINE_BYTES off pending without splitting a UTF-8 character."""
+    cut = MAX_LOG_LINE_BYTES
+    # Back off over continuation bytes (0b10xxxxxx) to a character start
+    while cut > MAX_LOG_LINE_BYTES - 4 and pending[cut] & 0xC0 == 0x80:
+        cut -= 1
+    return pending[:cut], pending[cut:]
+
+async def _upload_chunks(file: UploadFile) -> AsyncIterator[bytes]:
+    """Yield an upload's contents LOG_CHUNK_SIZE bytes at a time."""
+    while True:
+        chunk = await file.read(LOG_CHUNK_SIZE)
+        if not chunk:
+            break
+        yield chunk
+
+def iter_upload_lines(file: UploadFile) -> AsyncIterator[List[bytes]]:
+    """Yield batches of raw lines from an upload, reading it chunk by chunk."""
+    return iter_line_batches(_upload_chunks(file))
+
+async def iter_line_batches(chunks: AsyncIterator[bytes]) -> AsyncIterator[List[bytes]]:
+    """Split a stream of byte chunks into batches of raw lines.
+
+    Lines are split on the newline byte, which never occurs inside a UTF-8
+    multi-byte sequence, so characters split across chunks are rejoined
+    before decoding.
+    """
+    pending = b""
+    async for chunk in chunks:
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        while len(pending) > MAX_LOG_LINE_BYTES:
+            piece, pending = _split_overlong(pending)
+            lines.append(piece)
+        if lines:
+            yield lines
+    if pending:
+        yield [pending]
+
+# Per-aggregate cap on the example lines kept for a log analysis, and on
+# the length of each example, so the response stays small for any input.
+MAX_SAMPLE_LINES = 3
+MAX_SAMPLE_LINE_LENGTH = 500
+
+# Distinct line templates kept per log analysis; lines of further shapes
+# are still analyzed, just not grouped
+MAX_LOG_TEMPLATES = 1000
+
+class _SignalCount:
+    """Mutable counters behind one SignalAggregate."""
+
+    __slots__ = ("count", "first_line", "last_line", "sample_lines")
+
+    def __init__(self, line_number: int):
+        self.count = 0
+        self.first_line = line_number
+        self.last_line = line_number
+        self.sample_lines: List[str] = []
+
+class SignalAggregator:
+    """Running summary of the risk signals found in a stream of log lines.
+
+    Every hit is folded into per-(category, keyword, severity) counters in a
+    single pass, so memory is bounded by the number of keyword rules rather
+    than the input size. With verbose=True one RiskSignal per hit is also
+    kept, which restores the original, unbounded response.
+
+    Lines are grouped into templates as they arrive, and keywords are
+    matched once per template instead of once per line.
+    """
+
+    def __init__(self, verbose: bool = False):
+        self.verbose = verbose
+        self.severity_counts = {"HIGH": 0, "MEDIUM": 0, "LOW": 0}
+        self.counts: Dict[Tuple[str, str, str], _SignalCount] = {}
+        self.hits: List[RiskSignal] = []
+        self.line_number = 0
+        self.lines_processed = 0
+        self.invalid_utf8_sequences = 0
+        self.invalid_utf8_lines = 0
+        self.templates = TemplateMiner(
+            classify=keyword_matcher.match,
+            protected_words=keyword_matcher.words,
+            max_examples=MAX_SAMPLE_LINES,
+            max_templates=MAX_LOG_TEMPLATES
+        )
+
+    def feed(self, raw_lines: List[bytes]) -> None:
+        """Decode and analyze a batch of raw log lines."""
+        for raw in raw_lines:
+            line, invalid = _decode_log_line(raw)
+            if invalid:
+                self.invalid_utf8_sequences += invalid
+                self.invalid_utf8_lines += 1
+            self.add_line(line)
+
+    def add_line(self, line: str) -> None:
+        """Analyze the next decoded log line."""
+        self.line_number += 1
+        if not line.strip():
+            return
+        self.lines_processed += 1
+        template = self.templates.add(line.strip(), self.line_number)
+        for rule in template.classification:
+            self.severity_counts[rule[2]] += 1
+            counter = self.counts.get(rule)
+            if counter is None:
+                counter = self.counts[rule] = _SignalCount(self.line_number)
+            counter.count += 1
+            counter.last_line = self.line_number
+            if len(counter.sample_lines) < MAX_SAMPLE_LINES:
+                counter.sample_lines.append(line.strip()[:MAX_SAMPLE_LINE_LENGTH])
+            if self.verbose:
+                self.hits.append(_make_signal(*rule))
+
+    def merge(self, other: "SignalAggregator") -> None:
+        """Fold in an aggregator that analyzed the lines following ours.
+
+        The other aggregator numbers its lines from 1; they are shifted to
+        follow ours. It is left unmodified, so cached partials can be reused.
+        """
+        offset = self.line_number
+        self.templates.merge(other.templates, offset)
+        for severity, count in other.severity_counts.items():
+            self.severity_counts[severity] += count
+        for rule, theirs in other.counts.items():
+            ours = self.counts.get(rule)
+            if ours is None:
+                ours = self.counts[rule] = _SignalCount(theirs.first_line + offset)
+            ours.count += theirs.count
+            ours.last_line = theirs.last_line + offset
+            room = MAX_SAMPLE_LINES - len(ours.sample_lines)
+            ours.sample_lines.extend(theirs.sample_lines[:room])
+        self.hits.extend(other.hits)
+        self.line_number += other.line_number
+        self.lines_processed += other.lines_processed
+        self.invalid_utf8_sequences += other.invalid_utf8_sequences
+        self.invalid_utf8_lines += other.invalid_utf8_lines
+
+    def compact(self) -> None:
+        """Shrink to what merge() reads; no more lines can be fed afterwards."""
+        self.templates.compact()
+
+    def summary(self) -> LogAnalysisSummary:
+        """Build the analysis summary for everything fed so far."""
+        overall_severity, recommendations = _assess_severity(self.severity_counts)
+        aggregates = [
+            SignalAggregate(
+                category=category,
+                keyword=keyword,
+                severity=severity,
+                count=counter.count,
+                first_line=counter.first_line,
+                last_line=counter.last_line,
+                sample_lines=counter.sample_lines
+            )
+            for (category, keyword, severity), counter in self.counts.items()
+        ]
+        if self.verbose:
+            signals = self.hits
+        else:
+            signals = [_make_signal(*rule) for rule in self.counts]
+        return LogAnalysisSummary(
+            risk_signals=signals,
+            overall_severity=overall_severity,
+            recommendations=recommendations,
+            severity_counts=self.severity_counts,
+            signal_aggregates=aggregates,
+            lines_processed=self.lines_processed,
+            invalid_utf8_sequences=self.invalid_utf8_sequences,
+            invalid_utf8_lines=self.invalid_utf8_lines
+        )
+
+    def template_summary(self, limit: int) -> LogTemplatesSummary:
+        """The `limit` most frequent line templates seen so far."""
+        return LogTemplatesSummary(
+            templates=[
+                LogTemplateSummary(
+                    template=template.template,
+                    count=template.count,
+                    first_line=template.first_seen,
+                    last_line=template.last_seen,
+                    sample_lines=[line[:MAX_SAMPLE_LINE_LENGTH] for line in template.examples],
+                    risk_signals=[_make_signal(*rule) for rule in template.classification]
+                )
+                for template in self.templates.templates()[:limit]
+            ],
+            template_count=len(self.templates),
+            lines_processed=self.lines_processed,
+            ungrouped_lines=self.templates.overflow_lines
+        )
+
+def analyze_log_lines(raw_lines: List[bytes], verbose: bool) -> SignalAggregator:
+    """Analyze one batch of raw log lines, numbering them from 1.
+
+    Runs on the executor; the caller merges the partial result at the
+    batch's real position in the file.
+    """
+    aggregator = SignalAggregator(verbose=verbose)
+    with span("match"):
+        aggregator.feed(raw_lines)
+    return aggregator
+
+def analyze_incident_text(description: str) -> AnalysisSummary:
+    """Analyze a single incident description. Runs on the executor."""
+    with span("match"):
+        return generate_summary(extract_risk_signals(description))
+
+# Incidents per matcher pass and per streamed block of NDJSON output
+INCIDENT_BATCH_SIZE = 500
+
+def _incident_summary(rules: List[Tuple[str, str, str]]) -> Dict[str, Any]:
+    """Build an AnalysisSummary-shaped dict without per-signal model objects."""
+    severity_counts = {"HIGH": 0, "MEDIUM": 0, "LOW": 0}
+    signals = []
+    for category, keyword, severity in rules:
+        severity_counts[severity] += 1
+        signals.append({
+            "category": category,
+            "severity": severity,
+            "description": f"Potential {category} risk related to {keyword}",
+            "confidence": 0.85
+        })
+    overall_severity, recommendations = _assess_severity(severity_counts)
+    return {
+        "risk_signals": signals,
+        "overall_severity": overall_severity,
+        "recommendations": recommendations,
+        "severity_counts": severity_counts
+    }
+
+def analyze_incident_batch(items: List[Any], first_index: int) -> bytes:
+    """Validate and analyze a batch of incidents, returning NDJSON result lines.
+
+    Items are raw NDJSON lines or already-decoded JSON objects. An item that
+    fails validation yields an error record instead of failing the batch.
+    """
+    results: List[Dict[str, Any]] = []
+    reports = []
+    for index, item in enumerate(items, first_index):
+        try:
+            if isinstance(item, (bytes, str)):
+                report = IncidentReport.model_validate_json(item)
+            else:
+                report = IncidentReport.model_validate(item)
+        except ValidationError as e:
+            results.append({"index": index, "error": str(e)})
+            continue
+        result = {"index": index, "title": report.title}
+        results.append(result)
+        reports.append((result, report))
+
+    with span("match"):
+        matches = keyword_matcher.match_many([report.description for _, report in reports])
+    for (result, _), rules in zip(reports, matches):
+        result.update(_incident_summary(rules))
+    return "".join(json.dumps(result) + "\n" for result in results).encode()
+
+async def _array_incident_batches(items: List[Any]) -> AsyncIterator[List[Any]]:
+    """Split a decoded JSON array of incidents into batches."""
+    for start in range(0, len(items), INCIDENT_BATCH_SIZE):
+        yield items[start:start + INCIDENT_BATCH_SIZE]
+
+async def _ndjson_incident_batches(chunks: AsyncIterator[bytes]) -> AsyncIterator[List[bytes]]:
+    """Group the non-blank lines of an NDJSON body into incident batches."""
+    batch: List[bytes] = []
+    async for lines in iter_line_batches(chunks):
+        batch.extend(line for line in lines if line.strip())
+        while len(batch) >= INCIDENT_BATCH_SIZE:
+            yield batch[:INCIDENT_BATCH_SIZE]
+            batch = batch[INCIDENT_BATCH_SIZE:]
+    if batch:
+        yield batch
+
+async def _prepend(head: bytes, chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    yield head
+    async for chunk in chunks:
+        yield chunk
 
 @app.post("/analyze/incident")
 async def analyze_incident_report(report: IncidentReport):
-    """Analyze an incident report and generate risk signals."""
-    signals = extract_risk_signals(report.description)
-    summary = generate_summary(signals)
+    """Analyze an incident report and generate risk signals.
+
+    Results are cached by the whitespace-normalized, lowercased description,
+    which is all the analysis depends on.
+    """
+    normalized = " ".join(report.description.split()).lower()
+    key = content_key("incident", refresh_rules(), normalized)
+    with span("cache"):
+        summary = result_cache.get(key)
+    if summary is None:
+        with span("analyze"):
+            summary = await executor.run(analyze_incident_text, report.description)
+        result_cache.put(key, summary)
     return summary
 
 @app.post("/analyze/log")
-async def analyze_log_file(file: UploadFile = File(...)):
-    """Analyze a system log file and extract risk signals."""
-    contents = await file.read()
-    text = contents.decode()
-    
-    # Split log into individual entries
-    log_entries = text.split('\n')
-    
-    all_signals = []
-    for entry in log_entries:
-        if entry.strip():
-            signals = extract_risk_signals(entry)
-            all_signals.extend(signals)
-    
-    summary = generate_summary(all_signals)
-    return summary
+async def analyze_log_file(file: UploadFile = File(...), verbose: bool = False):
+    """Analyze a system log file and extract risk signals.
+
+    The upload is streamed in chunks and folded into per-keyword counts with
+    line offsets and sample lines, so peak memory does not grow with the file
+    size. Each distinct signal is listed once unless verbose=true asks for
+    one entry per hit. Invalid UTF-8 is replaced and counted.
+
+    Non-verbose partial results are cached per batch of lines, so retried
+    uploads and files sharing a prefix with an earlier upload reuse work.
+    """
+    aggregator = await _aggregate_upload(file, verbose)
+    with span("summary"):
+        return aggregator.summary()
+
+@app.post("/analyze/log/templates", response_model=LogTemplatesSummary)
+async def analyze_log_templates(file: UploadFile = File(...), limit: int = 100):
+    """Group a log file's lines into templates, most frequent first.
+
+    Variable parts (numbers, ids and other tokens that differ between
+    otherwise equal lines) become <*>. Each template carries its line count,
+    first and last line number, sample lines and the risk signals its lines
+    raise. Runs the same cached analysis as POST /analyze/log.
+    """
+    aggregator = await _aggregate_upload(file, False)
+    with span("summary"):
+        return aggregator.template_summary(max(0, limit))
+
+async def _aggregate_upload(file: UploadFile, verbose: bool) -> SignalAggregator:
+    version = refresh_rules()
+    aggregator = SignalAggregator(verbose=verbose)
+    first = True
+    read_started = time.perf_counter()
+    async for lines in iter_upload_lines(file):
+        record_stage("read", time.perf_counter() - read_started)
+        with span("cache"):
+            key = None if verbose else content_key("log", version, b"\n".join(lines))
+            partial = result_cache.get(key) if key else None
+        if partial is None:
+            # Only the first batch may be shed; once admitted, a request
+            # runs to completion. The timeout bounds each batch's analysis,
+            # not the upload, which may take as long as the client needs.
+            with span("analyze"):
+                partial = await executor.run(
+                    analyze_log_lines, lines, verbose, reject=first
+                )
+            if key:
+                # The miner's line lookup table can dwarf the result itself
+                partial.compact()
+                result_cache.put(key, partial)
+        with span("merge"):
+            aggregator.merge(partial)
+        first = False
+        read_started = time.perf_counter()
+    return aggregator
+
+@app.post("/analyze/incidents/batch")
+async def analyze_incident_batch_endpoint(request: Request):
+    """Analyze many incident reports in one request.
+
+    The body is either a JSON array of incident reports or NDJSON with one
+    report per line; NDJSON is consumed as it arrives. Results are streamed
+    back as NDJSON, one line per incident in input order, each carrying its
+    input index and either an analysis summary or a validation error.
+    """
+    executor.check_capacity()
+    refresh_rules()
+    chunks = request.stream()
+    head = b""
+    async for chunk in chunks:
+        head += chunk
+        if head.strip():
+            break
+
+    if head.lstrip().startswith(b"["):
+        body = head + b"".join([chunk async for chunk in chunks])
+        try:
+            items = await executor.run(json.loads, body)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON array: {e}")
+        if not isinstance(items, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array of incident reports")
+        batches = _array_incident_batches(items)
+    else:
+        batches = _ndjson_incident_batches(_prepend(head, chunks))
+
+    async def results():
+        index = 0
+        async for batch in batches:
+            try:
+                yield await executor.run(
+                    analyze_incident_batch, batch, index, reject=False
+                )
+            except ExecutorTimeout as e:
+                # Headers are already sent, so report the failure in-band
+                yield (json.dumps({"index": index, "error": str(e)}) + "\n").encode()
+                return
+            index += len(batch)
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+@app.get("/logs/recent")
+async def recent_logs(limit: int = 100):
+    """Most recent processed lines of the followed log file, newest last."""
+    if log_follower is None:
+        raise HTTPException(status_code=404, detail="Log follow mode is not enabled (set RISK_FOLLOW_LOG)")
+    frame = log_follower.store.tail(max(0, limit))
+    return {
+        "logs": json.loads(frame.to_json(orient="records", date_format="iso")),
+        "follower": log_follower.status()
+    }
+
+@app.get("/alerts")
+async def rate_alerts():
+    """Event-rate spikes per category and severity in the followed log."""
+    if log_follower is None:
+        raise HTTPException(status_code=404, detail="Log follow mode is not enabled (set RISK_FOLLOW_LOG)")
+    detector = log_follower.store.detector
+    return {**detector.alerts(), "stats": detector.stats()}
+
+def build_search_index():
+    """Index the processed incidents, plus the log file unless it is followed."""
+    from data_processor import DataProcessor
+    processor = DataProcessor()
+    if log_follower is None:
+        return processor.build_search_index()
+    index = log_follower.store.index
+    index.add_frame(processor.load_incidents_df(), "incident")
+    return index
+
+async def get_search_index():
+    global search_index
+    async with _search_index_lock:
+        if search_index is None:
+            # In this process, not the executor: the index is shared state
+            with span("search_index"):
+                search_index = await asyncio.to_thread(build_search_index)
+    return search_index
+
+@app.get("/search")
+async def search(
+    q: str = "",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    severity: Optional[List[str]] = Query(None),
+    kind: Optional[List[str]] = Query(None),
+    limit: int = 20
+):
+    """Search incident titles/descriptions and log messages, newest hits first.
+
+    Terms separated by spaces must all match; alternatives are joined with
+    OR (or |). start/end bound the timestamp, severity and kind (incident,
+    log) may be repeated.
+    """
+    from search_index import DOCUMENT_KINDS
+    unknown = set(kind or []) - set(DOCUMENT_KINDS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown kind: {', '.join(sorted(unknown))}")
+    index = await get_search_index()
+    started = time.perf_counter()
+    # Queries take milliseconds, so they run on the event loop
+    with span("search"):
+        result = index.search(
+            q, start=start, end=end, severities=severity, kinds=kind,
+            limit=min(max(0, limit), MAX_SEARCH_LIMIT)
+        )
+    result["took_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    return result
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint."""
-    return {"status": "healthy", "timestamp": datetime.now().isoformat()}
+    """Health check endpoint; "degraded" while the followed log cannot be polled."""
+    health = {
+        "status": "healthy",
+        "timestamp": datetime.now().isoformat(),
+        "executor": executor.metrics(),
+        "cache": result_cache.stats()
+    }
+    if log_follower is not None:
+        health["follower"] = log_follower.status()
+        if health["follower"]["failing"]:
+            health["status"] = "degraded"
+    return health
+
+def _runtime_samples():
+    """Executor and cache counters for GET /metrics, read at scrape time."""
+    pool = executor.metrics()
+    cache = result_cache.stats()
+    return [
+        ("executor_in_flight", "gauge", "Calls running or queued on the worker pool",
+         [({}, pool["in_flight"])]),
+        ("executor_queue_depth", "gauge", "Calls waiting for a pool worker",
+         [({}, pool["queue_depth"])]),
+        ("executor_calls_total", "counter", "Pool calls by outcome",
+         [({"outcome": outcome}, pool[outcome]) for outcome in ("completed", "rejected", "timed_out")]),
+        ("result_cache_entries", "gauge", "Entries in the result cache",
+         [({}, cache["entries"])]),
+        ("result_cache_lookups_total", "counter", "Result cache lookups by outcome",
+         [({"outcome": "hit"}, cache["hits"]), ({"outcome": "miss"}, cache["misses"])]),
+    ]
+
+registry.add_collector(_runtime_samples)
+
+@app.get("/metrics")
+async def metrics():
+    """Request and stage latency histograms and runtime counters, as Prometheus text."""
+    return PlainTextResponse(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,90 @@
+import threading
+from typing import Dict
+
+import pandas as pd
+
+# Supported bucket sizes. Timedeltas rather than frequency aliases, whose
+# spelling changed across pandas versions ("H" before 2.2, "h" after)
+GRANULARITIES = {"hour": pd.Timedelta(hours=1), "day": pd.Timedelta(days=1)}
+
+TOTAL_COLUMNS = ["count", "impact_sum", "impact_count"]
+
+
+class TimeRollup:
+    """Hourly and daily aggregates of processed records, updated incrementally.
+
+    Every bucket holds the record count, the sum and count of impact_level
+    values, and a count per category. update() only groups the new rows and
+    adds them into the existing buckets, so both updating and reading cost
+    time proportional to the number of buckets rather than records.
+    """
+
+    def __init__(self):
+        self._totals: Dict[str, pd.DataFrame] = {
+            name: _empty_totals() for name in GRANULARITIES
+        }
+        self._categories: Dict[str, pd.DataFrame] = {
+            name: pd.DataFrame(dtype="int64") for name in GRANULARITIES
+        }
+        self._lock = threading.Lock()
+        self.records = 0
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> "TimeRollup":
+        rollup = cls()
+        rollup.update(frame)
+        return rollup
+
+    def update(self, frame: pd.DataFrame) -> None:
+        """Fold a batch of records (timestamp, category, impact_level) into the buckets."""
+        if frame.empty:
+            return
+        impact = frame["impact_level"].astype("float64")
+        category = frame["category"].astype(str)
+        batch = {}
+        for name, freq in GRANULARITIES.items():
+            bucket = frame["timestamp"].dt.floor(freq).rename("bucket")
+            totals = impact.groupby(bucket).agg(["size", "sum", "count"])
+            totals.columns = TOTAL_COLUMNS
+            categories = category.groupby([bucket, category]).size().unstack(fill_value=0)
+            batch[name] = (totals, categories)
+
+        with self._lock:
+            for name, (totals, categories) in batch.items():
+                self._totals[name] = _add(self._totals[name], totals)
+                self._categories[name] = _add(self._categories[name], categories)
+            self.records += len(frame)
+
+    def totals(self, granularity: str = "day") -> pd.DataFrame:
+        """Per-bucket count, impact_sum, impact_count and mean_impact."""
+        with self._lock:
+            totals = self._totals[_check(granularity)].copy()
+        totals["mean_impact"] = totals["impact_sum"] / totals["impact_count"]
+        return totals
+
+    def category_counts(self, granularity: str = "day") -> pd.DataFrame:
+        """Per-bucket record counts, one column per category."""
+        with self._lock:
+            return self._categories[_check(granularity)].copy()
+
+
+def _empty_totals() -> pd.DataFrame:
+    return pd.DataFrame(
+        {column: pd.Series(dtype="int64") for column in TOTAL_COLUMNS},
+        index=pd.DatetimeIndex([], name="bucket")
+    )
+
+
+def _add(existing: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    """Bucket-wise sum of two aggregate frames, keeping integer counts."""
+    if existing.empty:
+        combined = new
+    else:
+        combined = existing.add(new, fill_value=0).fillna(0)
+    return combined.sort_index().astype("int64")
+
+
+def _check(granularity: str) -> str:
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity: {granularity}")
+    return granularity
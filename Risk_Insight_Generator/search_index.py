@@ -0,0 +1,226 @@
+import re
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+TOKEN_PATTERN = r"[a-z0-9]+"
+TOKEN_RE = re.compile(TOKEN_PATTERN)
+
+# Document kinds, stored as int8 codes
+DOCUMENT_KINDS = ["incident", "log"]
+
+# Past this many ids, set operations mark a per-document bitmap instead of
+# merging or probing sorted arrays
+BITMAP_THRESHOLD = 1 << 16
+
+
+class SearchIndex:
+    """Inverted index over incident and log text with boolean queries.
+
+    Every record becomes a document with a sequential id. Each token maps to
+    a sorted array of the ids containing it. Ids only grow, so adding
+    documents just appends a chunk per token; the chunks are concatenated
+    the first time the token is queried afterwards. Timestamps, severity
+    codes and kinds are kept as parallel arrays so filters are vectorized
+    over the matching ids.
+
+    Queries are whitespace-separated terms, all of which must match (AND),
+    optionally joined by OR into alternatives, e.g.
+    "database latency OR disk critical".
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, List[np.ndarray]] = {}
+        self._timestamps: List[np.ndarray] = []
+        self._severities: List[np.ndarray] = []
+        self._kinds: List[np.ndarray] = []
+        self._columns: Optional[tuple] = None
+        self._texts: List[str] = []
+        self._severity_codes: Dict[str, int] = {}
+        self._lock = threading.RLock()
+        self.documents = 0
+
+    def add_frame(self, frame: pd.DataFrame, kind: str) -> None:
+        """Index processed records: incidents (title, description) or logs (message)."""
+        if frame.empty:
+            return
+        if kind == "incident":
+            display = frame["title"].astype(str)
+            text = display + " " + frame["description"].astype(str)
+        elif kind == "log":
+            display = text = frame["message"].astype(str)
+        else:
+            raise ValueError(f"Unknown document kind: {kind}")
+
+        tokens = text.str.lower().str.findall(TOKEN_PATTERN)
+        severity = frame["severity"].astype(str).str.upper()
+        timestamps = frame["timestamp"].to_numpy(dtype="datetime64[ns]").view("int64")
+
+        with self._lock:
+            first = self.documents
+            ids = np.arange(first, first + len(frame), dtype=np.int64)
+            # One (token, id) pair per distinct token in each document
+            pairs = pd.DataFrame({"token": tokens, "id": ids}).explode("token").dropna()
+            pairs = pairs.drop_duplicates()
+            if not pairs.empty:
+                codes, terms = pd.factorize(pairs["token"])
+                # Stable sort keeps each token's ids in ascending order
+                order = np.argsort(codes, kind="stable")
+                codes = codes[order]
+                grouped = pairs["id"].to_numpy(dtype=np.int64)[order]
+                boundaries = np.flatnonzero(np.diff(codes)) + 1
+                for code, chunk in zip(codes[np.r_[0, boundaries]], np.split(grouped, boundaries)):
+                    self._postings.setdefault(terms[code], []).append(chunk)
+
+            codes = np.array(
+                [self._severity_code(value) for value in severity], dtype=np.int16
+            )
+            self._timestamps.append(timestamps)
+            self._severities.append(codes)
+            self._kinds.append(np.full(len(frame), DOCUMENT_KINDS.index(kind), dtype=np.int8))
+            self._texts.extend(display.tolist())
+            self._columns = None
+            self.documents += len(frame)
+
+    def _severity_code(self, severity: str) -> int:
+        code = self._severity_codes.get(severity)
+        if code is None:
+            code = self._severity_codes[severity] = len(self._severity_codes)
+        return code
+
+    def _postings_for(self, token: str) -> np.ndarray:
+        chunks = self._postings.get(token)
+        if not chunks:
+            return np.empty(0, dtype=np.int64)
+        if len(chunks) > 1:
+            # Later chunks only hold larger ids, so concatenation stays sorted
+            chunks[:] = [np.concatenate(chunks)]
+        return chunks[0]
+
+    def _column_arrays(self) -> tuple:
+        if self._columns is None:
+            self._timestamps = [np.concatenate(self._timestamps)] if self._timestamps else []
+            self._severities = [np.concatenate(self._severities)] if self._severities else []
+            self._kinds = [np.concatenate(self._kinds)] if self._kinds else []
+            empty = np.empty(0, dtype=np.int64)
+            self._columns = (
+                self._timestamps[0] if self._timestamps else empty,
+                self._severities[0] if self._severities else empty,
+                self._kinds[0] if self._kinds else empty
+            )
+        return self._columns
+
+    def search(
+        self,
+        query: str = "",
+        start: Optional[Any] = None,
+        end: Optional[Any] = None,
+        severities: Optional[Iterable[str]] = None,
+        kinds: Optional[Iterable[str]] = None,
+        limit: int = 20
+    ) -> Dict[str, Any]:
+        """Run a query; returns the total match count and the newest `limit` hits."""
+        with self._lock:
+            timestamps, severity_codes, kind_codes = self._column_arrays()
+            ids = self._match(parse_query(query))
+
+            matched_timestamps = timestamps[ids]
+            masks = []
+            if start is not None:
+                masks.append(matched_timestamps >= pd.Timestamp(start).value)
+            if end is not None:
+                masks.append(matched_timestamps <= pd.Timestamp(end).value)
+            if severities:
+                codes = [self._severity_codes[value.upper()] for value in severities
+                         if value.upper() in self._severity_codes]
+                masks.append(np.isin(severity_codes[ids], codes))
+            if kinds:
+                masks.append(np.isin(kind_codes[ids], [DOCUMENT_KINDS.index(kind) for kind in kinds]))
+            if masks:
+                mask = np.logical_and.reduce(masks)
+                ids = ids[mask]
+                matched_timestamps = matched_timestamps[mask]
+
+            # Newest first without sorting every match
+            if limit <= 0:
+                hits = ids[:0]
+            elif len(ids) > limit:
+                top = np.argpartition(matched_timestamps, len(ids) - limit)[len(ids) - limit:]
+                hits = ids[top]
+            else:
+                hits = ids
+            hits = hits[np.argsort(timestamps[hits], kind="stable")[::-1]]
+            severity_names = list(self._severity_codes)
+            return {
+                "total": int(len(ids)),
+                "hits": [
+                    {
+                        "id": int(doc),
+                        "kind": DOCUMENT_KINDS[kind_codes[doc]],
+                        "timestamp": pd.Timestamp(timestamps[doc]).isoformat(),
+                        "severity": severity_names[severity_codes[doc]],
+                        "text": self._texts[doc]
+                    }
+                    for doc in hits
+                ]
+            }
+
+    def _match(self, alternatives: List[List[str]]) -> np.ndarray:
+        """Ids matching any alternative, where an alternative needs all its terms."""
+        if not alternatives:
+            return np.arange(self.documents, dtype=np.int64)
+        matches = [self._match_all(terms) for terms in alternatives]
+        if len(matches) == 1:
+            return matches[0]
+        if sum(len(match) for match in matches) > BITMAP_THRESHOLD:
+            bitmap = np.zeros(self.documents, dtype=bool)
+            for match in matches:
+                bitmap[match] = True
+            return np.flatnonzero(bitmap)
+        # Stable sort merges the already sorted runs; then drop repeats
+        merged = np.sort(np.concatenate(matches), kind="stable")
+        return merged[np.r_[True, merged[1:] != merged[:-1]]]
+
+    def _match_all(self, terms: List[str]) -> np.ndarray:
+        postings = sorted((self._postings_for(term) for term in terms), key=len)
+        result = postings[0]
+        for other in postings[1:]:
+            if not len(result):
+                break
+            if len(result) > BITMAP_THRESHOLD:
+                bitmap = np.zeros(self.documents, dtype=bool)
+                bitmap[other] = True
+                result = result[bitmap[result]]
+                continue
+            # Probe the smaller set into the larger sorted array: O(k log n)
+            positions = np.searchsorted(other, result)
+            positions[positions == len(other)] = 0
+            result = result[other[positions] == result]
+        return result
+
+    def severities(self) -> List[str]:
+        """Severity values seen so far, in first-seen order."""
+        with self._lock:
+            return list(self._severity_codes)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"documents": self.documents, "terms": len(self._postings)}
+
+
+def parse_query(query: str) -> List[List[str]]:
+    """Split a query into OR'ed alternatives of AND'ed, normalized terms.
+
+    Terms are tokenized like indexed text, so "disk-space" means "disk space".
+    """
+    alternatives = []
+    for alternative in re.split(r"\s+OR\s+|\s*\|\s*", query.strip()):
+        terms = [
+            token for word in alternative.split() if word != "AND"
+            for token in TOKEN_RE.findall(word.lower())
+        ]
+        if terms:
+            alternatives.append(terms)
+    return alternatives
@@ -7,18 +7,18 @@ setup(
     author="Your Name",
     packages=find_packages(),
     install_requires=[
+        "service_common>=0.1.0",
         "fastapi>=0.104.1",
         "uvicorn>=0.24.0",
         "python-multipart>=0.0.6",
         "pandas>=1.3.0",
-        "nltk>=3.6.0",
         "numpy>=1.19.0",
-        "scikit-learn>=0.24.0",
         "python-dateutil>=2.8.0",
-        "streamlit>=1.12.0",
-        "plotly>=5.3.0"
+        "streamlit>=1.23.0",
+        "plotly>=5.3.0",
+        "pyarrow>=7.0.0"
     ],
-    python_requires='>=3.7',
+    python_requires='>=3.9',
     entry_points={
         'console_scripts': [
             'risk_analyzer=app:main',
@@ -0,0 +1,241 @@
+import math
+import os
+import threading
+from collections import deque
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Columns of a processed frame that identify an event stream
+DEFAULT_KEYS = ("category", "severity")
+
+
+class RingCounter:
+    """Event counts of the newest baseline + 1 time buckets in a ring.
+
+    The head slot counts the current bucket; the others are the baseline.
+    Their sum and sum of squares are updated as buckets rotate, so adding
+    an event and reading the baseline mean and deviation are O(1).
+    """
+
+    __slots__ = ("counts", "head", "head_bucket", "total", "squares")
+
+    def __init__(self, baseline: int, bucket: int):
+        self.counts = [0] * (baseline + 1)
+        self.head = 0
+        self.head_bucket = bucket
+        self.total = 0
+        self.squares = 0
+
+    def add(self, bucket: int, count: int = 1) -> bool:
+        """Count events in a bucket; False if it already left the ring."""
+        if bucket > self.head_bucket:
+            self._advance(bucket)
+        age = self.head_bucket - bucket
+        size = len(self.counts)
+        if age >= size:
+            return False
+        slot = (self.head - age) % size
+        old = self.counts[slot]
+        self.counts[slot] = old + count
+        if age:
+            # A late event for a baseline bucket
+            self.total += count
+            self.squares += (old + count) ** 2 - old * old
+        return True
+
+    def _advance(self, bucket: int) -> None:
+        size = len(self.counts)
+        steps = bucket - self.head_bucket
+        if steps >= size:
+            self.counts = [0] * size
+            self.head = 0
+            self.total = self.squares = 0
+        else:
+            for _ in range(steps):
+                # The current bucket joins the baseline; the oldest leaves it
+                # and its slot is reused for the new current bucket
+                current = self.counts[self.head]
+                self.total += current
+                self.squares += current * current
+                self.head = (self.head + 1) % size
+                oldest = self.counts[self.head]
+                self.total -= oldest
+                self.squares -= oldest * oldest
+                self.counts[self.head] = 0
+        self.head_bucket = bucket
+
+    @property
+    def current(self) -> int:
+        return self.counts[self.head]
+
+
+class SpikeDetector:
+    """Flags event-rate spikes per key against a rolling baseline.
+
+    Events are counted per key (e.g. category and severity) in buckets of
+    each configured window size, on event time. For every window a key
+    keeps a RingCounter over the current bucket and the `baseline` buckets
+    before it. The current bucket is a spike once it holds at least
+    min_count events and exceeds the baseline mean by `threshold` standard
+    deviations; the deviation is at least sqrt(mean) (Poisson noise) and 1,
+    so a flat or empty baseline does not flag every small bump. Nothing is
+    flagged until `baseline` buckets have been observed, so start-up
+    traffic is not taken for a spike.
+
+    Each update is O(1) per event and window; update() counts a whole frame
+    with one groupby per window.
+    """
+
+    def __init__(
+        self,
+        windows: Sequence[int] = (60, 300),
+        baseline: int = 30,
+        threshold: float = 4.0,
+        min_count: int = 10,
+        keys: Sequence[str] = DEFAULT_KEYS,
+        history: int = 200
+    ):
+        self.windows = [int(window) for window in windows]
+        self.baseline = baseline
+        self.threshold = threshold
+        self.min_count = min_count
+        self.keys = list(keys)
+        self._rings: Dict[int, Dict[Hashable, RingCounter]] = {w: {} for w in self.windows}
+        self._first_bucket: Dict[int, int] = {}
+        self._latest_bucket: Dict[int, int] = {}
+        # The alert raised in each (window, key)'s current bucket, if any
+        self._open: Dict[Tuple[int, Hashable], Dict[str, Any]] = {}
+        self._recent: deque = deque(maxlen=history)
+        self._lock = threading.Lock()
+        self.events = 0
+        self.late_events = 0
+
+    @classmethod
+    def from_env(cls, prefix: str) -> "SpikeDetector":
+        """Build a detector from <prefix>WINDOWS (comma-separated seconds),
+        BASELINE, THRESHOLD and MIN_COUNT."""
+        env = os.environ
+        return cls(
+            windows=[int(w) for w in env.get(prefix + "WINDOWS", "60,300").split(",") if w.strip()],
+            baseline=int(env.get(prefix + "BASELINE", 30)),
+            threshold=float(env.get(prefix + "THRESHOLD", 4.0)),
+            min_count=int(env.get(prefix + "MIN_COUNT", 10))
+        )
+
+    def add(self, key: Hashable, timestamp: float, count: int = 1) -> None:
+        """Count `count` events of a key at a time in epoch seconds."""
+        with self._lock:
+            self.events += count
+            for window in self.windows:
+                self._add(window, key, int(timestamp // window), count)
+
+    def update(self, frame: pd.DataFrame) -> None:
+        """Count the rows of a processed frame, keyed by the `keys` columns."""
+        if frame.empty:
+            return
+        seconds = frame["timestamp"].to_numpy(dtype="datetime64[s]").view("int64")
+        keys = {name: frame[name].astype(str).to_numpy() for name in self.keys}
+        batches = []
+        for window in self.windows:
+            counts = (
+                pd.DataFrame({**keys, "bucket": seconds // window})
+                .groupby([*self.keys, "bucket"], sort=False)
+                .size()
+            )
+            # Oldest buckets first, so rings advance in order
+            counts = counts.iloc[np.argsort(counts.index.get_level_values("bucket"), kind="stable")]
+            batches.append((window, counts))
+        with self._lock:
+            self.events += len(frame)
+            for window, counts in batches:
+                for (*key, bucket), count in counts.items():
+                    self._add(window, tuple(key), int(bucket), int(count))
+
+    def _add(self, window: int, key: Hashable, bucket: int, count: int) -> None:
+        first = self._first_bucket.setdefault(window, bucket)
+        if bucket < first:
+            first = self._first_bucket[window] = bucket
+        if bucket > self._latest_bucket.get(window, bucket - 1):
+            self._latest_bucket[window] = bucket
+        ring = self._rings[window].get(key)
+        if ring is None:
+            # Starts at the first bucket seen for any key, so its baseline
+            # holds real zeros for the time the key was silent
+            ring = self._rings[window][key] = RingCounter(self.baseline, first)
+        if not ring.add(bucket, count):
+            self.late_events += count
+            return
+        if bucket == ring.head_bucket:
+            self._check(window, key, ring)
+
+    def _check(self, window: int, key: Hashable, ring: RingCounter) -> None:
+        warming_up = ring.head_bucket - self._first_bucket[window] < self.baseline
+        if warming_up or ring.current < self.min_count:
+            return
+        mean = ring.total / self.baseline
+        deviation = math.sqrt(max(0.0, ring.squares / self.baseline - mean * mean))
+        score = (ring.current - mean) / max(deviation, math.sqrt(mean), 1.0)
+        if score < self.threshold:
+            return
+        alert = self._open.get((window, key))
+        if alert is None or alert["bucket"] != ring.head_bucket:
+            alert = self._open[(window, key)] = {
+                **dict(zip(self.keys, key if isinstance(key, tuple) else (key,))),
+                "window_seconds": window,
+                "bucket": ring.head_bucket,
+                "start": pd.Timestamp(ring.head_bucket * window, unit="s").isoformat()
+            }
+            self._recent.append(alert)
+        # Later events in the same bucket update the alert in place
+        alert.update(
+            count=ring.current,
+            baseline_mean=round(mean, 3),
+            baseline_std=round(deviation, 3),
+            score=round(score, 2)
+        )
+
+    def alerts(self) -> Dict[str, Any]:
+        """Spikes in each window's current bucket, and the most recent spikes overall."""
+        with self._lock:
+            active = [
+                alert for (window, _), alert in self._open.items()
+                if alert["bucket"] == self._latest_bucket.get(window)
+            ]
+            recent = list(self._recent)
+            return {
+                "active": [_public(alert) for alert in sorted(active, key=lambda a: -a["score"])],
+                "recent": [_public(alert) for alert in reversed(recent)],
+                "windows": self.windows,
+                "baseline_buckets": self.baseline,
+                "threshold": self.threshold,
+                "min_count": self.min_count
+            }
+
+    def rates(self, window: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Current-bucket count and baseline mean of every key in a window."""
+        window = self.windows[0] if window is None else window
+        with self._lock:
+            latest = self._latest_bucket.get(window)
+            return [
+                {
+                    **dict(zip(self.keys, key if isinstance(key, tuple) else (key,))),
+                    "count": ring.current if ring.head_bucket == latest else 0,
+                    "baseline_mean": round(ring.total / self.baseline, 3)
+                }
+                for key, ring in self._rings[window].items()
+            ]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "events": self.events,
+                "late_events": self.late_events,
+                "keys": len(self._rings[self.windows[0]]) if self.windows else 0,
+                "alerts": len(self._recent)
+            }
+
+
+def _public(alert: Dict[str, Any]) -> Dict[str, Any]:
+    return {name: value for name, value in alert.items() if name != "bucket"}
@@ -0,0 +1,231 @@
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# Placeholder for a variable token in a template
+WILDCARD = "<*>"
+
+# Tokens with a digit (ids, counts, addresses, timestamps) are variables
+NUMERIC_TOKEN_RE = re.compile(r"(?<!\S)\S*\d\S*")
+
+# Key of a tree node's template list, next to its child tokens
+_TEMPLATES = None
+
+
+class LogTemplate:
+    """One message shape: its tokens, with variable positions as WILDCARD.
+
+    `first_seen` and `last_seen` are the smallest and largest `seen` values
+    (line numbers or timestamps) of the lines added to it; `examples` holds
+    the first few of those lines verbatim.
+    """
+
+    __slots__ = ("id", "tokens", "count", "first_seen", "last_seen",
+                 "examples", "classification")
+
+    def __init__(self, template_id: int, tokens: List[str]):
+        self.id = template_id
+        self.tokens = tokens
+        self.count = 0
+        self.first_seen = None
+        self.last_seen = None
+        self.examples: List[str] = []
+        # Result of the miner's classify(), computed once per template shape
+        self.classification = None
+
+    @property
+    def template(self) -> str:
+        return " ".join(self.tokens)
+
+    def _seen(self, first: Any, last: Any) -> None:
+        if first is not None and (self.first_seen is None or first < self.first_seen):
+            self.first_seen = first
+        if last is not None and (self.last_seen is None or last > self.last_seen):
+            self.last_seen = last
+
+
+class TemplateMiner:
+    """Drain-style log template miner: groups lines into templates in one pass.
+
+    Numeric tokens are masked first. The line is then routed through a
+    fixed-depth tree keyed by token count and its first depth - 2 constant
+    tokens, and joins the most similar template in that leaf when at least
+    `similarity` of its tokens are equal; the differing positions become
+    wildcards. Lines whose masked text was seen before skip the tree
+    through a lookup table.
+
+    `classify` is called on a template's text once, not on every line, and
+    its result is kept on the template. Tokens containing any of
+    `protected_words` (case-insensitive) are never turned into wildcards,
+    so when classify() only looks for those words inside tokens, every line
+    gets the same result classify() would give the line itself.
+
+    With max_templates, lines of new shapes past the limit get a throwaway
+    template (id -1) that is classified but not kept; they are counted in
+    `overflow_lines`.
+    """
+
+    def __init__(
+        self,
+        classify: Optional[Callable[[str], Any]] = None,
+        protected_words: Iterable[str] = (),
+        depth: int = 4,
+        similarity: float = 0.5,
+        max_children: int = 100,
+        max_examples: int = 3,
+        max_templates: Optional[int] = None,
+        cache_size: int = 100_000
+    ):
+        self.classify = classify
+        words = sorted({word.lower() for word in protected_words}, key=len, reverse=True)
+        # Searched in lowercased tokens; IGNORECASE alternations are far slower
+        self._protected = re.compile("|".join(map(re.escape, words))) if words else None
+        self.depth = depth
+        self.similarity = similarity
+        self.max_children = max_children
+        self.max_examples = max_examples
+        self.max_templates = max_templates
+        self.cache_size = cache_size
+        self._tree: Dict[Any, Any] = {}
+        self._templates: List[LogTemplate] = []
+        self._cache: Dict[str, LogTemplate] = {}
+        self.lines = 0
+        self.overflow_lines = 0
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Callables stay behind when a miner is sent between processes;
+        # the receiving miner classifies with its own
+        state = self.__dict__.copy()
+        state["classify"] = None
+        state["_cache"] = {}
+        return state
+
+    def add(self, message: str, seen: Any = None) -> LogTemplate:
+        """Assign a line to a template, creating or generalizing one as needed."""
+        if self._protected is None:
+            masked = NUMERIC_TOKEN_RE.sub(WILDCARD, message)
+        else:
+            masked = NUMERIC_TOKEN_RE.sub(self._mask, message)
+        template = self._cache.get(masked)
+        if template is None:
+            template = self._match_or_create(masked.split())
+            if template.id < 0:
+                self.overflow_lines += 1
+                self.lines += 1
+                self._classify(template)
+                return template
+            if len(self._cache) >= self.cache_size:
+                self._cache.clear()
+            self._cache[masked] = template
+        template.count += 1
+        if seen is not None:
+            if template.first_seen is None or seen < template.first_seen:
+                template.first_seen = seen
+            if template.last_seen is None or seen > template.last_seen:
+                template.last_seen = seen
+        if template.count <= self.max_examples:
+            template.examples.append(message)
+        if template.classification is None:
+            self._classify(template)
+        self.lines += 1
+        return template
+
+    def merge(self, other: "TemplateMiner", offset: Any = None) -> None:
+        """Fold in another miner's templates, shifting its seen values by offset."""
+        for theirs in other._templates:
+            ours = self._match_or_create(list(theirs.tokens))
+            if ours.id < 0:
+                self.overflow_lines += theirs.count
+                continue
+            ours.count += theirs.count
+            first, last = theirs.first_seen, theirs.last_seen
+            if offset is not None:
+                first = None if first is None else first + offset
+                last = None if last is None else last + offset
+            ours._seen(first, last)
+            room = self.max_examples - len(ours.examples)
+            ours.examples.extend(theirs.examples[:max(0, room)])
+            self._classify(ours)
+        self.lines += other.lines
+        self.overflow_lines += other.overflow_lines
+
+    def compact(self) -> None:
+        """Drop the line lookup table and routing tree, e.g. before caching.
+
+        Everything merge() reads from this miner is kept, but no more lines
+        should be added: without the tree each would start a new template.
+        """
+        self._cache = {}
+        self._tree = {}
+
+    def templates(self) -> List[LogTemplate]:
+        """Every template, most frequent first."""
+        return sorted(self._templates, key=lambda template: -template.count)
+
+    def __getitem__(self, template_id: int) -> LogTemplate:
+        return self._templates[template_id]
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+    def _mask(self, match: "re.Match") -> str:
+        token = match.group(0)
+        return token if self._is_protected(token) else WILDCARD
+
+    def _classify(self, template: LogTemplate) -> None:
+        if template.classification is None and self.classify is not None:
+            template.classification = self.classify(template.template)
+
+    def _leaf(self, tokens: List[str]) -> List[LogTemplate]:
+        node = self._tree.setdefault(len(tokens), {})
+        constant = [token for token in tokens if token != WILDCARD]
+        for token in constant[:max(0, self.depth - 2)]:
+            child = node.get(token)
+            if child is None:
+                if len(node) >= self.max_children:
+                    token = WILDCARD
+                child = node.setdefault(token, {})
+            node = child
+        return node.setdefault(_TEMPLATES, [])
+
+    def _match_or_create(self, tokens: List[str]) -> LogTemplate:
+        leaf = self._leaf(tokens)
+        best, best_score = None, None
+        for template in leaf:
+            score = self._score(template.tokens, tokens)
+            if score is not None and (best_score is None or score > best_score):
+                best, best_score = template, score
+        if best is not None and best_score[0] >= self.similarity:
+            merged = [
+                mine if mine == theirs else WILDCARD
+                for mine, theirs in zip(best.tokens, tokens)
+            ]
+            if merged != best.tokens:
+                best.tokens = merged
+                best.classification = None
+            return best
+        if self.max_templates is not None and len(self._templates) >= self.max_templates:
+            return LogTemplate(-1, tokens)
+        template = LogTemplate(len(self._templates), tokens)
+        self._templates.append(template)
+        leaf.append(template)
+        return template
+
+    def _score(self, template: List[str], tokens: List[str]) -> Optional[tuple]:
+        """(share of equal tokens, wildcard count), or None if they must not merge."""
+        same = wildcards = 0
+        for mine, theirs in zip(template, tokens):
+            if mine == theirs:
+                same += 1
+                wildcards += mine == WILDCARD
+            elif mine == WILDCARD:
+                # A variable position accepts any value classify() ignores
+                if self._is_protected(theirs):
+                    return None
+                wildcards += 1
+            elif self._is_protected(mine) or self._is_protected(theirs):
+                return None
+        return (same / len(tokens) if tokens else 1.0, wildcards)
+
+    def _is_protected(self, token: str) -> bool:
+        return (self._protected is not None and token != WILDCARD
+                and self._protected.search(token.lower()) is not None)
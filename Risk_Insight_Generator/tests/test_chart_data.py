@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+
+from chart_data import (
+    downsample_frame, downsample_series, lttb_indices, minmax_indices,
+    newest_first_order, recent_page
+)
+
+
+def _walk(n, seed=5):
+    y = np.random.default_rng(seed).normal(size=n).cumsum()
+    y[n // 3] += 100
+    y[2 * n // 3] -= 100
+    return y
+
+
+def test_lttb_keeps_the_endpoints_and_spikes_within_the_threshold():
+    y = _walk(10_000)
+    kept = lttb_indices(np.arange(len(y)), y, 500)
+    assert len(kept) == 500
+    assert kept[0] == 0 and kept[-1] == len(y) - 1
+    assert np.all(np.diff(kept) > 0)
+    assert {len(y) // 3, 2 * len(y) // 3} <= set(kept.tolist())
+
+
+def test_minmax_keeps_every_bucket_extreme_within_the_threshold():
+    y = _walk(10_001)
+    kept = minmax_indices(y, 500)
+    assert len(kept) <= 500
+    assert np.all(np.diff(kept) > 0)
+    assert {int(np.argmin(y)), int(np.argmax(y))} <= set(kept.tolist())
+    for bucket in np.array_split(np.arange(len(y)), 250):
+        values = y[bucket]
+        assert bucket[int(np.argmin(values))] in kept
+        assert bucket[int(np.argmax(values))] in kept
+
+
+def test_short_or_empty_inputs_are_kept_whole():
+    for n in (0, 1, 2, 10):
+        y = np.arange(n, dtype="float64")
+        assert lttb_indices(y, y, 10).tolist() == list(range(n))
+        assert minmax_indices(y, 10).tolist() == list(range(n))
+    # Thresholds too small to bucket keep everything too
+    y = np.arange(50, dtype="float64")
+    assert len(lttb_indices(y, y, 2)) == 50
+    assert len(minmax_indices(y, 1)) == 50
+
+    empty = pd.Series([], dtype="float64")
+    assert downsample_series(empty, max_points=10).empty
+    short = pd.Series([1.0, None, 3.0])
+    assert downsample_series(short, max_points=3) is short
+
+
+def test_series_and_frames_are_downsampled_on_their_index():
+    index = pd.date_range("2025-06-17", periods=5_000, freq="min")
+    series = pd.Series(_walk(5_000), index=index)
+    for method in ("lttb", "minmax"):
+        sampled = downsample_series(series, max_points=200, method=method)
+        assert 0 < len(sampled) <= 200
+        assert sampled.index.is_monotonic_increasing
+        assert sampled.equals(series.loc[sampled.index])
+    lttb = downsample_series(series, max_points=200)
+    assert lttb.index[0] == index[0] and lttb.index[-1] == index[-1]
+
+    frame = pd.DataFrame({"database": series.abs(), "network": series.abs() / 2}, index=index)
+    sampled = downsample_frame(frame, max_points=200)
+    assert len(sampled) == 200
+    assert sampled.index[0] == index[0] and sampled.index[-1] == index[-1]
+    assert sampled.equals(frame.loc[sampled.index])
+    short = frame.head(5)
+    assert downsample_frame(short, max_points=200) is short
+
+
+def test_recent_page_matches_a_full_newest_first_sort():
+    rng = np.random.default_rng(2)
+    seconds = rng.permutation(1_000)
+    frame = pd.DataFrame({
+        "timestamp": pd.to_datetime(seconds, unit="s"),
+        "value": seconds
+    })
+    expected = frame.sort_values("timestamp", ascending=False)
+    order = newest_first_order(frame["timestamp"])
+    for page in (1, 2, 37, 100, 101):
+        rows = expected.iloc[(page - 1) * 10:page * 10]
+        assert recent_page(frame, page).equals(rows)
+        assert recent_page(frame, page, order=order).equals(rows)
+    assert recent_page(frame, 101).empty
+
+    short = frame.head(3)
+    assert recent_page(short, page_size=10)["value"].tolist() == sorted(
+        short["value"], reverse=True
+    )
+    assert recent_page(frame.head(0)).empty
+    assert recent_page(frame.head(0), order=newest_first_order(frame.head(0)["timestamp"])).empty
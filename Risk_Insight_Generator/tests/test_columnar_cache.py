@@ -0,0 +1,90 @@
+import os
+from collections import Counter
+
+import pandas as pd
+import pytest
+
+import columnar_cache
+from columnar_cache import ColumnarCache
+
+pytest.importorskip("pyarrow")
+
+
+class Builder:
+    """Turns lines into a one-column frame, recording what it was given."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, data):
+        self.calls.append(data)
+        return pd.DataFrame({"line": data.decode("utf-8").splitlines()}), Counter()
+
+
+def _write(path, text, mode="w"):
+    with open(path, mode, encoding="utf-8") as f:
+        f.write(text)
+
+
+def _load(cache, path, build, appendable=True):
+    frame, _ = cache.load("logs", str(path), build, appendable=appendable)
+    return frame["line"].tolist()
+
+
+def test_appended_lines_are_processed_alone(tmp_path, monkeypatch):
+    cache, build, path = ColumnarCache(str(tmp_path / "cache")), Builder(), tmp_path / "app.log"
+    _write(path, "a\nb\npartial")
+    assert _load(cache, path, build) == ["a", "b", "partial"]
+    _write(path, " line\nc\n", "a")
+    assert _load(cache, path, build) == ["a", "b", "partial line", "c"]
+    assert build.calls == [b"a\nb\n", b"partial", b"partial line\nc\n"]
+    assert cache.stats() == {"hits": 0, "appends": 1, "misses": 1}
+
+    # An unchanged size and mtime is trusted without reading the file
+    def fail(*args):
+        raise AssertionError("unchanged file was read")
+    monkeypatch.setattr(columnar_cache, "_hash_prefix", fail)
+    assert _load(cache, path, build) == ["a", "b", "partial line", "c"]
+    assert cache.stats()["hits"] == 1
+
+
+def test_truncated_or_rewritten_files_are_rebuilt(tmp_path):
+    cache, build, path = ColumnarCache(str(tmp_path / "cache")), Builder(), tmp_path / "app.log"
+    _write(path, "a\nb\nc\n")
+    _load(cache, path, build)
+    _write(path, "x\n")
+    assert _load(cache, path, build) == ["x"]
+    _write(path, "y\nz\nlonger than before\n")
+    assert _load(cache, path, build) == ["y", "z", "longer than before"]
+    assert cache.stats() == {"hits": 0, "appends": 0, "misses": 3}
+
+
+def test_whole_files_are_hashed_only_when_size_or_mtime_change(tmp_path):
+    cache, build, path = ColumnarCache(str(tmp_path / "cache")), Builder(), tmp_path / "app.log"
+    _write(path, "a\nb\n")
+    _load(cache, path, build, appendable=False)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert _load(cache, path, build, appendable=False) == ["a", "b"]
+    _write(path, "a\nc\n")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10**9))
+    assert _load(cache, path, build, appendable=False) == ["a", "c"]
+    assert len(build.calls) == 2
+    assert cache.stats() == {"hits": 1, "appends": 0, "misses": 2}
+
+
+def test_edits_inside_the_processed_prefix_are_detected(tmp_path):
+    cache, build, path = ColumnarCache(str(tmp_path / "cache")), Builder(), tmp_path / "app.log"
+    lines = [f"line {i:06d}" for i in range(50_000)]
+    _write(path, "\n".join(lines) + "\n")
+    _load(cache, path, build)
+
+    # Far from both ends, same length, then appended to
+    lines[25_000] = "edited 0000"
+    _write(path, "\n".join(lines) + "\nnew\n")
+    assert _load(cache, path, build) == lines + ["new"]
+    assert cache.stats() == {"hits": 0, "appends": 0, "misses": 2}
+
+    _write(path, "newer\n", "a")
+    assert _load(cache, path, build) == lines + ["new", "newer"]
+    assert build.calls[-1] == b"newer\n"
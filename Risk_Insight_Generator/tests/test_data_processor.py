@@ -0,0 +1,180 @@
+import gzip
+import io
+import json
+
+import pandas as pd
+import pytest
+
+from benchmarks.generate_data import iter_incidents, iter_log_lines
+from data_processor import (
+    DataProcessor, MalformedLogLine, _iter_json_records, merge_sorted_runs, parse_log_line
+)
+
+
+def _write_shard(path, lines, compress=False):
+    data = ("\n".join(lines) + "\n").encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(gzip.compress(data) if compress else data)
+
+
+def _line(second, message):
+    return f"[2025-06-17 10:00:{second:02d}] INFO: {message}"
+
+
+def test_shards_are_merged_by_timestamp_keeping_shard_order_on_ties(tmp_path):
+    _write_shard(tmp_path / "app.log.1.gz", [_line(5, "b5"), _line(1, "b1"), _line(3, "b3")], True)
+    _write_shard(tmp_path / "app.log.2", [_line(3, "c3"), "garbage", _line(0, "c0")])
+    _write_shard(tmp_path / "app.log", [_line(3, "a3"), _line(9, "a9")])
+    processor = DataProcessor(log_source=str(tmp_path), cache_dir="")
+
+    expected = ["c0", "b1", "a3", "b3", "c3", "b5", "a9"]
+    assert processor.process_log_shards_df(processes=1)["message"].tolist() == expected
+    assert [r["message"] for r in processor.iter_log_shards(processes=2)] == expected
+    assert processor.malformed_logs == {"unrecognized_format": 1}
+
+
+def test_merge_sorted_runs_reads_runs_a_chunk_at_a_time():
+    def run(name, seconds, chunk):
+        frame = pd.DataFrame({
+            "timestamp": pd.to_datetime([f"2025-06-17 10:00:{s:02d}" for s in seconds]),
+            "message": [f"{name}{s}" for s in seconds]
+        })
+        for start in range(0, len(frame), chunk):
+            yield frame.iloc[start:start + chunk]
+
+    a = run("a", [0, 2, 2, 4, 6, 8], 2)
+    b = run("b", [1, 2, 3, 9], 1)
+    chunks = list(merge_sorted_runs([a, run("c", [], 1), b]))
+    assert all(len(chunk) <= 3 for chunk in chunks)
+    assert pd.concat(chunks)["message"].tolist() == [
+        "a0", "b1", "a2", "a2", "b2", "b3", "a4", "a6", "a8", "b9"
+    ]
+
+
+def test_log_methods_default_to_the_log_source(tmp_path):
+    _write_shard(tmp_path / "app.log.1", [_line(1, "old latency")])
+    _write_shard(tmp_path / "app.log.2", [_line(2, "older backup")], True)
+    processor = DataProcessor(log_source=str(tmp_path / "app.log.*"), cache_dir="")
+
+    assert processor.load_logs_df()["message"].tolist() == ["old latency", "older backup"]
+    assert [record["message"] for record in processor.iter_logs()] == ["old latency", "older backup"]
+    processor.load_sample_data()
+    assert processor.logs == [_line(1, "old latency"), _line(2, "older backup")]
+
+
+# Lines the generator does not produce: odd spacing, case, keywords inside
+# words, impossible dates, non-ASCII digits and empty messages
+ADVERSARIAL_LOG_LINES = [
+    "   ",
+    "[2025-06-17 18:00:30] ERROR:",
+    "[2025-06-17 18:00:30] error:   Slow NETWORK backup  ",
+    "[2025-06-17 18:00:30]ERROR: no space after bracket",
+    "[2025-02-30 10:00:00] ERROR: impossible day",
+    "[2025-06-17 24:00:00] WARNING: impossible hour",
+    "[2025-06-17 18:00:3] INFO: short seconds",
+    "[２０２５-06-17 18:00:30] INFO: full-width digits",
+    "[2025-06-17 18:00:30] CRITICAL: Authenticationfailure: datacenter latency",
+    "[2025-06-17 18:00:30] INFO: café [nested] ERROR: degradation",
+    "[2025-06-17 18:00:30] WARN_2: underscore level",
+]
+
+
+def _rows(records):
+    return [{**dict(r), "timestamp": pd.Timestamp(r["timestamp"])} for r in records]
+
+
+def _frame_rows(frame):
+    return _rows(frame.to_dict("records"))
+
+
+def test_vectorized_frames_match_the_per_row_path():
+    processor = DataProcessor(cache_dir="")
+    processor.logs = list(iter_log_lines(20_000, seed=3, malformed_rate=0.02))
+    processor.logs += ADVERSARIAL_LOG_LINES
+    processor.incidents = list(iter_incidents(2_000, seed=3))
+
+    records = processor.process_logs()
+    per_row_malformed = processor.malformed_logs
+    frame = processor.process_logs_df()
+    assert _frame_rows(frame) == _rows(records)
+    assert processor.malformed_logs == per_row_malformed
+    assert set(per_row_malformed) == {"blank", "unrecognized_format", "invalid_timestamp"}
+
+    assert _frame_rows(processor.process_incidents_df()) == _rows(processor.process_incidents())
+
+
+def test_parse_log_line_returns_timestamp_level_and_message():
+    timestamp, level, message = parse_log_line("  [2025-06-17 18:00:30] ERROR:  disk full ")
+    assert (str(timestamp), level, message) == ("2025-06-17T18:00:30", "ERROR", "disk full")
+
+
+def _assert_malformed(lines, reason):
+    for line in lines:
+        with pytest.raises(MalformedLogLine) as error:
+            parse_log_line(line)
+        assert error.value.reason == reason
+        assert error.value.line == line.strip()
+
+    # Both processing paths count every rejected line under the same reason
+    processor = DataProcessor(cache_dir="")
+    processor.logs = lines + [_line(1, "kept")]
+    assert len(processor.process_logs()) == 1
+    assert processor.malformed_logs == {reason: len(lines)}
+    assert len(processor.process_logs_df()) == 1
+    assert processor.malformed_logs == {reason: len(lines)}
+
+
+def test_blank_lines_are_counted_as_blank():
+    _assert_malformed(["", "   ", "\t"], "blank")
+
+
+def test_lines_without_the_log_prefix_are_unrecognized_format():
+    _assert_malformed([
+        "plain text",
+        "[2025-06-17 18:00:30]ERROR: no space",
+        "[2025-06-17 18:00:3] INFO: short seconds",
+        "[2025/06/17 18:00:30] INFO: slashes",
+        "[2025-06-17 18:00:30] INFO no colon",
+        "[2025-06-17 18:00:30] WARN_2: underscore level",
+        "[２０２５-06-17 18:00:30] INFO: full-width digits",
+    ], "unrecognized_format")
+
+
+def test_impossible_dates_are_invalid_timestamps():
+    _assert_malformed([
+        "[2025-02-30 10:00:00] ERROR: impossible day",
+        "[2025-13-01 10:00:00] ERROR: impossible month",
+        "[2025-06-17 24:00:00] WARNING: impossible hour",
+        "[2025-06-17 10:00:60] INFO: leap second",
+    ], "invalid_timestamp")
+
+
+def test_json_records_are_decoded_across_read_boundaries():
+    records = [{"title": "a ] , [", "n": 12345}, 678, "x\ny", [1, [2]], None, 3.5e10]
+    array = " [\n" + ",\n".join(json.dumps(r) for r in records) + "\n] "
+    ndjson = "\n".join(json.dumps(r) for r in records) + "\n"
+    for text in (array, ndjson, ndjson.rstrip("\n")):
+        # Every buffer size splits some value, number or string mid-way
+        for size in range(1, len(text) + 2):
+            assert list(_iter_json_records(io.StringIO(text), size)) == records
+
+    with pytest.raises(json.JSONDecodeError):
+        list(_iter_json_records(io.StringIO('[{"title": "cut'), 4))
+
+
+def test_iter_incidents_reads_arrays_and_ndjson(tmp_path):
+    incidents = list(iter_incidents(30, seed=5))
+    (tmp_path / "incidents.json").write_text(json.dumps(incidents, indent=2), encoding="utf-8")
+    (tmp_path / "incidents.ndjson").write_text(
+        "".join(json.dumps(incident) + "\n" for incident in incidents), encoding="utf-8"
+    )
+    processor = DataProcessor(cache_dir="")
+    processor.incidents = incidents
+    expected = _rows(processor.process_incidents())
+
+    for name in ("incidents.json", "incidents.ndjson"):
+        path = str(tmp_path / name)
+        assert _rows(processor.iter_incidents(path)) == expected
+        frames = list(processor.iter_incidents(path, chunksize=8))
+        assert [len(frame) for frame in frames] == [8, 8, 8, 6]
+        assert _frame_rows(pd.concat(frames, ignore_index=True)) == expected
@@ -0,0 +1,150 @@
+import os
+import time
+
+from data_processor import _logs_frame
+from log_follower import LogFollower, RollingLogStore
+
+
+def _line(second, message):
+    return f"[2025-06-17 10:00:{second:02d}] INFO: {message}\n"
+
+
+def _append(path, text):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(text)
+
+
+def _follower(path, checkpoint=None):
+    return LogFollower(str(path), RollingLogStore(), _logs_frame, checkpoint_path=checkpoint)
+
+
+def _messages(follower):
+    return follower.store.frame()["message"].tolist()
+
+
+def test_follower_reads_only_complete_new_lines(tmp_path):
+    log = tmp_path / "app.log"
+    _append(log, _line(1, "first") + _line(2, "sec")[:-1])
+    follower = _follower(log)
+
+    assert follower.poll() == 1
+    assert follower.poll() == 0
+    _append(log, "ond")
+    assert follower.poll() == 0
+    _append(log, "\n" + _line(3, "third"))
+    assert follower.poll() == 2
+    assert _messages(follower) == ["first", "second", "third"]
+    assert follower.lines_read == 3
+
+
+def test_follower_resumes_from_its_checkpoint(tmp_path):
+    log, checkpoint = tmp_path / "app.log", str(tmp_path / "state" / "follow.json")
+    _append(log, _line(1, "old") + _line(2, "par")[:-1])
+    first = _follower(log, checkpoint)
+    first.poll()
+    first.stop()
+
+    _append(log, "tial\n" + _line(3, "new"))
+    second = _follower(log, checkpoint)
+    second.poll()
+    assert _messages(second) == ["partial", "new"]
+
+    # A different file at the same path is not resumed into
+    os.remove(log)
+    _append(log, _line(4, "fresh") * 3)
+    third = _follower(log, checkpoint)
+    third.poll()
+    assert _messages(third) == ["fresh"] * 3
+
+
+def test_follower_drains_rotated_file_then_reads_the_new_one(tmp_path):
+    log = tmp_path / "app.log"
+    _append(log, _line(1, "a"))
+    follower = _follower(log)
+    follower.poll()
+
+    _append(log, _line(2, "b") + _line(3, "unterminated")[:-1])
+    os.rename(log, tmp_path / "app.log.1")
+    # Until the path is recreated the old file may still be extended
+    assert follower.poll() == 1
+    _append(log, _line(4, "c"))
+    assert follower.poll() == 2
+    assert _messages(follower) == ["a", "b", "unterminated", "c"]
+    assert follower.rotations == 1
+
+
+def test_follower_restarts_after_truncation(tmp_path):
+    log = tmp_path / "app.log"
+    _append(log, _line(1, "a") + _line(2, "b") + _line(3, "c"))
+    follower = _follower(log)
+    follower.poll()
+
+    with open(log, "w", encoding="utf-8") as f:
+        f.write(_line(4, "d"))
+    assert follower.poll() == 1
+    assert _messages(follower) == ["a", "b", "c", "d"]
+    assert follower.truncations == 1
+
+
+def test_follower_restarts_after_rewrite_past_its_offset(tmp_path):
+    log = tmp_path / "app.log"
+    _append(log, _line(1, "a"))
+    follower = _follower(log)
+    follower.poll()
+
+    # Same inode, at least as long: only the changed first bytes reveal it
+    with open(log, "w", encoding="utf-8") as f:
+        f.write(_line(5, "x") + _line(6, "y"))
+    assert follower.poll() == 2
+    assert _messages(follower) == ["a", "x", "y"]
+    assert follower.truncations == 1
+
+
+def test_checkpoint_is_only_written_when_the_position_moves(tmp_path):
+    log, checkpoint = tmp_path / "app.log", tmp_path / "follow.json"
+    _append(log, _line(1, "a"))
+    follower = _follower(log, str(checkpoint))
+    follower.poll()
+    assert checkpoint.exists()
+
+    checkpoint.unlink()
+    follower.poll()
+    _append(log, _line(2, "b")[:-1])
+    follower.poll()
+    assert not checkpoint.exists()
+    _append(log, "\n")
+    follower.poll()
+    assert checkpoint.exists()
+
+
+def test_background_polling_survives_errors(tmp_path):
+    log = tmp_path / "app.log"
+    _append(log, _line(1, "poison"))
+    calls = []
+
+    def process(lines, malformed):
+        calls.append(lines)
+        if len(calls) == 1:
+            raise OSError("disk full")
+        return _logs_frame(lines, malformed)
+
+    follower = LogFollower(str(log), RollingLogStore(), process, poll_interval=0.01)
+    follower.start()
+    try:
+        for _ in range(200):
+            if follower.errors:
+                break
+            time.sleep(0.01)
+        assert follower.status()["failing"]
+        _append(log, _line(2, "ok"))
+        for _ in range(200):
+            if len(follower.store):
+                break
+            time.sleep(0.01)
+    finally:
+        follower.stop()
+
+    status = follower.status()
+    assert status["errors"] == 1 and status["last_error"] == "OSError: disk full"
+    assert not status["failing"]
+    assert _messages(follower) == ["ok"]
@@ -0,0 +1,211 @@
+import asyncio
+import json
+import pickle
+import time
+
+from fastapi.testclient import TestClient
+
+import main
+from main import RISK_CATEGORIES, RiskKeywordMatcher, extract_risk_signals
+from result_cache import ResultCache
+from service_common.executor import WorkExecutor
+
+matcher = RiskKeywordMatcher(RISK_CATEGORIES)
+
+
+def test_matcher_finds_keywords_and_phrases():
+    assert matcher.find("Packet loss and high LATENCY after the crash") == {
+        "packet loss", "loss", "latency", "crash"
+    }
+    assert matcher.find("no risk here") == set()
+
+
+def test_matcher_splits_words_like_the_nltk_tokenizer():
+    # Joined by punctuation the tokenizer split on
+    for text in ["breach--attack", "breach;attack", "breach(attack)", "breach&attack",
+                 "breach...attack", "breach,attack", "'breach' attack!", "breach. attack"]:
+        assert matcher.find(text) == {"breach", "attack"}, text
+    # ...and by punctuation it kept inside one token
+    for text in ["breach-attack", "breach/attack", "breach.attack", "breach^attack",
+                 "breach_attack", "breach=attack", "x'breach+attack"]:
+        assert matcher.find(text) == set(), text
+    assert matcher.find("crash's cause") == {"crash"}
+    assert matcher.find("crash:5") == set()
+    assert matcher.find("backup.log restored") == set()
+
+
+def test_batch_scan_matches_single_scans():
+    texts = ["crash", "breach--attack", "", "x-loss", "latency."]
+    assert matcher.find_many(texts) == [matcher.find(text) for text in texts]
+
+
+def test_extract_risk_signals_reports_each_rule():
+    signals = extract_risk_signals("Security breach caused an outage")
+    assert {(s.category, s.severity) for s in signals} == {
+        ("security", "HIGH"), ("system", "MEDIUM")
+    }
+
+
+async def _chunks(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def _line_batches(data: bytes, size: int):
+    async def collect():
+        batches = main.iter_line_batches(_chunks(data, size))
+        return [line async for lines in batches for line in lines]
+    return asyncio.run(collect())
+
+
+def test_line_batches_rejoin_characters_split_across_chunks():
+    data = "crash café\nrestore 日本 ok\n🔥 breach".encode("utf-8")
+    for size in range(1, len(data) + 1):
+        lines = _line_batches(data, size)
+        assert [main._decode_log_line(line) for line in lines] == [
+            ("crash café", 0), ("restore 日本 ok", 0), ("🔥 breach", 0)
+        ], size
+
+
+def test_overlong_lines_are_cut_between_characters(monkeypatch):
+    monkeypatch.setattr(main, "MAX_LOG_LINE_BYTES", 10)
+    line = "é" * 8 + "日本" * 4
+    pieces = _line_batches(line.encode("utf-8"), 7)
+    assert all(len(piece) <= 10 for piece in pieces)
+    assert "".join(piece.decode("utf-8") for piece in pieces) == line
+
+
+def test_invalid_utf8_is_replaced_and_counted():
+    assert main._decode_log_line(b"disk \xff\xfe crash") == ("disk \ufffd\ufffd crash", 2)
+    # A truncated sequence at the end of a line is invalid too
+    assert main._decode_log_line("café".encode("utf-8")[:-1]) == ("caf\ufffd", 1)
+
+
+def test_analyze_log_counts_only_truly_invalid_bytes(monkeypatch):
+    monkeypatch.setattr(main, "LOG_CHUNK_SIZE", 3)
+    log = "ERROR crash in café\nINFO 日本 restore\n".encode("utf-8") + b"WARN \xff latency\n"
+    response = TestClient(main.app).post("/analyze/log", files={"file": ("app.log", log)})
+    assert response.status_code == 200
+    summary = response.json()
+    assert summary["lines_processed"] == 3
+    assert summary["invalid_utf8_sequences"] == 1
+    assert summary["invalid_utf8_lines"] == 1
+    assert {a["keyword"]: a["first_line"] for a in summary["signal_aggregates"]} == {
+        "crash": 1, "restore": 2, "latency": 3
+    }
+
+
+def test_cached_log_partials_keep_only_mergeable_state(monkeypatch):
+    monkeypatch.setattr(main, "result_cache", ResultCache())
+    # Thousands of distinct lines of a single template
+    names = ["".join(chr(97 + i // 26 ** k % 26) for k in range(4)) for i in range(20_000)]
+    log = "".join(f"user {name} reported a breach\n" for name in names).encode("utf-8")
+    client = TestClient(main.app)
+    first = client.post("/analyze/log", files={"file": ("app.log", log)}).json()
+
+    cached = [partial for _, partial in main.result_cache._entries.values()]
+    assert cached
+    for partial in cached:
+        assert not partial.templates._cache and not partial.templates._tree
+        # The matcher pattern dominates; nothing grows with the line count
+        assert len(pickle.dumps(partial)) < 16_384
+    assert client.post("/analyze/log", files={"file": ("app.log", log)}).json() == first
+    assert main.result_cache.stats()["hits"] == len(cached)
+    assert first["signal_aggregates"][0]["count"] == 20_000
+
+
+def _post_log(log=b"ERROR crash\n"):
+    return TestClient(main.app).post("/analyze/log", files={"file": ("app.log", log)})
+
+
+def test_saturated_executor_answers_503_with_retry_after(monkeypatch):
+    monkeypatch.setattr(main, "executor", WorkExecutor(max_pending=0, retry_after=3))
+    response = _post_log()
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "3"
+    metrics = TestClient(main.app).get("/metrics").text
+    assert 'executor_calls_total{outcome="rejected"} 1' in metrics
+    assert "executor_queue_depth 0" in metrics
+
+
+def test_analysis_timeout_answers_504_but_slow_uploads_do_not(monkeypatch):
+    monkeypatch.setattr(main, "executor", WorkExecutor(timeout=0.05))
+    monkeypatch.setattr(main, "result_cache", ResultCache(max_entries=0))
+    real_analyze = main.analyze_log_lines
+
+    def slow_analyze(lines, verbose):
+        time.sleep(0.2)
+        return real_analyze(lines, verbose)
+
+    monkeypatch.setattr(main, "analyze_log_lines", slow_analyze)
+    assert _post_log().status_code == 504
+    assert main.executor.metrics()["timed_out"] == 1
+
+    # Reading the upload takes longer than the timeout; each batch's
+    # analysis does not, so the request succeeds
+    monkeypatch.setattr(main, "analyze_log_lines", real_analyze)
+    while main.executor.metrics()["in_flight"]:
+        # The abandoned call still holds its worker
+        time.sleep(0.01)
+
+    async def slow_batches(file):
+        for line in (b"ERROR crash", b"WARN latency", b"INFO restore"):
+            await asyncio.sleep(0.04)
+            yield [line]
+
+    monkeypatch.setattr(main, "iter_upload_lines", slow_batches)
+    response = _post_log()
+    assert response.status_code == 200
+    assert response.json()["lines_processed"] == 3
+
+
+def _incident(title, description):
+    return {"title": title, "description": description,
+            "timestamp": "2025-06-17T18:00:00", "severity": "HIGH"}
+
+
+def _batch(content):
+    response = TestClient(main.app).post("/analyze/incidents/batch", content=content)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_incident_batch_matches_single_analysis_for_a_json_array(monkeypatch):
+    monkeypatch.setattr(main, "INCIDENT_BATCH_SIZE", 2)
+    incidents = [_incident(f"t{i}", text) for i, text in enumerate(
+        ["database breach", "slow latency", "nothing to see", "backup failure"]
+    )]
+    results = _batch(json.dumps(incidents))
+    client = TestClient(main.app)
+    assert [result.pop("index") for result in results] == [0, 1, 2, 3]
+    assert [result.pop("title") for result in results] == ["t0", "t1", "t2", "t3"]
+    assert results == [client.post("/analyze/incident", json=i).json() for i in incidents]
+
+
+def test_incident_batch_streams_ndjson_and_reports_invalid_records(monkeypatch):
+    monkeypatch.setattr(main, "INCIDENT_BATCH_SIZE", 2)
+    body = "\n".join([
+        json.dumps(_incident("a", "breach")),
+        "",
+        json.dumps({"title": "missing fields"}),
+        "{not json",
+        json.dumps(_incident("b", "latency"))
+    ]).encode("utf-8") + b"\n"
+    # Lines split across request chunks
+    chunks = (body[i:i + 7] for i in range(0, len(body), 7))
+    results = _batch(chunks)
+    assert [result["index"] for result in results] == [0, 1, 2, 3]
+    assert [result.get("title") for result in results] == ["a", None, None, "b"]
+    assert "description" in results[1]["error"] and "Field required" in results[1]["error"]
+    assert "Invalid JSON" in results[2]["error"]
+    assert results[3]["severity_counts"]["MEDIUM"] >= 1
+
+
+def test_incident_batch_rejects_a_malformed_array():
+    client = TestClient(main.app)
+    response = client.post("/analyze/incidents/batch", content=b'[{"title": "a"},')
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Invalid JSON array")
+    response = client.post("/analyze/incidents/batch", content=b"  []")
+    assert response.status_code == 200 and response.text == ""
@@ -0,0 +1,54 @@
+import result_cache
+from result_cache import ResultCache, content_key
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_content_key_depends_on_every_part_and_its_boundaries():
+    assert content_key("log", 1, b"abc") == content_key("log", "1", "abc")
+    assert content_key("ab", "c") != content_key("a", "bc")
+    assert content_key("log", 1, b"abc") != content_key("log", 2, b"abc")
+    assert len(content_key(b"x" * 10_000)) == 32
+
+
+def test_entries_expire_after_their_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(result_cache.time, "monotonic", clock)
+    cache = ResultCache(max_entries=4, ttl=10.0)
+    cache.put("a", 1)
+    clock.now += 9.9
+    assert cache.get("a") == 1
+    # Reading does not extend the TTL
+    clock.now += 0.1
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["expirations"], stats["entries"]) == (1, 1, 1, 0)
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = ResultCache(max_entries=2, ttl=60.0)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    # Overwriting refreshes an entry
+    cache.put("a", 4)
+    cache.put("d", 5)
+    assert cache.get("c") is None and cache.get("a") == 4
+    assert cache.stats()["evictions"] == 2
+
+
+def test_zero_size_or_ttl_disables_the_cache():
+    for cache in (ResultCache(max_entries=0), ResultCache(ttl=0)):
+        assert not cache.enabled
+        cache.put("a", 1)
+        assert cache.get("a") is None
+        assert cache.stats()["entries"] == 0
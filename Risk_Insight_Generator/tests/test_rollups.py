@@ -0,0 +1,29 @@
+import pandas as pd
+
+from rollups import TimeRollup
+
+
+def _records(*rows):
+    return pd.DataFrame(rows, columns=["timestamp", "category", "impact_level"]).assign(
+        timestamp=lambda df: pd.to_datetime(df["timestamp"])
+    )
+
+
+def test_rollup_buckets_by_hour_and_day_across_updates():
+    rollup = TimeRollup.from_frame(_records(
+        ("2025-06-17 10:05", "database", 2),
+        ("2025-06-17 10:55", "network", None)
+    ))
+    rollup.update(_records(
+        ("2025-06-17 11:00", "database", 4),
+        ("2025-06-18 00:10", "database", 3)
+    ))
+
+    hourly = rollup.totals("hour")
+    assert hourly.index.strftime("%d %H").tolist() == ["17 10", "17 11", "18 00"]
+    assert hourly["count"].tolist() == [2, 1, 1]
+    assert hourly["impact_count"].tolist() == [1, 1, 1]
+    daily = rollup.totals("day")
+    assert daily["count"].tolist() == [3, 1]
+    assert daily["mean_impact"].tolist() == [3.0, 3.0]
+    assert rollup.category_counts("day")["database"].tolist() == [2, 1]
@@ -0,0 +1,96 @@
+import pandas as pd
+
+import search_index
+from search_index import SearchIndex, parse_query
+
+
+def _incidents():
+    return pd.DataFrame({
+        "timestamp": pd.to_datetime(["2025-06-17 10:00", "2025-06-17 12:00", "2025-06-18 09:00"]),
+        "title": ["Database latency", "Disk full", "Login outage"],
+        "description": ["slow queries on primary", "disk-space alert on db host", "auth database down"],
+        "severity": ["high", "Critical", "HIGH"]
+    })
+
+
+def _logs():
+    return pd.DataFrame({
+        "timestamp": pd.to_datetime(["2025-06-17 11:00", "2025-06-18 08:00"]),
+        "message": ["Database connection latency spike", "disk usage normal"],
+        "severity": ["WARNING", "INFO"]
+    })
+
+
+def _index():
+    index = SearchIndex()
+    index.add_frame(_incidents(), "incident")
+    index.add_frame(_logs(), "log")
+    return index
+
+
+def _texts(results):
+    return [hit["text"] for hit in results["hits"]]
+
+
+def test_parse_query_splits_alternatives_and_tokenizes_terms():
+    assert parse_query("Database AND latency OR disk-space | x") == [
+        ["database", "latency"], ["disk", "space"], ["x"]
+    ]
+    assert parse_query("  ") == []
+
+
+def test_terms_must_all_match_and_alternatives_are_unioned(monkeypatch):
+    index = _index()
+    assert _texts(index.search("database latency")) == [
+        "Database connection latency spike", "Database latency"
+    ]
+    assert _texts(index.search("outage | disk space", limit=10)) == [
+        "Login outage", "Disk full"
+    ]
+    assert index.search("database missing")["total"] == 0
+    assert index.search("")["total"] == 5
+
+    # Large result sets switch to bitmaps with the same answers
+    monkeypatch.setattr(search_index, "BITMAP_THRESHOLD", 1)
+    assert _texts(index.search("database latency")) == [
+        "Database connection latency spike", "Database latency"
+    ]
+    assert index.search("outage OR disk")["total"] == 3
+
+
+def test_filters_limit_and_newest_first_order():
+    index = _index()
+    assert _texts(index.search(kinds=["log"])) == [
+        "disk usage normal", "Database connection latency spike"
+    ]
+    assert _texts(index.search(severities=["high"])) == ["Login outage", "Database latency"]
+    assert index.search(severities=["unknown"])["total"] == 0
+    results = index.search(start="2025-06-17 11:00", end="2025-06-18 08:00")
+    assert results["total"] == 3
+    assert [hit["timestamp"] for hit in results["hits"]] == [
+        "2025-06-18T08:00:00", "2025-06-17T12:00:00", "2025-06-17T11:00:00"
+    ]
+
+    limited = index.search(limit=2)
+    assert limited["total"] == 5
+    assert _texts(limited) == ["Login outage", "disk usage normal"]
+    assert index.search(limit=0)["hits"] == []
+
+
+def test_added_documents_extend_existing_postings():
+    index = _index()
+    assert index.search("database")["total"] == 3
+    index.add_frame(pd.DataFrame({
+        "timestamp": pd.to_datetime(["2025-06-19 00:00"]),
+        "message": ["database failover"],
+        "severity": ["ERROR"]
+    }), "log")
+
+    results = index.search("database")
+    assert results["total"] == 4
+    assert results["hits"][0] == {
+        "id": 5, "kind": "log", "timestamp": "2025-06-19T00:00:00",
+        "severity": "ERROR", "text": "database failover"
+    }
+    assert index.severities() == ["HIGH", "CRITICAL", "WARNING", "INFO", "ERROR"]
+    assert index.stats()["documents"] == 6
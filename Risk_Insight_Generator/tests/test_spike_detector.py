@@ -0,0 +1,85 @@
+import random
+
+import pandas as pd
+
+from spike_detector import RingCounter, SpikeDetector
+
+
+def test_ring_counter_sums_match_the_baseline_buckets():
+    rng = random.Random(7)
+    ring, counts = RingCounter(baseline=5, bucket=0), {}
+    newest = 0
+    for _ in range(2000):
+        bucket = max(0, newest + rng.choice([-7, -3, -1, 0, 0, 0, 1, 1, 2, 9]))
+        count = rng.randint(1, 3)
+        accepted = ring.add(bucket, count)
+        newest = max(newest, bucket)
+        # Buckets older than the baseline are rejected
+        assert accepted == (bucket > newest - 6)
+        if accepted:
+            counts[bucket] = counts.get(bucket, 0) + count
+        baseline = [counts.get(b, 0) for b in range(newest - 5, newest)]
+        assert ring.current == counts.get(newest, 0)
+        assert ring.total == sum(baseline)
+        assert ring.squares == sum(count * count for count in baseline)
+
+
+def _detector(**options):
+    return SpikeDetector(windows=[60], baseline=5, keys=["category"], **{
+        "threshold": 3.0, "min_count": 4, **options
+    })
+
+
+def test_spike_needs_a_full_baseline_min_count_and_threshold():
+    detector = _detector()
+    # A busy first bucket is start-up traffic, not a spike
+    detector.add(("db",), 0, 50)
+    for minute, count in enumerate([2, 4, 2, 4, 2], 1):
+        detector.add(("db",), minute * 60, count)
+    assert detector.alerts()["recent"] == []
+
+    # The first bucket has left the baseline; three events are below min_count
+    detector.add(("db",), 360, 3)
+    assert detector.alerts()["active"] == []
+    detector.add(("db",), 361, 30)
+    [alert] = detector.alerts()["active"]
+    assert alert == {
+        "category": "db", "window_seconds": 60, "start": "1970-01-01T00:06:00",
+        "count": 33, "baseline_mean": 2.8, "baseline_std": 0.98, "score": 18.05
+    }
+
+    # The next bucket closes the alert but keeps it in the history
+    detector.add(("db",), 420, 1)
+    alerts = detector.alerts()
+    assert alerts["active"] == [] and len(alerts["recent"]) == 1
+
+    detector.add(("db",), 0, 1)
+    assert detector.stats() == {"events": 99, "late_events": 1, "keys": 1, "alerts": 1}
+
+
+def test_silent_keys_have_a_zero_baseline():
+    detector = _detector(min_count=5)
+    for minute in range(6):
+        detector.add(("net",), minute * 60, 1)
+    detector.add(("auth",), 360, 5)
+    assert [alert["category"] for alert in detector.alerts()["active"]] == ["auth"]
+    assert detector.rates() == [
+        {"category": "net", "count": 0, "baseline_mean": 1.0},
+        {"category": "auth", "count": 5, "baseline_mean": 0.0}
+    ]
+
+
+def test_update_counts_a_frame_like_single_events():
+    timestamps = [0, 30, 61, 61, 125, 119, 300, 301, 302, 303, 304]
+    frame = pd.DataFrame({
+        "timestamp": pd.to_datetime(timestamps, unit="s"),
+        "category": ["db", "db", "db", "net", "db", "db", "db", "db", "db", "db", "net"],
+        "severity": "HIGH"
+    })
+    batched, single = _detector(min_count=2), _detector(min_count=2)
+    batched.update(frame)
+    for second, category in sorted(zip(timestamps, frame["category"])):
+        single.add((category,), second)
+    assert batched.alerts() == single.alerts()
+    assert batched.rates() == single.rates()
+    assert batched.stats() == single.stats()
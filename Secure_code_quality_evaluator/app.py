@@ -73,8 +73,14 @@ with st.container():
                 
                 # Individual evaluator results
                 st.subheader("Detailed Results")
+                wall_time_ms = result.get('wall_time_ms', {})
                 for evaluator, details in result['results'].items():
-                    with st.expander(f"{evaluator.capitalize()} Results"):
+                    title = f"{evaluator.capitalize()} Results"
+                    if evaluator in wall_time_ms:
+                        title += f" ({wall_time_ms[evaluator]:.0f} ms)"
+                    with st.expander(title):
+                        if evaluator in result.get('errors', {}):
+                            st.warning(f"{evaluator.capitalize()} did not finish: {result['errors'][evaluator]}")
                         st.json(details)
                         
             else:
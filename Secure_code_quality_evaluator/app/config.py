@@ -18,6 +18,19 @@ class Settings(BaseSettings):
     MAX_CODE_LENGTH: int = 100000  # Maximum code length in characters
     DEFAULT_EVALUATORS: list = ["correctness", "maintainability", "security"]
     
+    # Executor Settings
+    EXECUTOR_KIND: str = "thread"  # "thread" or "process"
+    EXECUTOR_WORKERS: int = 0  # 0 means one per CPU, and at least one per evaluator
+    EXECUTOR_MAX_PENDING: int = 32  # In-flight evaluator calls before returning 503
+    EXECUTOR_TIMEOUT: float = 30.0  # Seconds per evaluator call
+    EXECUTOR_RETRY_AFTER: int = 1  # Retry-After seconds sent with 503
+    EVALUATOR_TIMEOUT: float = 10.0  # Seconds per evaluator; 0 uses EXECUTOR_TIMEOUT
+    
+    # Metrics Settings
+    SERVER_TIMING: bool = False  # Report stage spans in a Server-Timing header
+    PROFILE_SAMPLE_RATE: float = 0.0  # Share of requests run under cProfile
+    PROFILE_DIR: str = "profiles"  # Where sampled cProfile stats are dumped
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
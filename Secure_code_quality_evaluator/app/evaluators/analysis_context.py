@@ -0,0 +1,66 @@
+import ast
+import threading
+import tokenize
+from typing import Any, Callable, Dict, List
+
+
+class AnalysisContext:
+    """One submission's source, parsed once and shared by every evaluator.
+
+    The views (lines, tokens, AST) are built on first use and
+    cached, so evaluators running concurrently on the same context parse
+    the source once between them. A view that fails to build (e.g. the AST
+    of invalid code) raises the same exception on every access.
+
+    Lines split like str.splitlines(True), and tokens are generated from
+    those lines, so token rows index `lines` (1-based). Evaluators must
+    treat the views as read-only. Only the source is pickled, so a context
+    sent to a process pool worker is parsed again there.
+    """
+
+    def __init__(self, code: str):
+        self.code = code
+        self._views: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"code": self.code}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.code = state["code"]
+        self._views = {}
+        self._lock = threading.RLock()
+
+    def _view(self, name: str, build: Callable[[], Any]) -> Any:
+        view = self._views.get(name)
+        if view is None:
+            with self._lock:
+                view = self._views.get(name)
+                if view is None:
+                    try:
+                        view = (build(), None)
+                    except Exception as e:
+                        view = (None, e)
+                    self._views[name] = view
+        value, error = view
+        if error is not None:
+            raise error
+        return value
+
+    @property
+    def lines(self) -> List[str]:
+        """Source lines with their line endings."""
+        return self._view("lines", lambda: self.code.splitlines(True))
+
+    @property
+    def tokens(self) -> List[tokenize.TokenInfo]:
+        """Every token of the source; raises tokenize.TokenError or SyntaxError."""
+        def build() -> List[tokenize.TokenInfo]:
+            lines = iter(self.lines)
+            return list(tokenize.generate_tokens(lambda: next(lines, "")))
+        return self._view("tokens", build)
+
+    @property
+    def tree(self) -> ast.Module:
+        """The module's AST; raises SyntaxError for invalid code."""
+        return self._view("tree", lambda: ast.parse(self.code))
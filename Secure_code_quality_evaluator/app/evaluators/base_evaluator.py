@@ -1,15 +1,23 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from datetime import datetime
+from .analysis_context import AnalysisContext
 
 class BaseEvaluator(ABC):
     """Base class for all code evaluators."""
     
     @abstractmethod
-    def evaluate(self, code: str) -> Dict[str, Any]:
-        """Evaluate the code and return results."""
+    def evaluate(self, code: str, context: Optional[AnalysisContext] = None) -> Dict[str, Any]:
+        """Evaluate the code and return results.
+
+        `context` is the request's shared AnalysisContext for `code`; when
+        omitted the evaluator builds its own.
+        """
         pass
 
+    def _context(self, code: str, context: Optional[AnalysisContext]) -> AnalysisContext:
+        return context if context is not None else AnalysisContext(code)
+
     def _format_results(self, raw_results: Dict[str, Any]) -> Dict[str, Any]:
         """Format evaluation results into a standardized format."""
         try:
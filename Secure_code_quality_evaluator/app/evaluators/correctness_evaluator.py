@@ -1,33 +1,79 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from .base_evaluator import BaseEvaluator
+from .analysis_context import AnalysisContext
 import pycodestyle
-import ast
+import tokenize
+
+class _StyleReport(pycodestyle.BaseReport):
+    """Collects style errors instead of printing them."""
+
+    def __init__(self, options):
+        super().__init__(options)
+        self.errors: List[Dict[str, Any]] = []
+
+    def error(self, line_number, offset, text, check):
+        code = super().error(line_number, offset, text, check)
+        if code:
+            self.errors.append({
+                "line": line_number,
+                "column": offset + 1,
+                "code": code,
+                "message": text[5:]
+            })
+        return code
+
+class _SharedTokenChecker(pycodestyle.Checker):
+    """pycodestyle Checker that reads an AnalysisContext's tokens instead of
+    tokenizing the lines again."""
+
+    def __init__(self, tokens: List[tokenize.TokenInfo], **kwargs):
+        super().__init__(**kwargs)
+        self._shared_tokens = tokens
+
+    def generate_tokens(self):
+        """Mirror of Checker.generate_tokens over the shared tokens."""
+        prev_physical = ''
+        for token in self._shared_tokens:
+            if token[2][0] > self.total_lines:
+                return
+            # tokenize reads a line just before producing its tokens; the
+            # physical line checks rely on the line number and indent
+            # character readline() tracks
+            while self.line_number < token[3][0]:
+                self.readline()
+            self.noqa = token[4] and pycodestyle.noqa(token[4])
+            self.maybe_check_physical(token, prev_physical)
+            yield token
+            prev_physical = token[4]
 
 class CorrectnessEvaluator(BaseEvaluator):
     """Evaluator for code correctness."""
-    
-    def evaluate(self, code: str) -> Dict[str, Any]:
+
+    def __init__(self):
+        # Built once: resolving pycodestyle's options reads its config files
+        self._style_options = pycodestyle.StyleGuide({}).options
+
+    def evaluate(self, code: str, context: Optional[AnalysisContext] = None) -> Dict[str, Any]:
         """
         Evaluate code correctness by checking:
         - Syntax errors
         - PEP 8 compliance
         - Basic code structure
         """
+        context = self._context(code, context)
         try:
             # Check if code can be parsed
-            ast.parse(code)
-            
+            context.tree
+
             # Check PEP 8 compliance
-            style_checker = pycodestyle.Checker()
-            style_checker.lines = code.splitlines(True)
-            style_errors = list(style_checker.check_all())
-            
+            style_errors = self._style_errors(context)
+
             return self._format_results({
                 "syntax_valid": True,
                 "style_errors": style_errors,
                 "pep8_compliance": len(style_errors) == 0
             })
-            
+
         except SyntaxError as e:
             return self._format_results({
                 "syntax_valid": False,
@@ -35,3 +81,18 @@ class CorrectnessEvaluator(BaseEvaluator):
                 "style_errors": [],
                 "pep8_compliance": False
             })
+
+    def _style_errors(self, context: AnalysisContext) -> List[Dict[str, Any]]:
+        report = _StyleReport(self._style_options)
+        # Checkers may strip a BOM from the first line in place
+        lines = list(context.lines)
+        try:
+            tokens = context.tokens
+        except (SyntaxError, tokenize.TokenError):
+            checker = pycodestyle.Checker(lines=lines, options=self._style_options, report=report)
+        else:
+            checker = _SharedTokenChecker(
+                tokens, lines=lines, options=self._style_options, report=report
+            )
+        checker.check_all()
+        return report.errors
@@ -1,30 +1,51 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from .base_evaluator import BaseEvaluator
-import radon.complexity as cc
+from .analysis_context import AnalysisContext
+from radon.visitors import ComplexityVisitor
 import radon.metrics as metrics
-import ast
+import radon.raw as raw
+import tokenize
+
+# Tokens that carry no code of their own for radon's raw metrics
+_LAYOUT_TOKENS = (tokenize.INDENT, tokenize.DEDENT, tokenize.NL, tokenize.NEWLINE, tokenize.ENDMARKER)
 
 class MaintainabilityEvaluator(BaseEvaluator):
     """Evaluator for code maintainability."""
-    
-    def evaluate(self, code: str) -> Dict[str, Any]:
+
+    def evaluate(self, code: str, context: Optional[AnalysisContext] = None) -> Dict[str, Any]:
         """
         Evaluate code maintainability by checking:
         - Cyclomatic complexity
         - Maintainability index
         - Code metrics
+
+        The shared AST is visited once for both the per-block complexity and
+        the maintainability index, whose raw line counts come from the
+        shared tokens; radon's cc_visit and mi_visit would parse three times.
         """
+        context = self._context(code, context)
         try:
+            tree = context.tree
+
             # Calculate cyclomatic complexity
-            blocks = cc.cc_visit(code)
+            visitor = ComplexityVisitor.from_ast(tree)
+            blocks = visitor.blocks
             avg_complexity = sum(b.complexity for b in blocks) / len(blocks) if blocks else 0
-            
-            # Calculate maintainability index
-            mi = metrics.mi_visit(code, True)
-            
+
+            # Calculate maintainability index, as radon's mi_visit(code, True)
+            counts = _raw_metrics(context)
+            comment_lines = counts.comments + counts.multi
+            comments = comment_lines / float(counts.sloc) * 100 if counts.sloc != 0 else 0
+            mi = metrics.mi_compute(
+                metrics.h_visit_ast(tree).total.volume,
+                visitor.total_complexity,
+                counts.lloc,
+                comments
+            )
+
             # Calculate lines of code
             lines = code.split('\n')
-            
+
             return self._format_results({
                 "cyclomatic_complexity": {
                     "average": avg_complexity,
@@ -37,7 +58,7 @@ class MaintainabilityEvaluator(BaseEvaluator):
                     "blank_lines": len([line for line in lines if not line.strip()])
                 }
             })
-            
+
         except Exception as e:
             return self._format_results({
                 "error": str(e),
@@ -45,3 +66,74 @@ class MaintainabilityEvaluator(BaseEvaluator):
                 "maintainability_index": None,
                 "code_metrics": None
             })
+
+def _raw_metrics(context: AnalysisContext) -> raw.Module:
+    """radon.raw.analyze() of the source, computed from the shared tokens.
+
+    radon tokenizes each stripped line on its own, adding following lines
+    until the tokens are complete. Those groups are the runs of lines up to
+    one that ends outside any bracket, string or continuation, which the
+    full token stream marks with NEWLINE or NL. Each group is then counted
+    the way radon counts it. Falls back to radon when the tokens are
+    unusable.
+    """
+    try:
+        tokens = context.tokens
+    except (SyntaxError, tokenize.TokenError):
+        return raw.analyze(context.code)
+    if any(token.type == tokenize.ERRORTOKEN for token in tokens):
+        return raw.analyze(context.code)
+
+    lines = [line.strip() for line in context.lines]
+    # Group tokens by the group their first row belongs to
+    groups: List[List[tokenize.TokenInfo]] = []
+    group_ends: List[int] = []
+    current: List[tokenize.TokenInfo] = []
+    depth = 0
+    for token in tokens:
+        if token.type == tokenize.OP:
+            if token.string in '([{':
+                depth += 1
+            elif token.string in ')]}':
+                depth -= 1
+        if token.type in (tokenize.NEWLINE, tokenize.NL) and depth == 0:
+            if token.start[0] > len(lines):
+                break
+            groups.append(current)
+            group_ends.append(token.start[0])
+            current = []
+        elif token.type not in _LAYOUT_TOKENS:
+            current.append(token)
+    if current:
+        # Source not ending in a closed line; let radon decide
+        return raw.analyze(context.code)
+
+    lloc = comments = single_comments = multi = blank = sloc = 0
+    start = 1
+    for group, end in zip(groups, group_ends):
+        parsed = lines[start - 1:end]
+        start = end + 1
+        comments += sum(1 for token in group if token.type == tokenize.COMMENT)
+        if len(group) == 1 and group[0].type == tokenize.COMMENT:
+            single_comments += 1
+        elif len(group) == 1 and group[0].type == tokenize.STRING:
+            if group[0].start[0] == group[0].end[0]:
+                single_comments += 1
+            else:
+                multi += sum(1 for line in parsed if line)
+                blank += sum(1 for line in parsed if not line)
+        else:
+            for line in parsed:
+                if line:
+                    sloc += 1
+                else:
+                    blank += 1
+        lloc += raw._logical(group + [_ENDMARKER])
+    if start <= len(lines):
+        # Trailing lines the token stream did not close
+        return raw.analyze(context.code)
+
+    loc = sloc + blank + multi + single_comments
+    return raw.Module(loc, lloc, sloc, comments, multi, blank, single_comments)
+
+_ENDMARKER = tokenize.TokenInfo(tokenize.ENDMARKER, '', (0, 0), (0, 0), '')
@@ -1,32 +1,65 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from .base_evaluator import BaseEvaluator
-import bandit
-import ast
-import json
+from .analysis_context import AnalysisContext
+from bandit.core import config as b_config
+from bandit.core import extension_loader as b_extension_loader
+from bandit.core import meta_ast as b_meta_ast
+from bandit.core import metrics as b_metrics
+from bandit.core import node_visitor as b_node_visitor
+from bandit.core import test_set as b_test_set
+import io
+import re
+import tokenize
+
+# Name the submission is scanned under; a bare "./name.py" resolves to a
+# module name without bandit looking for packages on disk
+SUBMISSION_PATH = "./submission.py"
+
+# "# nosec", optionally followed by the test IDs or names it skips, e.g.
+# "# nosec B602, B607"; the same syntax bandit's file scans accept
+NOSEC_COMMENT = re.compile(r"#\s*nosec:?\s*(?P<tests>[^#]+)?#?")
+NOSEC_TEST = re.compile(r"(B\d+|[a-z\d_]+)", re.IGNORECASE)
+
+class _SharedTreeVisitor(b_node_visitor.BanditNodeVisitor):
+    """Bandit's node visitor run over an already parsed AST."""
+
+    def process(self, tree):
+        """BanditNodeVisitor.process() without parsing the source again."""
+        self.generic_visit(tree)
+        # Tests that only need the whole file source
+        self.context = {
+            "file_data": self.fdata,
+            "filename": self.fname,
+            "lineno": 0,
+            "linerange": [0, 1],
+            "col_offset": 0,
+        }
+        self.update_scores(self.tester.run_tests(self.context, "File"))
+        return self.scores
 
 class SecurityEvaluator(BaseEvaluator):
     """Evaluator for code security."""
-    
-    def evaluate(self, code: str) -> Dict[str, Any]:
+
+    def __init__(self):
+        # Loading bandit's plugins and profile is the costly part of a scan,
+        # so it happens once per process; the test set is only read by scans
+        self._config = b_config.BanditConfig()
+        self._test_set = b_test_set.BanditTestSet(self._config, {})
+
+    def evaluate(self, code: str, context: Optional[AnalysisContext] = None) -> Dict[str, Any]:
         """
         Evaluate code security by checking:
         - Common security vulnerabilities
         - Best practices violations
         - Security patterns
+
+        The submitted source is scanned in memory with bandit's tests,
+        honouring `# nosec` comments.
         """
+        context = self._context(code, context)
         try:
-            # Parse code into AST
-            tree = ast.parse(code)
-            
-            # Run Bandit security checks
-            config = bandit.config.BanditConfig()
-            b_mgr = bandit.manager.BanditManager(config, 'file')
-            b_mgr.discover_files(['temp.py'], 'file')
-            b_mgr.run_tests()
-            
-            # Get results
-            results = b_mgr.get_issue_list()
-            
+            results = self._scan(context)
+
             return self._format_results({
                 "security_issues": [
                     {
@@ -40,19 +73,53 @@ class SecurityEvaluator(BaseEvaluator):
                 ],
                 "security_score": self._calculate_security_score(results)
             })
-            
+
         except Exception as e:
             return self._format_results({
                 "error": str(e),
                 "security_issues": [],
                 "security_score": None
             })
-    
+
+    def _scan(self, context: AnalysisContext) -> List[Any]:
+        """Run bandit's tests over the submission, as BanditManager would for a file."""
+        tree = context.tree
+        metrics = b_metrics.Metrics()
+        metrics.begin(SUBMISSION_PATH)
+        visitor = _SharedTreeVisitor(
+            SUBMISSION_PATH,
+            io.BytesIO(context.code.encode("utf-8")),
+            b_meta_ast.BanditMetaAst(),
+            self._test_set,
+            False,
+            self._nosec_lines(context),
+            metrics
+        )
+        visitor.process(tree)
+        return sorted(visitor.tester.results, key=lambda issue: issue.lineno)
+
+    def _nosec_lines(self, context: AnalysisContext) -> Dict[int, Any]:
+        """Line number -> tests skipped there by a `# nosec` comment."""
+        if "nosec" not in context.code:
+            return {}
+        try:
+            tokens = context.tokens
+        except (SyntaxError, tokenize.TokenError):
+            return {}
+        nosec_lines = {}
+        for token in tokens:
+            if token.type != tokenize.COMMENT:
+                continue
+            tests = _parse_nosec_comment(token.string)
+            if tests is not None:
+                nosec_lines[token.start[0]] = tests
+        return nosec_lines
+
     def _calculate_security_score(self, issues):
         """Calculate a security score based on issues found."""
         if not issues:
             return 100
-            
+
         scores = []
         for issue in issues:
             severity = issue.severity.lower()
@@ -62,5 +129,19 @@ class SecurityEvaluator(BaseEvaluator):
                 scores.append(40)
             else:
                 scores.append(60)
-        
+
         return max(0, 100 - sum(scores) / len(issues))
+
+def _parse_nosec_comment(comment: str) -> Optional[set]:
+    """Test IDs a `# nosec` comment skips; empty for all, None if not a nosec comment."""
+    match = NOSEC_COMMENT.search(comment)
+    if match is None:
+        return None
+    extensions = b_extension_loader.MANAGER
+    test_ids = set()
+    for name in NOSEC_TEST.findall(match.group("tests") or ""):
+        # Tests may be named by ID (B602) or by name (start_process_with_a_shell)
+        test_id = name if extensions.check_id(name) else extensions.get_test_id(name)
+        if test_id:
+            test_ids.add(test_id)
+    return test_ids
@@ -1,14 +1,25 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
+import asyncio
 import importlib
 import logging
+import os
+import time
 from datetime import datetime
 import json
+from app.config import get_settings
+from app.evaluators.analysis_context import AnalysisContext
+from service_common.executor import ExecutorSaturated, ExecutorTimeout, WorkExecutor
+from service_common.metrics import PROMETHEUS_CONTENT_TYPE, MetricsMiddleware, record_stage, registry, span
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
+# Bandit logs every visited node at DEBUG, which would be formatted and
+# emitted for each scan, roughly tripling its time
+logging.getLogger("bandit").setLevel(logging.INFO)
 logger = logging.getLogger(__name__)
 
 app = FastAPI(
@@ -49,6 +60,121 @@ for name, path in evaluators.items():
             detail=f"Failed to initialize evaluator {name}: {str(e)}"
         )
 
+# Evaluations are CPU-bound (pycodestyle, radon, bandit), so they run on a
+# bounded worker pool instead of blocking the event loop. Each selected
+# evaluator is its own call, so one request's evaluators run side by side
+# (on separate CPUs with EXECUTOR_KIND="process"). By default there are
+# at least as many workers as evaluators, so a slow one cannot hold up the
+# rest of a request
+settings = get_settings()
+executor = WorkExecutor(
+    kind=settings.EXECUTOR_KIND,
+    max_workers=settings.EXECUTOR_WORKERS or max(os.cpu_count() or 1, len(evaluators)),
+    max_pending=settings.EXECUTOR_MAX_PENDING,
+    timeout=settings.EXECUTOR_TIMEOUT if settings.EXECUTOR_TIMEOUT > 0 else None,
+    retry_after=settings.EXECUTOR_RETRY_AFTER
+)
+
+# Requests and each evaluator are timed into GET /metrics; see the metrics
+# settings in app/config.py for Server-Timing headers and sampled profiling
+app.add_middleware(
+    MetricsMiddleware,
+    server_timing=settings.SERVER_TIMING,
+    profile_rate=settings.PROFILE_SAMPLE_RATE,
+    profile_dir=settings.PROFILE_DIR
+)
+
+@app.exception_handler(ExecutorSaturated)
+async def executor_saturated_handler(request: Request, exc: ExecutorSaturated):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+@app.exception_handler(ExecutorTimeout)
+async def executor_timeout_handler(request: Request, exc: ExecutorTimeout):
+    return JSONResponse(status_code=504, content={"detail": str(exc)})
+
+@app.on_event("shutdown")
+def shutdown_executor():
+    executor.shutdown()
+
+def evaluate_one(evaluator_name: str, context: AnalysisContext) -> Dict[str, Any]:
+    """Run a single evaluator on a submission. Runs on the executor."""
+    logger.debug(f"Evaluating with {evaluator_name}...")
+    return evaluator_instances[evaluator_name].evaluate(context.code, context)
+
+def _score(evaluator_name: str, results: Dict[str, Any]) -> Optional[float]:
+    """An evaluator's 0-100 score, or None if it could not produce one."""
+    if evaluator_name == "correctness":
+        return 100 if results.get("pep8_compliance") else 0
+    if evaluator_name == "maintainability":
+        return results.get("maintainability_index")
+    if evaluator_name == "security":
+        return results.get("security_score")
+    return None
+
+async def _timed_evaluation(evaluator_name: str, context: AnalysisContext) -> Tuple[Optional[Dict[str, Any]], Optional[str], float]:
+    """Run one evaluator on the executor: (result, error, wall seconds)."""
+    timeout = settings.EVALUATOR_TIMEOUT if settings.EVALUATOR_TIMEOUT > 0 else None
+    start = time.perf_counter()
+    result, error = None, None
+    try:
+        result = await executor.run(
+            evaluate_one, evaluator_name, context, timeout=timeout, reject=False
+        )
+    except ExecutorTimeout as e:
+        error = str(e)
+    except Exception as e:
+        logger.error(f"Evaluator {evaluator_name} failed: {str(e)}")
+        error = f"{type(e).__name__}: {e}"
+    elapsed = time.perf_counter() - start
+    record_stage(f"evaluator.{evaluator_name}", elapsed)
+    return result, error, elapsed
+
+async def run_evaluations(code: str, evaluator_names: List[str]) -> Dict[str, Any]:
+    """Run the named evaluators on code concurrently and score them.
+
+    Each evaluator is a separate call on the executor with its own
+    EVALUATOR_TIMEOUT, counted from when a worker starts it. One that fails
+    or times out gets an error marker in its results and under `errors`,
+    and is left out of the overall score; the others are still reported.
+    Wall time per evaluator includes any wait for a free worker.
+
+    The evaluators share one AnalysisContext, so on a thread pool the
+    source is tokenized and parsed once per request.
+    """
+    names = list(dict.fromkeys(evaluator_names))
+    context = AnalysisContext(code)
+    outcomes = await asyncio.gather(*(_timed_evaluation(name, context) for name in names))
+
+    results = {}
+    errors = {}
+    wall_time_ms = {}
+    scores = []
+    for evaluator_name, (result, error, elapsed) in zip(names, outcomes):
+        wall_time_ms[evaluator_name] = round(elapsed * 1000, 3)
+        if error is not None:
+            results[evaluator_name] = {"error": error}
+            errors[evaluator_name] = error
+            continue
+        results[evaluator_name] = result["results"]
+        score = _score(evaluator_name, result["results"])
+        if score is not None:
+            scores.append(score)
+    
+    # Calculate overall score as the average of the evaluators that produced one
+    overall_score = sum(scores) / len(scores) if scores else 0
+    
+    return {
+        "results": results,
+        "overall_score": overall_score,
+        "errors": errors,
+        "wall_time_ms": wall_time_ms,
+        "timestamp": datetime.now().isoformat()
+    }
+
 class CodeEvaluationRequest(BaseModel):
     code: str
     evaluators: List[str] = ["correctness", "maintainability", "security"]
@@ -56,6 +182,8 @@ class CodeEvaluationRequest(BaseModel):
 class CodeEvaluationResponse(BaseModel):
     results: Dict[str, Any]
     overall_score: float
+    errors: Dict[str, str] = {}
+    wall_time_ms: Dict[str, float] = {}
     timestamp: str
 
 @app.post("/evaluate", response_model=CodeEvaluationResponse)
@@ -71,41 +199,24 @@ async def evaluate_code(request: CodeEvaluationRequest):
         if not request.code:
             raise HTTPException(status_code=400, detail="Code cannot be empty")
         
-        results = {}
-        scores = []
-        
         for evaluator_name in request.evaluators:
             if evaluator_name not in evaluator_instances:
                 raise HTTPException(
                     status_code=400,
                     detail=f"Unknown evaluator: {evaluator_name}"
                 )
-            
-            logger.debug(f"Evaluating with {evaluator_name}...")
-            evaluator = evaluator_instances[evaluator_name]
-            result = evaluator.evaluate(request.code)
-            results[evaluator_name] = result
-            
-            # Calculate score based on evaluator type
-            if evaluator_name == "correctness":
-                scores.append(100 if result["results"]["results"]["pep8_compliance"] else 0)
-            elif evaluator_name == "maintainability":
-                scores.append(result["results"]["results"]["maintainability_index"])
-            elif evaluator_name == "security":
-                scores.append(result["results"]["results"]["security_score"])
-        
-        # Calculate overall score as weighted average
-        overall_score = sum(scores) / len(scores) if scores else 0
         
-        response = {
-            "results": {k: v["results"] for k, v in results.items()},
-            "overall_score": overall_score,
-            "timestamp": datetime.now().isoformat()
-        }
+        # Admission is decided once per request; its evaluator calls are
+        # then never shed individually
+        executor.check_capacity()
+        with span("evaluate"):
+            response = await run_evaluations(request.code, request.evaluators)
         logger.debug(f"Evaluation complete. Response: {json.dumps(response, indent=2)}")
         
         return response
         
+    except (HTTPException, ExecutorSaturated, ExecutorTimeout):
+        raise
     except Exception as e:
         logger.error(f"Error during evaluation: {str(e)}")
         raise HTTPException(
@@ -117,6 +228,34 @@ async def evaluate_code(request: CodeEvaluationRequest):
 async def root():
     return {"message": "Welcome to Secure Code Quality Evaluator API"}
 
+@app.get("/health")
+async def health_check():
+    """Health check endpoint, including evaluation queue metrics."""
+    return {
+        "status": "healthy",
+        "timestamp": datetime.now().isoformat(),
+        "executor": executor.metrics()
+    }
+
+def _runtime_samples():
+    """Executor counters for GET /metrics, read at scrape time."""
+    pool = executor.metrics()
+    return [
+        ("executor_in_flight", "gauge", "Evaluations running or queued on the worker pool",
+         [({}, pool["in_flight"])]),
+        ("executor_queue_depth", "gauge", "Evaluations waiting for a pool worker",
+         [({}, pool["queue_depth"])]),
+        ("executor_calls_total", "counter", "Evaluations by outcome",
+         [({"outcome": outcome}, pool[outcome]) for outcome in ("completed", "rejected", "timed_out")]),
+    ]
+
+registry.add_collector(_runtime_samples)
+
+@app.get("/metrics")
+async def metrics():
+    """Request, stage and per-evaluator latency histograms, as Prometheus text."""
+    return PlainTextResponse(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,159 @@
+"""Per-request latency of the security evaluator, before and after in-memory scanning.
+
+- per_request_manager: the previous approach. A fresh BanditConfig and
+  BanditManager per request (loading every plugin and the profile) scan
+  the submission written to a temporary file.
+- in_memory: SecurityEvaluator as served, with the bandit test set loaded
+  once and the submission's AST scanned in memory.
+
+Both scan a small snippet with known issues and a large generated module
+near MAX_CODE_LENGTH. Each reports p50/p99 latency and the issues found,
+and the two must agree on the issues.
+
+Usage:
+    python benchmarks/security_benchmark.py [--requests 50] [--output results.json]
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from app.config import get_settings  # noqa: E402
+from app.evaluators.security_evaluator import SecurityEvaluator  # noqa: E402
+
+SMALL_CODE = (
+    "import os\n"
+    "import pickle\n"
+    "import subprocess\n"
+    "\n"
+    "\n"
+    "def run(cmd, blob):\n"
+    "    os.system(cmd)\n"
+    "    subprocess.call(cmd, shell=True)\n"
+    "    return pickle.loads(blob)\n"
+)
+
+# One function per block, alternating clean and flagged code
+BLOCK = (
+    "def handler_{n}(request, cmd):\n"
+    "    values = [item * {n} for item in request if item]\n"
+    "    if cmd:\n"
+    "        subprocess.call(cmd, shell=True)\n"
+    "    return sum(values) + len(request)\n"
+    "\n"
+    "\n"
+)
+
+
+def large_code(limit: int) -> str:
+    """A module of generated functions just under `limit` characters."""
+    parts = ["import subprocess\n\n\n"]
+    size = len(parts[0])
+    n = 0
+    while size + len(BLOCK.format(n=n)) <= limit:
+        parts.append(BLOCK.format(n=n))
+        size += len(parts[-1])
+        n += 1
+    return "".join(parts)
+
+
+def _issues(found: List[Tuple]) -> List[Tuple]:
+    return sorted(found)
+
+
+def per_request_manager(code: str) -> List[Tuple]:
+    from bandit.core import config as b_config
+    from bandit.core import manager as b_manager
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "submission.py")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(code)
+        manager = b_manager.BanditManager(b_config.BanditConfig(), "file")
+        manager.discover_files([path], False)
+        manager.run_tests()
+        return _issues([
+            (issue.test_id, issue.severity, issue.confidence, issue.lineno)
+            for issue in manager.get_issue_list()
+        ])
+
+
+_evaluator = None
+
+
+def in_memory(code: str) -> List[Tuple]:
+    global _evaluator
+    if _evaluator is None:
+        _evaluator = SecurityEvaluator()
+    result = _evaluator.evaluate(code)["results"]
+    return _issues([
+        (issue["test_id"], issue["severity"], issue["confidence"], issue["line_number"])
+        for issue in result["security_issues"]
+    ])
+
+
+APPROACHES: Dict[str, Callable[[str], List[Tuple]]] = {
+    "per_request_manager": per_request_manager,
+    "in_memory": in_memory,
+}
+
+
+def measure(scan: Callable[[str], List[Tuple]], code: str, requests: int) -> Dict[str, Any]:
+    # The first call pays one-time setup (for in_memory, loading the test set)
+    start = time.perf_counter()
+    issues = scan(code)
+    first = time.perf_counter() - start
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        scan(code)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return {
+        "first_ms": first * 1000,
+        "p50_ms": statistics.median(samples) * 1000,
+        "p99_ms": samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000,
+        "issues": len(issues),
+        "_found": issues,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--output", help="save results to this JSON file")
+    args = parser.parse_args()
+
+    # bandit logs every scanned file
+    logging.disable(logging.INFO)
+    inputs = {"small": SMALL_CODE, "large": large_code(get_settings().MAX_CODE_LENGTH)}
+    results: Dict[str, Any] = {"requests": args.requests, "inputs": {}}
+    failed = False
+    for name, code in inputs.items():
+        measured = {approach: measure(scan, code, args.requests) for approach, scan in APPROACHES.items()}
+        found = [m.pop("_found") for m in measured.values()]
+        if any(issues != found[0] for issues in found):
+            failed = True
+            print(f"FAIL: {name}: approaches disagree on the issues found")
+        results["inputs"][name] = {
+            "characters": len(code),
+            **measured,
+            "p50_speedup": measured["per_request_manager"]["p50_ms"] / measured["in_memory"]["p50_ms"],
+        }
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,6 +2,7 @@ import pytest
 from app.evaluators.correctness_evaluator import CorrectnessEvaluator
 from app.evaluators.maintainability_evaluator import MaintainabilityEvaluator
 from app.evaluators.security_evaluator import SecurityEvaluator
+from app.evaluators.analysis_context import AnalysisContext
 
 def test_correctness_evaluator():
     evaluator = CorrectnessEvaluator()
@@ -16,6 +17,15 @@ def test_correctness_evaluator():
     result = evaluator.evaluate(invalid_code)
     assert result["results"]["syntax_valid"] is False
 
+def test_correctness_evaluator_reports_style_errors():
+    evaluator = CorrectnessEvaluator()
+    
+    result = evaluator.evaluate("import os\ndef f(x) :\n    return x\n")
+    codes = [error["code"] for error in result["results"]["style_errors"]]
+    assert "E302" in codes
+    assert "E203" in codes
+    assert result["results"]["pep8_compliance"] is False
+
 def test_maintainability_evaluator():
     evaluator = MaintainabilityEvaluator()
     
@@ -25,6 +35,27 @@ def test_maintainability_evaluator():
     assert result["results"]["cyclomatic_complexity"]["average"] == 1
     assert result["results"]["maintainability_index"] > 0
 
+def test_maintainability_matches_radon():
+    import radon.complexity as cc
+    import radon.metrics as metrics
+    
+    # Comments, a multi-line docstring, brackets, semicolons and continuations
+    code = (
+        "# comment\n"
+        "def f(a, b):\n"
+        '    """Doc\n'
+        "\n"
+        '    string."""\n'
+        "    x = [a,\n"
+        "         b]; y = 1\n"
+        "    if a: return x\n"
+        "    return \\\n"
+        "        y\n"
+    )
+    result = MaintainabilityEvaluator().evaluate(code)
+    assert result["results"]["maintainability_index"] == metrics.mi_visit(code, True)
+    assert result["results"]["cyclomatic_complexity"]["blocks"] == len(cc.cc_visit(code))
+
 def test_security_evaluator():
     evaluator = SecurityEvaluator()
     
@@ -33,3 +64,94 @@ def test_security_evaluator():
     result = evaluator.evaluate(vulnerable_code)
     assert len(result["results"]["security_issues"]) > 0
     assert result["results"]["security_score"] < 100
+
+def test_evaluators_share_analysis_context():
+    code = "import os\n\n\ndef run(cmd):\n    if cmd:\n        os.system(cmd)\n    return cmd\n"
+    context = AnalysisContext(code)
+    for evaluator in (CorrectnessEvaluator(), MaintainabilityEvaluator(), SecurityEvaluator()):
+        shared = evaluator.evaluate(code, context)["results"]
+        alone = evaluator.evaluate(code)["results"]
+        assert shared == alone
+    # Parsed once and reused by every evaluator
+    assert context.tree is context.tree
+
+def test_security_evaluator_scans_submission_in_memory(monkeypatch):
+    import builtins
+    import tempfile
+    evaluator = SecurityEvaluator()
+    
+    def no_files(*args, **kwargs):
+        raise AssertionError("security scan touched the filesystem")
+    monkeypatch.setattr(builtins, "open", no_files)
+    monkeypatch.setattr(tempfile, "NamedTemporaryFile", no_files)
+    
+    vulnerable_code = (
+        "import pickle\n"
+        "import subprocess\n"
+        "\n"
+        "def run(cmd, blob):\n"
+        "    subprocess.call(cmd, shell=True)\n"
+        "    return pickle.loads(blob)\n"
+    )
+    issues = evaluator.evaluate(vulnerable_code)["results"]["security_issues"]
+    found = {(issue["test_id"], issue["line_number"]) for issue in issues}
+    assert ("B602", 5) in found
+    assert ("B301", 6) in found
+    
+    # Each request sees only its own submission, with the same test set
+    test_set = evaluator._test_set
+    result = evaluator.evaluate("def add(a, b):\n    return a + b\n")
+    assert result["results"]["security_issues"] == []
+    assert result["results"]["security_score"] == 100
+    assert evaluator._test_set is test_set
+
+def test_security_evaluator_honours_nosec():
+    evaluator = SecurityEvaluator()
+    
+    code = "import os\ndef run(cmd):\n    os.system(cmd)  # nosec\n    os.system(cmd)\n"
+    issues = evaluator.evaluate(code)["results"]["security_issues"]
+    assert [issue["line_number"] for issue in issues if issue["test_id"] == "B605"] == [4]
+
+def test_security_evaluator_nosec_skips_only_the_named_tests():
+    evaluator = SecurityEvaluator()
+    
+    code = (
+        "import os\n"
+        "def run(cmd):\n"
+        "    os.system(cmd)  # nosec B605\n"
+        "    os.system(cmd)  # nosec: B602, B607\n"
+        "    os.system(cmd)  #nosec start_process_with_a_shell\n"
+        "    os.system(cmd)  # nothing to skip here\n"
+    )
+    issues = evaluator.evaluate(code)["results"]["security_issues"]
+    assert [issue["line_number"] for issue in issues if issue["test_id"] == "B605"] == [4, 6]
+    # "nosec" in a string is not a comment
+    issues = evaluator.evaluate("import os\nos.system('# nosec')\n")["results"]["security_issues"]
+    assert "B605" in [issue["test_id"] for issue in issues]
+
+RAW_METRICS_SOURCES = [
+    "",
+    "x = 1",
+    "x = 1\n\n\n",
+    "# only a comment\n",
+    # Docstrings: one line, multi-line with blank lines, and as statements
+    'def f():\n    """One line."""\n    return 1\n',
+    '"""Module\n\ndocstring.\n"""\nimport os\n',
+    "class A:\n    '''\n    Doc\n\n    '''\n    x = '''not\na docstring'''\n",
+    # Continuation lines: backslashes, brackets, and strings inside them
+    "total = 1 + \\\n    2 + \\\n    3\n",
+    "call(a,\n     # inside\n     b,\n\n     c)\n",
+    "values = {\n    'a': '''x\ny''',\n    'b': [1,\n          2],\n}\n",
+    # Comments after code, between blocks and after semicolons
+    "import os  # trailing\n\n# between\ndef g(x): return x; y = 2  # two\n",
+    "if x:\n    pass\nelse:  # comment\n    y = 1; z = 2\n    # end\n",
+    "s = 'text # not a comment'\nt = \"#\"\n",
+    "async def h():\n    async with a as b:\n        await b\n    return [i for i in b\n            if i]\n",
+]
+
+@pytest.mark.parametrize("code", RAW_METRICS_SOURCES)
+def test_raw_metrics_match_radon(code):
+    import radon.raw as raw
+    from app.evaluators.maintainability_evaluator import _raw_metrics
+    
+    assert _raw_metrics(AnalysisContext(code)) == raw.analyze(code)
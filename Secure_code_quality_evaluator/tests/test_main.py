@@ -0,0 +1,71 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as main
+from service_common.executor import WorkExecutor
+
+class FakeEvaluator:
+    def __init__(self, results=None, delay=0.0, error=None):
+        self.results = results or {}
+        self.delay = delay
+        self.error = error
+
+    def evaluate(self, code, context=None):
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return {"results": self.results}
+
+@pytest.fixture
+def client(monkeypatch):
+    # One worker, as on a single-CPU host
+    executor = WorkExecutor(max_workers=1, timeout=5.0)
+    monkeypatch.setattr(main, "executor", executor)
+    monkeypatch.setattr(main.settings, "EVALUATOR_TIMEOUT", 0.3)
+    monkeypatch.setitem(main.evaluator_instances, "correctness",
+                        FakeEvaluator({"pep8_compliance": True}))
+    monkeypatch.setitem(main.evaluator_instances, "security",
+                        FakeEvaluator({"security_score": 60}))
+    yield TestClient(main.app)
+    executor.shutdown()
+
+def _evaluate(client, *names):
+    response = client.post("/evaluate", json={"code": "x = 1\n", "evaluators": list(names)})
+    assert response.status_code == 200
+    return response.json()
+
+def test_failed_evaluator_is_reported_next_to_partial_results(client, monkeypatch):
+    monkeypatch.setitem(main.evaluator_instances, "maintainability",
+                        FakeEvaluator(error=RuntimeError("radon exploded")))
+    body = _evaluate(client, "correctness", "maintainability", "security")
+    assert body["results"]["correctness"] == {"pep8_compliance": True}
+    assert body["results"]["maintainability"] == {"error": "RuntimeError: radon exploded"}
+    assert body["errors"] == {"maintainability": "RuntimeError: radon exploded"}
+    # Only the evaluators that produced a score are averaged
+    assert body["overall_score"] == 80
+    assert set(body["wall_time_ms"]) == {"correctness", "maintainability", "security"}
+
+def test_slow_evaluator_times_out_without_failing_the_others(client, monkeypatch):
+    monkeypatch.setitem(main.evaluator_instances, "maintainability",
+                        FakeEvaluator({"maintainability_index": 90}, delay=0.8))
+    body = _evaluate(client, "maintainability", "security")
+    # Security queued behind the slow evaluator on the single worker, but
+    # its timeout only started once it ran
+    assert body["errors"] == {"maintainability": "Timed out after 0.3s"}
+    assert body["results"]["security"] == {"security_score": 60}
+    assert body["overall_score"] == 60
+    assert body["wall_time_ms"]["maintainability"] >= 300
+    assert body["wall_time_ms"]["security"] >= 300
+
+    # The abandoned call still holds the worker; a real failure behind it
+    # is reported as such, not as a timeout
+    monkeypatch.setitem(main.evaluator_instances, "security",
+                        FakeEvaluator(error=ValueError("bad input")))
+    body = _evaluate(client, "security")
+    assert body["errors"] == {"security": "ValueError: bad input"}
+    assert body["overall_score"] == 0
+
+def test_default_pool_has_a_worker_per_evaluator():
+    assert main.executor.max_workers >= len(main.evaluators)
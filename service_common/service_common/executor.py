@@ -0,0 +1,177 @@
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+# Seconds between checks whether a queued call has been picked up by a worker
+START_POLL_INTERVAL = 0.005
+
+
+class ExecutorSaturated(Exception):
+    """Raised when the work queue is full and a request must be retried later."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Executor saturated, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class ExecutorTimeout(Exception):
+    """Raised when offloaded work does not finish within its timeout."""
+
+
+class WorkExecutor:
+    """Bounded thread or process pool for CPU-bound request handling.
+
+    Handlers await `run()` so the event loop stays free for other
+    connections. At most `max_pending` calls may be in flight (running or
+    queued); beyond that `run()` raises ExecutorSaturated immediately.
+    Work that outlives its timeout keeps its slot until it really finishes,
+    so a stuck pool still sheds load instead of queueing without bound.
+
+    A call's timeout counts from when a worker starts it, so time spent
+    queued behind other work is not charged to it; the wait for a worker
+    is bounded by the executor's own timeout.
+    """
+
+    def __init__(
+        self,
+        kind: str = "thread",
+        max_workers: Optional[int] = None,
+        max_pending: int = 32,
+        timeout: Optional[float] = 30.0,
+        retry_after: int = 1
+    ):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown executor kind: {kind}")
+        self.kind = kind
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._pool: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._timed_out = 0
+
+    @classmethod
+    def from_env(cls, prefix: str) -> "WorkExecutor":
+        """Build an executor from <prefix>KIND, WORKERS, MAX_PENDING, TIMEOUT and RETRY_AFTER."""
+        env = os.environ
+        timeout = float(env.get(prefix + "TIMEOUT", 30.0))
+        return cls(
+            kind=env.get(prefix + "KIND", "thread"),
+            max_workers=int(env.get(prefix + "WORKERS", 0)) or None,
+            max_pending=int(env.get(prefix + "MAX_PENDING", 32)),
+            timeout=timeout if timeout > 0 else None,
+            retry_after=int(env.get(prefix + "RETRY_AFTER", 1))
+        )
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.kind == "process":
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="work-executor"
+                )
+        return self._pool
+
+    def _release(self, _future) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._completed += 1
+
+    def _check_capacity_locked(self) -> None:
+        if self._in_flight >= self.max_pending:
+            self._rejected += 1
+            raise ExecutorSaturated(self.retry_after)
+
+    def check_capacity(self) -> None:
+        """Raise ExecutorSaturated if a new call would be rejected right now."""
+        with self._lock:
+            self._check_capacity_locked()
+
+    def acquire(self) -> None:
+        """Reserve a slot, raising ExecutorSaturated when none is free."""
+        with self._lock:
+            self._check_capacity_locked()
+            self._in_flight += 1
+
+    async def run(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        timeout: Optional[float] = None,
+        reject: bool = True
+    ) -> Any:
+        """Run fn(*args) on the pool and await its result.
+
+        `timeout` defaults to the executor's own; pass reject=False for work
+        that must not be shed, e.g. the next block of a response that is
+        already streaming.
+        """
+        if reject:
+            self.acquire()
+        else:
+            with self._lock:
+                self._in_flight += 1
+        try:
+            if self.kind == "thread":
+                # Threads see the caller's context (e.g. its request's timings)
+                future = self._get_pool().submit(contextvars.copy_context().run, fn, *args)
+            else:
+                future = self._get_pool().submit(fn, *args)
+        except BaseException:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        result = asyncio.wrap_future(future)
+        limit = timeout if timeout is not None else self.timeout
+
+        if not await self._wait_started(future, result):
+            result.cancel()
+            with self._lock:
+                self._timed_out += 1
+            raise ExecutorTimeout(f"No free worker within {self.timeout}s")
+        try:
+            return await asyncio.wait_for(result, limit)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._timed_out += 1
+            raise ExecutorTimeout(f"Timed out after {limit}s")
+
+    async def _wait_started(self, future, result: asyncio.Future) -> bool:
+        """Wait until a worker picks up a submitted call; False on timeout."""
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        # Neither pool notifies when a call starts, so its state is polled
+        while not (future.running() or future.done()):
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            await asyncio.wait({result}, timeout=START_POLL_INTERVAL)
+        return True
+
+    def metrics(self) -> Dict[str, Any]:
+        """Snapshot of pool size, queue depth and outcome counters."""
+        with self._lock:
+            in_flight = self._in_flight
+            return {
+                "kind": self.kind,
+                "workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "in_flight": in_flight,
+                "queue_depth": max(0, in_flight - self.max_workers),
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "timed_out": self._timed_out
+            }
+
+    def shutdown(self) -> None:
+        """Stop the pool without waiting for abandoned work."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
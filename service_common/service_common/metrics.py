@@ -0,0 +1,260 @@
+import os
+import random
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Upper bounds in seconds; the implicit +Inf bucket follows
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Held while a sampled request is profiled. Only one profiler can be active
+# per interpreter (enabling a second raises on Python 3.12+)
+_profile_lock = threading.Lock()
+
+# Stage timings of the current request, collected only when it will be
+# reported in a Server-Timing header
+_request_timings: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar(
+    "request_timings", default=None
+)
+
+# (name, type, help, [(labels, value), ...]) produced by a collector
+Sample = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram for one label set."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Thread-safe histograms keyed by name and labels, rendered as Prometheus text.
+
+    Collectors registered with add_collector() are called at render time
+    for point-in-time gauges and counters owned elsewhere (e.g. the
+    executor's queue depth).
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._help: Dict[str, str] = {}
+        self._histograms: Dict[str, Dict[Tuple[Tuple[str, str], ...], Histogram]] = {}
+        self._collectors: List[Callable[[], List[Sample]]] = []
+        self._lock = threading.Lock()
+
+    def describe(self, name: str, help_text: str) -> None:
+        self._help[name] = help_text
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def add_collector(self, collector: Callable[[], List[Sample]]) -> None:
+        self._collectors.append(collector)
+
+    def snapshot(self, name: str) -> Dict[Tuple[Tuple[str, str], ...], Dict[str, float]]:
+        """Count and sum of every series of a histogram."""
+        with self._lock:
+            return {
+                key: {"count": h.count, "sum": h.sum}
+                for key, h in self._histograms.get(name, {}).items()
+            }
+
+    def render(self) -> str:
+        """Every histogram and collected sample in the Prometheus text format."""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# HELP {name} {self._help.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, histogram in sorted(series.items()):
+                    labels = dict(key)
+                    cumulative = 0
+                    for bound, count in zip(self.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_labels(labels, le=_number(bound))} {cumulative}")
+                    lines.append(f"{name}_bucket{_labels(labels, le='+Inf')} {histogram.count}")
+                    lines.append(f"{name}_sum{_labels(labels)} {_number(histogram.sum)}")
+                    lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+        for collector in self._collectors:
+            for name, kind, help_text, samples in collector():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_labels(labels)} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels: Dict[str, str], **extra: str) -> str:
+    items = {**labels, **extra}
+    if not items:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in items.items()) + "}"
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+registry = MetricsRegistry()
+registry.describe("http_request_duration_seconds", "Request latency by method, route and status")
+registry.describe("stage_duration_seconds", "Time spent in each processing stage")
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    """Record a stage's duration in its histogram and the request's Server-Timing."""
+    registry.observe("stage_duration_seconds", seconds, stage=stage)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append((stage, seconds))
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """Time the enclosed block as `stage`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - start)
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing every HTTP request by its route template.
+
+    With server_timing, each response carries a Server-Timing header
+    listing the spans recorded while handling it, plus the total. Spans
+    recorded on pool threads are included when the work was submitted from
+    the request (the executor copies the request's context); process pool
+    workers keep their spans to themselves. Spans that finish after the
+    response headers were sent (streamed bodies) only reach the histograms.
+
+    With profile_rate > 0, that share of requests runs under cProfile and
+    the stats are dumped to profile_dir as <epoch ms>-<route>.prof. The
+    profiler sees the whole event loop thread while enabled, so concurrent
+    requests show up in the dump too. A request sampled while another is
+    being profiled is not profiled. At the default rate of 0 nothing is
+    imported and no random number is drawn.
+    """
+
+    def __init__(
+        self,
+        app: Any,
+        registry: MetricsRegistry = registry,
+        server_timing: bool = False,
+        profile_rate: float = 0.0,
+        profile_dir: str = "profiles"
+    ):
+        self.app = app
+        self.registry = registry
+        self.server_timing = server_timing
+        self.profile_rate = profile_rate
+        self.profile_dir = profile_dir
+
+    @classmethod
+    def options_from_env(cls, prefix: str) -> Dict[str, Any]:
+        """Keyword options from <prefix>SERVER_TIMING, PROFILE_SAMPLE_RATE and PROFILE_DIR."""
+        env = os.environ
+        return {
+            "server_timing": env.get(prefix + "SERVER_TIMING", "").lower() in ("1", "true", "yes", "on"),
+            "profile_rate": float(env.get(prefix + "PROFILE_SAMPLE_RATE", 0.0)),
+            "profile_dir": env.get(prefix + "PROFILE_DIR", "profiles")
+        }
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profiler = None
+        if (self.profile_rate and random.random() < self.profile_rate
+                and _profile_lock.acquire(blocking=False)):
+            import cProfile
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Another profiling tool is active
+                _profile_lock.release()
+                profiler = None
+        timings: Optional[List[Tuple[str, float]]] = [] if self.server_timing else None
+        token = _request_timings.set(timings)
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if timings is not None:
+                    total = time.perf_counter() - start
+                    message = {
+                        **message,
+                        "headers": [
+                            *message.get("headers", []),
+                            (b"server-timing", _server_timing(timings, total).encode("latin-1"))
+                        ]
+                    }
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_timings.reset(token)
+            route = scope.get("route")
+            self.registry.observe(
+                "http_request_duration_seconds", elapsed,
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=str(status)
+            )
+            if profiler is not None:
+                profiler.disable()
+                try:
+                    self._dump(profiler, getattr(route, "path", "unmatched"))
+                finally:
+                    _profile_lock.release()
+
+    def _dump(self, profiler: Any, route: str) -> None:
+        os.makedirs(self.profile_dir, exist_ok=True)
+        name = route.strip("/").replace("/", "_").replace("{", "").replace("}", "") or "root"
+        profiler.dump_stats(os.path.join(self.profile_dir, f"{int(time.time() * 1000)}-{name}.prof"))
+
+
+def _server_timing(timings: List[Tuple[str, float]], total: float) -> str:
+    # Repeated stages (e.g. one per log batch) are summed into one entry
+    durations: Dict[str, float] = {}
+    for stage, seconds in timings:
+        durations[stage] = durations.get(stage, 0.0) + seconds
+    entries = [f"{stage};dur={seconds * 1000:.3f}" for stage, seconds in durations.items()]
+    entries.append(f"total;dur={total * 1000:.3f}")
+    return ", ".join(entries)
@@ -0,0 +1,11 @@
+from setuptools import setup, find_packages
+
+setup(
+    name="service_common",
+    version="0.1.0",
+    description="Bounded work executor and request metrics shared by the analysis services",
+    author="Your Name",
+    packages=find_packages(exclude=["tests"]),
+    install_requires=[],
+    python_requires='>=3.9',
+)
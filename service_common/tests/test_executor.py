@@ -0,0 +1,78 @@
+import asyncio
+import threading
+
+import pytest
+
+from service_common.executor import ExecutorSaturated, ExecutorTimeout, WorkExecutor
+
+
+def test_calls_beyond_max_pending_are_rejected_with_retry_after():
+    executor = WorkExecutor(max_workers=1, max_pending=2, retry_after=7)
+    executor.acquire()
+    executor.acquire()
+    with pytest.raises(ExecutorSaturated) as raised:
+        executor.check_capacity()
+    assert raised.value.retry_after == 7
+    with pytest.raises(ExecutorSaturated):
+        asyncio.run(executor.run(len, "abc"))
+    assert executor.metrics()["rejected"] == 2
+
+
+def test_queue_depth_and_timeouts_are_counted():
+    executor = WorkExecutor(max_workers=1, max_pending=8, timeout=5.0)
+    release = threading.Event()
+
+    async def main():
+        calls = [asyncio.ensure_future(executor.run(release.wait, 2.0, timeout=0.05))
+                 for _ in range(3)]
+        await asyncio.sleep(0.02)
+        snapshot = executor.metrics()
+        await asyncio.sleep(0.1)
+        release.set()
+        outcomes = await asyncio.gather(*calls, return_exceptions=True)
+        return snapshot, outcomes
+
+    snapshot, outcomes = asyncio.run(main())
+    assert snapshot["in_flight"] == 3
+    assert snapshot["queue_depth"] == 2
+    # Each call's timeout starts when a worker runs it, not when queued
+    assert isinstance(outcomes[0], ExecutorTimeout)
+    assert str(outcomes[0]) == "Timed out after 0.05s"
+    assert outcomes[1:] == [True, True]
+    executor.shutdown()
+    assert executor.metrics()["timed_out"] == 1
+
+
+def test_timed_out_work_keeps_its_slot_until_it_finishes():
+    executor = WorkExecutor(max_workers=1, max_pending=1, timeout=5.0)
+    release = threading.Event()
+
+    async def main():
+        with pytest.raises(ExecutorTimeout):
+            await executor.run(release.wait, 2.0, timeout=0.01)
+        # Abandoned, but still running on the only worker
+        with pytest.raises(ExecutorSaturated):
+            executor.check_capacity()
+        release.set()
+        while executor.metrics()["in_flight"]:
+            await asyncio.sleep(0.01)
+        return await executor.run(sum, [1, 2])
+
+    assert asyncio.run(main()) == 3
+    executor.shutdown()
+
+
+def test_waiting_for_a_worker_is_bounded_by_the_executor_timeout():
+    executor = WorkExecutor(max_workers=1, max_pending=4, timeout=0.05)
+    release = threading.Event()
+
+    async def main():
+        blocker = asyncio.ensure_future(executor.run(release.wait, 2.0, timeout=1.0))
+        await asyncio.sleep(0.01)
+        with pytest.raises(ExecutorTimeout, match="No free worker within 0.05s"):
+            await executor.run(sum, [1], timeout=1.0)
+        release.set()
+        return await blocker
+
+    assert asyncio.run(main()) is True
+    executor.shutdown()
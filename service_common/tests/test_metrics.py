@@ -0,0 +1,37 @@
+import asyncio
+
+from service_common import metrics
+from service_common.metrics import MetricsMiddleware, MetricsRegistry
+
+
+def test_overlapping_sampled_requests_are_profiled_one_at_a_time(tmp_path):
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def app(scope, receive, send):
+        if scope["path"] == "/slow":
+            started.set()
+            await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    middleware = MetricsMiddleware(
+        app, registry=MetricsRegistry(), profile_rate=1.0, profile_dir=str(tmp_path)
+    )
+
+    async def request(path):
+        async def send(message):
+            pass
+        await middleware({"type": "http", "method": "GET", "path": path}, None, send)
+
+    async def main():
+        slow = asyncio.create_task(request("/slow"))
+        await started.wait()
+        # Sampled too, but the profiler is taken: served without one
+        await request("/fast")
+        release.set()
+        await slow
+
+    asyncio.run(main())
+    assert len(list(tmp_path.iterdir())) == 1
+    assert not metrics._profile_lock.locked()